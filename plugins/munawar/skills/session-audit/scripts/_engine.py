@@ -0,0 +1,230 @@
+"""Single-pass analysis engine for session transcripts. Scripts import from here.
+
+Each analysis is an Analyzer. run() streams the transcript once through the
+sidecar index and feeds every analyzer, decoding a record only if at least
+one of them asks for it — so several analyses cost one parse.
+
+run_session() does the same for a session's subagent transcripts too,
+running each transcript in its own worker process.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _fields import merge_fields  # noqa: E402
+from _index import records  # noqa: E402
+from _transcript import transcript_stem, transcripts_in  # noqa: E402
+
+
+class Analyzer:
+    """One analysis over a transcript.
+
+    Subclasses override wants() to pick records from their index entry, and
+    the on_* hooks (or feed() itself) to process the decoded records. `start`
+    is the byte offset to resume from when a saved summary covers the rest,
+    or where a slice of the transcript begins; `end`, if set, the offset the
+    slice stops before. `fields` is a spec of what the on_* hooks read (see
+    _fields), so large records can skip the rest; None means everything,
+    {} nothing (wants() works from the index alone).
+    """
+
+    name = ""
+    start = 0
+    end = None
+    fields = None
+
+    def wants(self, entry) -> bool:
+        """Called for every index entry in order; True to decode the record.
+
+        May update state from the entry alone — no record is needed for that.
+        """
+        return False
+
+    def feed(self, entry, record: dict):
+        """Dispatch a decoded record to the on_* hooks, in transcript order."""
+        t = record.get("type")
+        if t == "user":
+            content = record.get("message", {}).get("content")
+            if isinstance(content, str):
+                self.on_prompt(entry, record, content)
+            elif isinstance(content, list):
+                for block in content:
+                    if block.get("type") == "tool_result":
+                        self.on_result(entry, record, block)
+            raw = record.get("toolUseResult")
+            if raw:
+                self.on_raw_result(entry, record, raw)
+        elif t == "assistant":
+            content = record.get("message", {}).get("content", [])
+            if not isinstance(content, list):
+                return
+            for block in content:
+                bt = block.get("type")
+                if bt == "text":
+                    self.on_text(entry, record, block)
+                elif bt == "thinking":
+                    self.on_thinking(entry, record, block)
+                elif bt == "tool_use":
+                    self.on_tool_use(entry, record, block)
+
+    def on_prompt(self, entry, record: dict, text: str):
+        pass
+
+    def on_result(self, entry, record: dict, block: dict):
+        pass
+
+    def on_raw_result(self, entry, record: dict, raw):
+        pass
+
+    def on_text(self, entry, record: dict, block: dict):
+        pass
+
+    def on_thinking(self, entry, record: dict, block: dict):
+        pass
+
+    def on_tool_use(self, entry, record: dict, block: dict):
+        pass
+
+    def finish(self):
+        """Called once after the pass (e.g. to save a resumable summary)."""
+
+    def result(self) -> dict:
+        """JSON-serializable result."""
+        return {}
+
+    def render(self):
+        """Print the human-readable report."""
+
+
+def run(path: str, analyzers: list[Analyzer]):
+    """Stream the transcript once, feeding every analyzer."""
+    start = min((a.start for a in analyzers), default=0)
+    ends = [a.end for a in analyzers]
+    end = None if None in ends else max(ends, default=None)
+    fields = {}
+    for a in analyzers:
+        fields = merge_fields(fields, a.fields)
+    wanting = []
+
+    def want(e):
+        wanting[:] = [a for a in analyzers
+                      if e.offset >= a.start and (a.end is None or e.offset < a.end) and a.wants(e)]
+        return bool(wanting)
+
+    for e, r in records(path, want, start, end, fields):
+        for a in wanting:
+            a.feed(e, r)
+    for a in analyzers:
+        a.finish()
+
+
+class RollupAnalyzer(Analyzer):
+    """Assistant turns, tool calls, errors and tokens of one transcript, from
+    the index alone — the per-source totals of a --subagents run."""
+
+    name = "rollup"
+    fields = {}
+
+    def __init__(self, path: str):
+        self.path = path
+        self.assistant_records = 0
+        self.tool_calls = 0
+        self.tool_errors = 0
+        self.usage = [0, 0, 0, 0]  # input, output, cache read, cache create
+
+    def wants(self, e) -> bool:
+        if e.type == "assistant":
+            self.assistant_records += 1
+        self.tool_calls += len(e.calls)
+        self.tool_errors += sum(1 for _, is_error, _ in e.results if is_error)
+        if e.usage:
+            self.usage = [a + b for a, b in zip(self.usage, e.usage)]
+        return False
+
+    def result(self) -> dict:
+        return {
+            "assistant_records": self.assistant_records,
+            "tool_calls": self.tool_calls,
+            "tool_errors": self.tool_errors,
+            **dict(zip(["input", "output", "cache_read", "cache_create"], self.usage)),
+        }
+
+
+def subagent_files(path: str) -> list[Path]:
+    """Subagent transcripts of a session (<session-id>/subagents/*.jsonl[.gz|.zst])."""
+    p = Path(path)
+    return transcripts_in(p.parent / transcript_stem(p) / "subagents")
+
+
+def _run_one(path: str, factories: list) -> list[Analyzer]:
+    analyzers = [make(path) for make in factories]
+    run(path, analyzers)
+    return analyzers
+
+
+def run_session(path: str, factories: list, subagents: bool = False,
+                jobs: int | None = None) -> list[tuple[str, str, list[Analyzer]]]:
+    """Run fresh analyzers — one per factory, called with the transcript
+    path — over the transcript and, with subagents=True, over each of its
+    subagent transcripts concurrently in a process pool (a RollupAnalyzer is
+    added to each). Returns (source label, path, analyzers), main first.
+    """
+    if not subagents:
+        return [("main", path, _run_one(path, factories))]
+    sources = [("main", path)] + [(transcript_stem(p), str(p)) for p in subagent_files(path)]
+    factories = [*factories, RollupAnalyzer]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        done = pool.map(_run_one, [p for _, p in sources], repeat(factories))
+        return [(label, p, analyzers) for (label, p), analyzers in zip(sources, done)]
+
+
+def render_session(results: list[tuple[str, str, list[Analyzer]]]):
+    """Print each transcript's reports — under a source header when there
+    are several — followed by the per-source rollup."""
+    if len(results) == 1 and not any(a.name == "rollup" for a in results[0][2]):
+        for i, a in enumerate(results[0][2]):
+            if i:
+                print()
+            a.render()
+        return
+
+    for label, path, analyzers in results:
+        print(f"{'#' * 70}")
+        print(f"# SOURCE: {label}  ({path})")
+        print(f"{'#' * 70}")
+        for a in analyzers:
+            if a.name != "rollup":
+                print()
+                a.render()
+        print()
+
+    print("SUBAGENT ROLLUP")
+    print("=" * 70)
+    print(f"  {'source':24s} {'turns':>6s} {'tools':>6s} {'errors':>6s} {'input':>10s} {'output':>10s} "
+          f"{'cache read':>13s} {'cache create':>13s}")
+    rows = [(label, rollup_of(analyzers)) for label, _, analyzers in results]
+    total = {k: sum(r[k] for _, r in rows) for k in rows[0][1]}
+    for label, r in [*rows, ("TOTAL", total)]:
+        print(f"  {label[:24]:24s} {r['assistant_records']:6d} {r['tool_calls']:6d} {r['tool_errors']:6d} "
+              f"{r['input']:10,} {r['output']:10,} {r['cache_read']:13,} {r['cache_create']:13,}")
+
+
+def json_session(results: list[tuple[str, str, list[Analyzer]]]) -> dict:
+    """JSON counterpart of render_session() for a single analyzer: the main
+    transcript's result, then each subagent's and the per-source rollup."""
+    out = {"session": str(Path(results[0][1]).resolve()), **results[0][2][0].result()}
+    if any(a.name == "rollup" for a in results[0][2]):
+        out["subagents"] = [
+            {"source": label, "transcript": p, **analyzers[0].result()}
+            for label, p, analyzers in results[1:]
+        ]
+        out["rollup"] = {label: rollup_of(analyzers) for label, _, analyzers in results}
+    return out
+
+
+def rollup_of(analyzers: list[Analyzer]) -> dict:
+    return next(a for a in analyzers if a.name == "rollup").result()
@@ -0,0 +1,74 @@
+"""Selective decoding of large transcript records. Scripts import from here.
+
+Some records carry multi-megabyte payloads — a file's contents in a
+tool_result and again in its toolUseResult, the content of a Write — that
+most analyses never look at. A fields spec names what a reader needs:
+
+    {"type": True,                          # the whole value
+     "toolUseResult": bool,                 # a function of the value instead
+     "message": {"content": [{"id": True}]}}  # [spec] applies to each item
+
+A function's result stands in for the value, so it has to be usable in its
+place (bool keeps truthiness); where readers' specs differ, merge_fields()
+falls back to the whole value.
+
+extract() parses a large line with simdjson's lazy parser (pysimdjson) and
+builds Python objects only for those fields; the rest is skipped in the raw
+bytes and never allocated. A value whose shape doesn't match its spec is
+taken whole. Without pysimdjson, or for lines under LAZY_MIN_BYTES (where
+decoding everything is cheaper), the caller decodes the record in full.
+"""
+
+try:
+    import simdjson
+except ImportError:  # optional — without it records are decoded whole
+    simdjson = None
+
+LAZY_MIN_BYTES = 1 << 16
+
+
+def extract(line: bytes, fields: dict) -> dict | None:
+    """The record in `line` reduced to `fields`, or None if the line is short,
+    pysimdjson is missing or its parser rejects the line."""
+    if simdjson is None or len(line) < LAZY_MIN_BYTES:
+        return None
+    try:
+        # A fresh parser each time: a parser can't be reused while any
+        # proxy into its last document is alive
+        doc = simdjson.Parser().parse(line)
+        return _select(doc, fields) if isinstance(doc, simdjson.Object) else None
+    except (ValueError, RuntimeError):  # e.g. NaN or a 64-bit overflow, which json accepts
+        return None
+
+
+def _select(value, spec):
+    if spec is True:
+        return _plain(value)
+    if callable(spec):
+        return spec(value)
+    if isinstance(spec, dict) and isinstance(value, simdjson.Object):
+        return {k: _select(value[k], sub) for k, sub in spec.items() if k in value}
+    if isinstance(spec, list) and isinstance(value, simdjson.Array):
+        return [_select(v, spec[0]) for v in value]
+    return _plain(value)
+
+
+def _plain(value):
+    if isinstance(value, simdjson.Object):
+        return value.as_dict()
+    if isinstance(value, simdjson.Array):
+        return value.as_list()
+    return value
+
+
+def merge_fields(a, b):
+    """A spec covering both; None (the whole record) absorbs anything."""
+    if a is None or b is None:
+        return None
+    if isinstance(a, dict) and isinstance(b, dict):
+        return {k: merge_fields(a[k], b[k]) if k in a and k in b else a.get(k, b.get(k)) for k in {**a, **b}}
+    if isinstance(a, list) and isinstance(b, list):
+        return [merge_fields(a[0], b[0])]
+    if a is b:
+        return a
+    return True  # different shapes or functions: take the value whole
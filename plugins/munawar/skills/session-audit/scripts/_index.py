@@ -0,0 +1,836 @@
+"""Persistent sidecar index for session transcripts. Scripts import from here.
+
+One compact entry per JSONL record (byte offset, type, turn, timestamp, tool
+calls/results, usage) so repeated audits only decode the records they need.
+
+Index files live in ~/.cache/session-audit/ (override with SESSION_AUDIT_CACHE).
+Transcripts are append-only while a session is live, so the index stores a
+checkpoint (end offset, turn counter, token totals, pending tool calls) and
+later runs parse only the bytes appended since. Anything else — truncation,
+rewritten content — triggers a full rebuild. Entries are streamed to and from
+disk, never held in memory as a whole. Set SESSION_AUDIT_NO_INDEX=1 to scan
+without touching the cache. Compressed transcripts (see _transcript.py) are
+indexed by their decompressed offsets and never treated as appendable.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from _fields import extract
+from _transcript import compression, open_transcript, transcript_owner, transcript_stem
+
+try:
+    import orjson
+except ImportError:  # optional — stdlib json is the fallback
+    orjson = None
+
+INDEX_VERSION = 2
+CACHE_DIR = Path(os.environ.get("SESSION_AUDIT_CACHE", Path.home() / ".cache" / "session-audit"))
+FINGERPRINT_BYTES = 4096
+SEEK_BLOCK = 1 << 16
+PARALLEL_MIN_BYTES = 64 << 20  # unindexed bytes worth splitting across processes
+CHUNK_BYTES = 16 << 20
+_ENTRY_HEAD = re.compile(rb'\[(\d+),(\d+),\d+,"(?:[^"\\]|\\.)*",(\d+),"([^"\\]*)"')  # line, offset, turn, ts
+_HEAD_GROUPS = {0: 1, 1: 2, 4: 3, 5: 4}  # Entry field -> _ENTRY_HEAD group
+_TIMESTAMP_PREFIX = re.compile(r"\d{4}-\d{2}(-\d{2}(T\d{2}(:\d{2}(:\d{2}(\.\d+)?)?)?)?)?")
+_TYPE = re.compile(rb'"type":"([^"\\]*)"')
+_TIMESTAMP = re.compile(rb'"timestamp":"([^"\\]*)"')
+
+Entry = namedtuple("Entry", [
+    "line",        # 1-based line number in the JSONL
+    "offset",      # byte offset of the line
+    "length",      # byte length of the line (without newline)
+    "type",        # record type ("?" if missing)
+    "turn",        # turn number (each human text message starts a new turn)
+    "ts",          # raw timestamp string ("" if missing)
+    "prompt",      # True for human text messages
+    "blocks",      # assistant content block types, in order
+    "calls",       # [[tool_use_id, name], ...] for tool_use blocks
+    "results",     # [[tool_use_id, is_error, call_line], ...] for tool_result blocks
+    "usage",       # [input, output, cache_read, cache_create] or None
+    "raw_result",  # True if the record carries a toolUseResult payload
+    "uuid",        # record uuid (kept only on records with tool calls)
+    "parent",      # parentUuid (kept only on records with a toolUseResult)
+    "msg_id",      # assistant message.id (shared by records of one response)
+    "subtype",     # system record subtype
+])
+
+# What make_entry() reads; a large line is decoded only this far (see _fields)
+INDEX_FIELDS = {
+    "type": True, "timestamp": True, "uuid": True, "parentUuid": True, "subtype": True,
+    "toolUseResult": bool,
+    "message": {"id": True, "usage": True,
+                "content": [{"type": True, "id": True, "name": True, "tool_use_id": True, "is_error": True}]},
+}
+
+_memo = {}  # resolved path -> index handle (see _open)
+_parallel_jobs = 1  # see set_parallel
+
+
+def loads(data: bytes):
+    """Decode one JSON value, with orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN or lone surrogates, which stdlib json accepts
+    return json.loads(data.decode("utf-8"))
+
+
+_encoder = json.JSONEncoder(separators=(",", ":"))
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _encoder.encode(value).encode()
+
+
+def peek(line: bytes):
+    """Return (type, timestamp) of a record the index can skip decoding, or None.
+
+    Records other than user/assistant/system contribute only their type and
+    timestamp to the index, so bulky ones (progress, file-history-snapshot,
+    attachments) are read from the raw bytes. The first "type" key counts
+    only if no object was opened before it, and the last "timestamp" only if
+    nothing opens or closes between it and the end of the record. Anything
+    less certain returns None and the caller decodes the line.
+    """
+    nested = line.find(b"{", 1)
+    m = _TYPE.search(line, 0, nested if nested > 0 else len(line))
+    if not m:
+        return None
+    t = m.group(1).decode()
+    if t in ("user", "assistant", "system") or b'"toolUseResult"' in line or b'"subtype"' in line:
+        return None
+    ts = ""
+    i = line.rfind(b'"timestamp":')
+    if i >= 0:
+        m = _TIMESTAMP.match(line, i)
+        tail = line[m.end():].rstrip() if m else b""
+        if not m or not tail.endswith(b"}") or b"{" in tail or b"}" in tail[:-1]:
+            return None
+        ts = m.group(1).decode()
+    return t, ts
+
+
+def set_parallel(jobs: int | None):
+    """Let index builds of large unindexed spans use up to `jobs` processes
+    (None = one per CPU). Off by default, and never used inside a worker."""
+    global _parallel_jobs
+    _parallel_jobs = max(1, jobs or os.cpu_count() or 1)
+
+
+def index_enabled() -> bool:
+    return not os.environ.get("SESSION_AUDIT_NO_INDEX")
+
+
+def index_path(path: str) -> Path:
+    p = Path(path).resolve()
+    digest = hashlib.sha1(str(p).encode()).hexdigest()[:16]
+    return CACHE_DIR / f"{transcript_stem(p)}-{digest}.idx"
+
+
+def new_state() -> dict:
+    """Running state at the start of a transcript."""
+    return {
+        "generation": os.urandom(8).hex(),  # changes on every full rebuild
+        "offset": 0,         # end of the last line parsed
+        "line": 0,           # number of lines consumed
+        "turn": 0,
+        "usage": [0, 0, 0, 0],
+        "pending": {},       # tool_use_id -> [call line, tool name] awaiting a result
+        "tail_open": False,  # last line had no trailing newline
+    }
+
+
+def make_entry(line_num: int, offset: int, length: int, r: dict, state: dict) -> Entry:
+    """Summarize one decoded record, advancing the running state."""
+    t = r.get("type", "?")
+    ts = r.get("timestamp", "")
+    msg = r.get("message")
+    if not isinstance(msg, dict):
+        msg = {}
+    content = msg.get("content")
+    prompt = t == "user" and isinstance(content, str)
+    if prompt:
+        state["turn"] += 1
+    pending = state["pending"]
+    blocks, calls, results = [], [], []
+    usage = None
+    msg_id = None
+
+    if t == "user" and isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "tool_result":
+                tid = block.get("tool_use_id", "?")
+                call = pending.pop(tid, None)
+                results.append([tid, bool(block.get("is_error")), call[0] if call else None])
+
+    elif t == "assistant":
+        msg_id = msg.get("id")
+        u = msg.get("usage")
+        if isinstance(u, dict):
+            usage = [
+                u.get("input_tokens") or 0,
+                u.get("output_tokens") or 0,
+                u.get("cache_read_input_tokens") or 0,
+                u.get("cache_creation_input_tokens") or 0,
+            ]
+            state["usage"] = [a + b for a, b in zip(state["usage"], usage)]
+        if isinstance(content, list):
+            for block in content:
+                if not isinstance(block, dict):
+                    continue
+                bt = block.get("type", "?")
+                blocks.append(bt)
+                if bt == "tool_use":
+                    tid = block.get("id", "")
+                    name = block.get("name", "?")
+                    calls.append([tid, name])
+                    pending[tid] = [line_num, name]
+
+    raw_result = bool(r.get("toolUseResult"))
+    return Entry(
+        line_num, offset, length, t, state["turn"],
+        ts if isinstance(ts, str) else "",
+        prompt, blocks, calls, results, usage, raw_result,
+        r.get("uuid") if calls else None,
+        r.get("parentUuid") if raw_result else None,
+        msg_id, r.get("subtype"),
+    )
+
+
+def scan(path: str, state: dict, end: int | None = None, fields: dict | None = INDEX_FIELDS):
+    """Stream the transcript from state["offset"], yielding (entry, record).
+
+    The record is None when peek() could index the line without decoding it,
+    or when only the `fields` of a large line were decoded; fields=None
+    decodes every record that isn't peeked whole.
+    `state` is advanced in place. Stops at the first line starting at or
+    after `end`, if given. A final line without a newline is only consumed
+    if it decodes — otherwise it is assumed to be mid-write and left for the
+    next run.
+    """
+    with open_transcript(path) as f:
+        f.seek(state["offset"])
+        for raw in f:
+            if end is not None and state["offset"] >= end:
+                break
+            line_num = state["line"] + 1
+            start = state["offset"]
+            line = raw.rstrip(b"\r\n")
+            terminated = raw.endswith(b"\n")
+            entry = r = None
+            # orjson decodes these faster than peek() can look at them
+            peeked = peek(line) if terminated and orjson is None else None
+            if peeked:
+                t, ts = peeked
+                entry = Entry(line_num, start, len(line), t, state["turn"], ts,
+                              False, [], [], [], None, False, None, None, None, None)
+            elif line.strip():
+                slim = extract(line, fields) if terminated and fields is not None else None
+                try:
+                    r = loads(line) if slim is None else None
+                except ValueError:
+                    if terminated:
+                        raise
+                    break
+                entry = make_entry(line_num, start, len(line), r if slim is None else slim, state)
+            state["line"] = line_num
+            state["offset"] = start + len(raw)
+            state["tail_open"] = not terminated
+            if entry:
+                yield entry, r
+
+
+def _scan_chunk(path: str, start: int, end: int | None) -> dict:
+    """Index the lines in [start, end) from a blank state (a worker task).
+
+    Entries come back as plain tuples (cheaper to pickle), with line numbers,
+    turns and call lines relative to the chunk. Results whose call wasn't
+    seen in the chunk are listed as unresolved, with whether the chunk had
+    already issued a call with the same id (which would have replaced any
+    earlier pending one).
+    """
+    state = {"offset": start, "line": 0, "turn": 0, "usage": [0, 0, 0, 0], "pending": {}, "tail_open": False}
+    entries, unresolved, called = [], [], set()
+    for entry, _ in scan(path, state, end):
+        for j, (tid, _, call_line) in enumerate(entry.results):
+            if call_line is None:
+                unresolved.append((len(entries), j, tid in called))
+        called.update(tid for tid, _ in entry.calls)
+        entries.append(tuple(entry))
+    return {"entries": entries, "unresolved": unresolved, "called": called, "state": state}
+
+
+def _scan_parallel(path: str, state: dict, jobs: int):
+    """Index from state["offset"] in newline-aligned chunks across a process
+    pool, yielding each chunk's entries in order once reconciled with the
+    state before it — the same entries and state as a sequential scan.
+
+    At most 2 x jobs chunks are in flight: the next one is submitted as each
+    is merged, so finished chunks never pile up ahead of the consumer.
+    """
+    bounds = [state["offset"]]
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        while size - bounds[-1] > CHUNK_BYTES:
+            f.seek(bounds[-1] + CHUNK_BYTES - 1)
+            f.readline()  # to the start of the next line
+            if f.tell() >= size:
+                break
+            bounds.append(f.tell())
+    ends = bounds[1:] + [None]  # the last chunk runs to EOF, like scan()
+
+    chunks = zip(bounds, ends)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        in_flight = deque(pool.submit(_scan_chunk, path, *c) for c in islice(chunks, 2 * jobs))
+        while in_flight:
+            chunk = in_flight.popleft().result()
+            for c in islice(chunks, 1):
+                in_flight.append(pool.submit(_scan_chunk, path, *c))
+            local, pending = chunk["state"], state["pending"]
+            line0, turn0 = state["line"], state["turn"]
+            entries = []
+            for line, offset, length, t, turn, ts, prompt, blocks, calls, results, *rest in chunk["entries"]:
+                if results:
+                    results = [[tid, err, call_line + line0 if call_line is not None else None]
+                               for tid, err, call_line in results]
+                entries.append(Entry(line + line0, offset, length, t, turn + turn0, ts, prompt, blocks, calls,
+                                     results, *rest))
+            for i, j, shadowed in chunk["unresolved"]:
+                result = entries[i].results[j]
+                call = None if shadowed else pending.pop(result[0], None)
+                result[2] = call[0] if call else None
+            for tid in chunk["called"]:
+                pending.pop(tid, None)
+            for tid, (call_line, name) in local["pending"].items():
+                pending[tid] = [call_line + line0, name]
+            state["line"] += local["line"]
+            state["turn"] += local["turn"]
+            state["usage"] = [a + b for a, b in zip(state["usage"], local["usage"])]
+            state["offset"] = local["offset"]
+            state["tail_open"] = local["tail_open"]
+            yield entries
+
+
+def _scan_batches(path: str, state: dict):
+    """Lists of (entry, record) from state["offset"] — one per line, or one
+    per chunk (records None) when a large span is indexed in parallel."""
+    if (
+        _parallel_jobs > 1
+        and multiprocessing.parent_process() is None
+        and compression(path) is None
+        and os.path.getsize(path) - state["offset"] >= PARALLEL_MIN_BYTES
+    ):
+        for entries in _scan_parallel(path, state, _parallel_jobs):
+            yield [(e, None) for e in entries]
+    else:
+        for item in scan(path, state):
+            yield [item]
+
+
+def _stat_key(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _fingerprint(path: str, offset: int) -> str:
+    with open_transcript(path) as f:
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        return hashlib.sha1(f.read(min(offset, FINGERPRINT_BYTES))).hexdigest()[:16]
+
+
+def _read_checkpoint(path: str):
+    """Return (state, valid_bytes) from the sidecar's last checkpoint, or None.
+
+    Reads backwards from the end so the checkpoint is found without parsing
+    any entries. Entry lines after the last checkpoint belong to an
+    interrupted update; valid_bytes marks where appending may resume.
+    """
+    if not index_enabled():
+        return None
+    try:
+        f = open(index_path(path), "rb")
+    except OSError:
+        return None
+    with f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            return None
+        if header.get("version") != INDEX_VERSION:
+            return None
+        end = f.seek(0, os.SEEK_END)
+        window = 1 << 16
+        while True:
+            start = max(0, end - window)
+            f.seek(start)
+            lines = f.read(end - start).split(b"\n")
+            pos = end
+            for i in range(len(lines) - 1, 0 if start else -1, -1):
+                line = lines[i]
+                pos -= len(line) + (1 if i < len(lines) - 1 else 0)
+                if line.startswith(b"{") and i < len(lines) - 1:
+                    try:
+                        state = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "offset" not in state:
+                        return None  # reached the header — no checkpoint yet
+                    return state, pos + len(line) + 1
+            if not start:
+                return None
+            window *= 4
+
+
+def _seek(f, valid_bytes: int, field: int, value) -> int:
+    """Sidecar position at or before the first entry whose `field` (0=line,
+    1=offset, 4=turn, 5=timestamp) is >= value. Entry lines are sorted by
+    all four (timestamps only grow along a transcript; entries without one
+    are passed over), so bisect over the file's bytes instead of decoding
+    the whole index."""
+    f.seek(0)
+    lo = len(f.readline())
+    hi = valid_bytes
+    while hi - lo > SEEK_BLOCK:
+        mid = (lo + hi) // 2
+        f.seek(mid)
+        f.readline()  # align to the next line start
+        key = None
+        while f.tell() < hi:
+            pos = f.tell()
+            m = _ENTRY_HEAD.match(f.readline())
+            if m and m.group(_HEAD_GROUPS[field]):
+                key = m.group(_HEAD_GROUPS[field])
+                key = key.decode() if field == 5 else int(key)
+                break
+        if key is None or key >= value:
+            hi = mid
+        else:
+            lo = pos
+    return lo
+
+
+def _iter_stored(path: str, valid_bytes: int, field: int, value):
+    """Yield stored entries whose `field` (see _seek) is >= value.
+
+    Bisects to the first match, then decodes block by block, so memory stays
+    flat however large the index is.
+    """
+    with open(index_path(path), "rb") as f:
+        pos = _seek(f, valid_bytes, field, value)
+        f.seek(pos)
+        done = False
+        while not done:
+            lines = f.readlines(SEEK_BLOCK)
+            batch = []
+            for line in lines:
+                pos += len(line)
+                if pos > valid_bytes:
+                    break
+                if line.startswith(b"["):
+                    batch.append(line)
+            done = not lines or pos >= valid_bytes
+            for e in map(Entry._make, loads(b"[" + b",".join(batch) + b"]")):
+                if e[field] >= value:
+                    yield e
+
+
+def _checkpoint_line(path: str, state: dict, complete: bool) -> str:
+    # Only a scan that reached the end may claim to match the file's stat
+    stat = _stat_key(path) if complete else {}
+    checkpoint = {**stat, **state, "fingerprint": _fingerprint(path, state["offset"])}
+    return json.dumps(checkpoint, separators=(",", ":")).encode() + b"\n"
+
+
+def _open_writer(path: str, h: dict):
+    """Open the sidecar to receive new entries, or None if it can't be written.
+
+    A rebuild goes to a temp file that replaces the index once complete; an
+    update truncates any interrupted tail and appends after valid_bytes.
+    """
+    if not index_enabled():
+        return None
+    idx = index_path(path)
+    try:
+        idx.parent.mkdir(parents=True, exist_ok=True)
+        if h["valid_bytes"] is None:
+            f = open(idx.with_name(f"{idx.name}.{os.getpid()}.tmp"), "wb")
+            f.write(json.dumps({"version": INDEX_VERSION, "source": str(Path(path).resolve())}).encode() + b"\n")
+        else:
+            f = open(idx, "r+b")
+            f.truncate(h["valid_bytes"])
+            f.seek(h["valid_bytes"])
+    except OSError:
+        return None
+    return f
+
+
+def _close_writer(path: str, h: dict, f, complete: bool) -> int | None:
+    """Checkpoint the entries written to `f`; return the new valid_bytes."""
+    rebuild = h["valid_bytes"] is None
+    try:
+        with f:
+            f.write(_checkpoint_line(path, h["state"], complete))
+            size = f.tell()
+        if rebuild:
+            os.replace(f.name, index_path(path))
+        return size
+    except OSError:
+        if rebuild:
+            Path(f.name).unlink(missing_ok=True)
+        return None
+
+
+def _open(path: str, start: float = float("inf")) -> dict:
+    """Return the cached index handle for a transcript.
+
+    The handle holds the checkpointed `state` and `valid_bytes` of the
+    sidecar (None if nothing is stored). When `resume` is True the
+    transcript has grown (or the index is missing/stale): the caller scans
+    from state["offset"] via _scan_new(). `start` is the byte offset the
+    caller reads from; a handle with nothing stored is rebuilt if it
+    can't serve it.
+    """
+    key = str(Path(path).resolve())
+    stat = _stat_key(path)
+    h = _memo.get(key)
+    if (
+        h and h["stat"] == stat and not h["resume"]
+        and (h["valid_bytes"] is not None or start >= h["state"]["offset"])
+    ):
+        return h
+
+    loaded = _read_checkpoint(path)
+    if loaded:
+        state, valid_bytes = loaded
+        if {k: state.get(k) for k in stat} == stat:
+            h = {"stat": stat, "state": state, "valid_bytes": valid_bytes, "resume": False}
+            _memo[key] = h
+            return h
+        appendable = (
+            compression(path) is None
+            and stat["size"] >= state["offset"]
+            and not state["tail_open"]
+            and _fingerprint(path, state["offset"]) == state.get("fingerprint")
+        )
+        if appendable:
+            for k in ("size", "mtime_ns", "fingerprint"):
+                state.pop(k, None)
+            h = {"stat": stat, "state": state, "valid_bytes": valid_bytes, "resume": True}
+            _memo[key] = h
+            return h
+
+    h = {"stat": stat, "state": new_state(), "valid_bytes": None, "resume": True}
+    _memo[key] = h
+    return h
+
+
+def _scan_new(path: str, h: dict):
+    """Yield (entry, record) for bytes past the checkpoint, streaming each
+    entry to the sidecar. The new checkpoint covers whatever was scanned,
+    even if the caller stops early."""
+    out = _open_writer(path, h)
+    done = False
+    try:
+        for batch in _scan_batches(path, h["state"]):
+            if out:
+                try:
+                    out.write(b"".join(_dumps(tuple(entry)) + b"\n" for entry, _ in batch))
+                except OSError:
+                    out.close()
+                    out = None
+            yield from batch
+        done = True
+    finally:
+        h["valid_bytes"] = _close_writer(path, h, out, done) if out else None
+        h["stat"] = _stat_key(path)
+        h["resume"] = not done
+
+
+def _iter(path: str, start: int):
+    """Yield (entry, record or None) for entries at byte offset >= start.
+
+    Stored entries come without their record (None); newly appended bytes
+    are decoded once, yielding the record, and added to the index.
+    """
+    h = _open(path, start)
+    if h["valid_bytes"] is not None and start < h["state"]["offset"]:
+        for e in _iter_stored(path, h["valid_bytes"], 1, start):
+            yield e, None
+    if h["resume"]:
+        for entry, r in _scan_new(path, h):
+            if entry.offset >= start:
+                yield entry, r
+
+
+def _refresh(path: str) -> dict:
+    """Bring the index up to date without reading stored entries."""
+    h = _open(path)
+    if h["resume"]:
+        for _ in _scan_new(path, h):
+            pass
+    return h
+
+
+def iter_entries(path: str, start: int = 0):
+    """Yield index entries at byte offset >= start, parsing only new bytes."""
+    for e, _ in _iter(path, start):
+        yield e
+
+
+def entries_from_line(path: str, line: int):
+    """Yield index entries from line number `line` onwards.
+
+    Seeks into the sidecar and decodes entries lazily, so reading a few
+    records near any position of a huge transcript stays cheap.
+    """
+    h = _refresh(path)
+    if h["valid_bytes"] is not None:
+        yield from _iter_stored(path, h["valid_bytes"], 0, line)
+    else:  # nothing persisted (index disabled or unwritable)
+        yield from (e for e, _ in _iter(path, 0) if e.line >= line)
+
+
+def turn_range(text: str) -> tuple[int | None, int | None]:
+    """Parse "A-B", "A-", "-B" or "A" into (first, last) turn numbers."""
+    first, sep, last = text.partition("-")
+    first = int(first) if first.strip() else None
+    last = int(last) if last.strip() else (None if sep else first)
+    if first is None and last is None:
+        raise ValueError(text)
+    return first, last
+
+
+def timestamp_prefix(text: str) -> str:
+    """Normalize an ISO timestamp or a prefix of one ("2026-01-31",
+    "2026-01-31 14:05") for comparing with transcript timestamps."""
+    ts = text.strip().replace(" ", "T").removesuffix("Z")
+    if not _TIMESTAMP_PREFIX.fullmatch(ts):
+        raise ValueError(text)
+    return ts
+
+
+def _first_offset(path: str, field: int, value) -> int | None:
+    """Byte offset of the first entry whose `field` is >= value, or None."""
+    h = _refresh(path)
+    if h["valid_bytes"] is not None:
+        found = _iter_stored(path, h["valid_bytes"], field, value)
+    else:  # nothing persisted (index disabled or unwritable)
+        found = (e for e, _ in _iter(path, 0) if e[field] >= value)
+    return next((e.offset for e in found), None)
+
+
+def slice_range(path: str, turns: tuple | None = None, since: str | None = None,
+                until: str | None = None) -> tuple[int, int | None]:
+    """Byte range [start, end) of the records in `turns` (first, last — either
+    may be None) whose timestamps fall between the since/until prefixes
+    (inclusive, UTC as in the transcript); end is None for end of file.
+
+    Turn numbers and timestamps only grow along a transcript, so each bound
+    is a bisection of the sidecar: no entry before the range is decoded.
+    """
+    first, last = turns or (None, None)
+    lower = [(4, first)] if first is not None else []
+    upper = [(4, last + 1)] if last is not None else []
+    if since:
+        lower.append((5, since))
+    if until:
+        upper.append((5, until + "~"))  # "~" sorts after every timestamp character
+    starts = [_first_offset(path, field, value) for field, value in lower]
+    ends = [end for field, value in upper if (end := _first_offset(path, field, value)) is not None]
+    if None in starts:
+        start = _refresh(path)["state"]["offset"]
+    else:
+        start = max(starts, default=0)
+    return start, min(ends, default=None)
+
+
+def load_index(path: str) -> list[Entry]:
+    """Return all index entries for a transcript."""
+    return list(iter_entries(path))
+
+
+def index_state(path: str) -> dict:
+    """Return the running state checkpointed with the (refreshed) index.
+
+    Only newly appended bytes are parsed; no stored entries are read.
+    """
+    return _refresh(path)["state"]
+
+
+def records(path: str, want=None, start: int = 0, end: int | None = None, fields: dict | None = None):
+    """Yield (entry, record) for entries at byte offset >= start (and < end,
+    if given) accepted by want(entry).
+
+    Already-indexed records are read by seeking, so only the wanted lines are
+    decoded; newly appended bytes are decoded once while extending the index.
+    With a `fields` spec, large records may be decoded only that far (see
+    _fields); other records are always whole.
+    """
+    with open_transcript(path) as f:
+        for e, r in _iter(path, start):
+            if end is not None and e.offset >= end:
+                break
+            if want is None or want(e):
+                yield e, r if r is not None else read_record(f, e, fields)
+
+
+def read_record(f, entry: Entry, fields: dict | None = None) -> dict:
+    """Decode one record from a transcript opened in binary mode."""
+    f.seek(entry.offset)
+    line = f.read(entry.length)
+    r = extract(line, fields) if fields is not None else None
+    return r if r is not None else loads(line)
+
+
+def move_index(old: str, new: str) -> bool:
+    """Hand an up-to-date index (and saved summaries) over to a copy of the
+    transcript with the same decompressed bytes, e.g. once archived.
+
+    The entries and state carry over as they are; a checkpoint stamped with
+    the new file's stat is appended. Returns False, leaving the new file to
+    be indexed from scratch, if the old index was missing or stale.
+    """
+    loaded = _read_checkpoint(old)
+    src, dst = index_path(old), index_path(new)
+    if not loaded or {k: loaded[0].get(k) for k in ("size", "mtime_ns")} != _stat_key(old):
+        return False
+    state, valid_bytes = loaded
+    state.update(_stat_key(new))
+    try:
+        dst.unlink(missing_ok=True)
+        os.replace(src, dst)
+        with open(dst, "r+b") as f:
+            f.truncate(valid_bytes)
+            f.seek(valid_bytes)
+            f.write(json.dumps(state, separators=(",", ":")).encode() + b"\n")
+        for summary in src.parent.glob(f"{src.stem}.*.json"):
+            os.replace(summary, dst.with_name(dst.stem + summary.name[len(src.stem):]))
+    except OSError:
+        return False
+    _memo.pop(str(Path(old).resolve()), None)
+    return True
+
+
+def resume_file(db, path, known: tuple | None, clear) -> tuple[int, dict, dict] | None:
+    """Pick a transcript up again in a database's `files` table (path,
+    project, session, agent, size, mtime_ns, fingerprint, state — as in
+    search.py and ingest.py).
+
+    known is the file's (id, size, mtime_ns, fingerprint, state) row, or
+    None for a file not loaded yet. Returns None if the file is unchanged,
+    else (file id, scan state to continue from, stat to checkpoint with).
+    A file that can't just be appended to — rewritten, compressed since, or
+    last read up to an unterminated line — starts over from a new state,
+    after clear(file id) drops what was loaded from it.
+    """
+    key = str(path)
+    stat = _stat_key(key)
+    if known and (known[1], known[2]) == (stat["size"], stat["mtime_ns"]):
+        return None
+    state = json.loads(known[4]) if known else None
+    appendable = (
+        state is not None
+        and compression(key) is None
+        and stat["size"] >= state["offset"]
+        and not state["tail_open"]
+        and _fingerprint(key, state["offset"]) == known[3]
+    )
+    if not appendable:
+        state = new_state()
+        if known:
+            clear(known[0])
+    if known:
+        return known[0], state, stat
+    file_id = db.execute(
+        "INSERT INTO files (path, project, session, agent) VALUES (?, ?, ?, ?)",
+        (key, *transcript_owner(path)),
+    ).lastrowid
+    return file_id, state, stat
+
+
+def adopt_archive(db, path, known: dict) -> tuple | None:
+    """Hand the `files` row of a transcript archive.py compressed over to
+    its archive, as move_index() does for the sidecar index.
+
+    known maps paths to rows as resume_file() takes them. If path is
+    compressed, its plain .jsonl is gone and known has a row for that one
+    whose scan ended exactly where path's decompressed bytes do, the row is
+    renamed to path with path's stat and returned (so resume_file() finds
+    it unchanged), else None.
+    """
+    kind = compression(str(path))
+    plain = str(path)[:-len(kind) - 1] if kind else None
+    row = known.get(plain)
+    if row is None or os.path.exists(plain):
+        return None
+    offset = json.loads(row[4])["offset"]
+    with open_transcript(str(path)) as f:
+        f.seek(max(0, offset - FINGERPRINT_BYTES))
+        tail = f.read(min(offset, FINGERPRINT_BYTES))
+        if f.read(1) or hashlib.sha1(tail).hexdigest()[:16] != row[3]:
+            return None
+    del known[plain]
+    stat = _stat_key(str(path))
+    db.execute("UPDATE files SET path = ?, size = ?, mtime_ns = ? WHERE id = ?",
+               (str(path), stat["size"], stat["mtime_ns"], row[0]))
+    return row[0], stat["size"], stat["mtime_ns"], *row[3:]
+
+
+def checkpoint_file(db, file_id: int, path, state: dict, stat: dict):
+    """Record in the `files` table how far resume_file()'s scan got."""
+    key = str(path)
+    db.execute(
+        "UPDATE files SET size = ?, mtime_ns = ?, fingerprint = ?, state = ? WHERE id = ?",
+        (stat["size"], stat["mtime_ns"], _fingerprint(key, state["offset"]), json.dumps(state), file_id),
+    )
+
+
+def _summary_path(path: str, name: str) -> Path:
+    idx = index_path(path)
+    return idx.with_name(f"{idx.stem}.{name}.json")
+
+
+def load_summary(path: str, name: str) -> dict | None:
+    """Return a script's saved running state if it still matches the index.
+
+    A summary is only valid for the index generation it was saved against;
+    a full rebuild of the index discards it.
+    """
+    if not index_enabled():
+        return None
+    try:
+        with open(_summary_path(path, name)) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    state = index_state(path)
+    if saved.get("generation") != state["generation"] or saved.get("offset", 0) > state["offset"]:
+        return None
+    return saved
+
+
+def save_summary(path: str, name: str, summary: dict):
+    """Persist a script's running state, stamped with the index checkpoint."""
+    if not index_enabled():
+        return
+    state = index_state(path)
+    summary = {**summary, "generation": state["generation"], "offset": state["offset"]}
+    target = _summary_path(path, name)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w") as f:
+            json.dump(summary, f, separators=(",", ":"))
+        os.replace(tmp, target)
+    except OSError:
+        pass
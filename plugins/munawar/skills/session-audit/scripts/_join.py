@@ -0,0 +1,66 @@
+"""Tool call <-> result join for session transcripts. Scripts import from here.
+
+A tool_result block names its call by tool_use_id; a toolUseResult payload
+only by the parentUuid of its record, which is the uuid of the assistant
+record that made the call. CallJoin indexes pending calls both ways, so
+either kind of result finds its call with a hash lookup, and a matched call
+is evicted from both indexes — pairing stays O(1) per record however many
+calls are outstanding.
+"""
+
+
+class CallJoin:
+    """Pending tool calls keyed by tool_use_id and by their record's uuid.
+
+    Each call is a caller-defined dict; it is stored as given and handed
+    back by the pop methods. `calls` restores a previous state() snapshot.
+    """
+
+    def __init__(self, calls: dict | None = None):
+        self.by_id = {}
+        self.by_uuid = {}  # record uuid -> {tool_use_id: None}, in call order
+        for tid, call in (calls or {}).items():
+            self.add(tid, call.get("uuid"), call)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, tid: str) -> bool:
+        return tid in self.by_id
+
+    def add(self, tid: str, uuid, call: dict):
+        """Register a call; a repeated tool_use_id replaces the earlier one."""
+        self.discard(tid)
+        call["uuid"] = uuid
+        self.by_id[tid] = call
+        self.by_uuid.setdefault(uuid, {})[tid] = None
+
+    def get(self, tid: str) -> dict | None:
+        return self.by_id.get(tid)
+
+    def pop(self, tid: str) -> dict | None:
+        """Remove and return the call a tool_result names, if pending."""
+        call = self.by_id.pop(tid, None)
+        if call is not None:
+            tids = self.by_uuid[call["uuid"]]
+            del tids[tid]
+            if not tids:
+                del self.by_uuid[call["uuid"]]
+        return call
+
+    def has_parent(self, parent_uuid) -> bool:
+        """Whether a call made by the record parent_uuid points to is pending."""
+        return parent_uuid in self.by_uuid
+
+    def pop_by_parent(self, parent_uuid) -> dict | None:
+        """Remove and return the earliest pending call made by the record
+        a toolUseResult's parentUuid points to."""
+        tids = self.by_uuid.get(parent_uuid)
+        return self.pop(next(iter(tids))) if tids else None
+
+    def discard(self, tid: str):
+        self.pop(tid)
+
+    def state(self) -> dict:
+        """JSON-serializable pending calls (tool_use_id -> call), for saving."""
+        return self.by_id
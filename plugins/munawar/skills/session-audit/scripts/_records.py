@@ -0,0 +1,141 @@
+"""Small helpers for reading and reporting transcript records. Scripts import from here.
+
+Timestamps, durations, command names and tool call summaries come up in
+most reports; keeping them here spares the scripts from importing one
+another.
+"""
+
+import json
+import math
+import os
+import re
+import shlex
+from datetime import datetime
+
+# Commands whose first argument names what they do (git commit, npm test, ...)
+SUBCOMMAND_TOOLS = {
+    "git", "npm", "pnpm", "yarn", "npx", "bun", "cargo", "go", "docker", "kubectl", "gh",
+    "make", "uv", "pip", "pip3", "poetry", "terraform", "helm", "dotnet", "mvn", "gradle",
+}
+SUBCOMMAND = re.compile(r"[a-z][a-z0-9:_-]*$")
+_WORD = r"""(?:"[^"]*"|'[^']*'|[^\s;&|])+"""
+# A leading `cd DIR &&` / `cd DIR;`, or an environment assignment
+COMMAND_PREFIX = re.compile(rf"\s*(?:cd\s+{_WORD}\s*(?:&&|;)|[A-Za-z_]\w*=(?:{_WORD})?\s)")
+
+
+def parse_ts(ts_str: str) -> datetime | None:
+    if not ts_str:
+        return None
+    try:
+        return datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return None
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def fmt_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m {int(seconds % 60):02d}s"
+    return f"{int(seconds // 3600)}h {int(seconds % 3600 // 60):02d}m"
+
+
+def command_key(command: str) -> str:
+    """Program (plus subcommand for git/npm/...) a Bash command runs, ignoring
+    a leading `cd ... &&` and environment assignments."""
+    for segment in command.replace("||", "&&").replace(";", "&&").split("&&"):
+        try:
+            words = shlex.split(segment.strip().split("|")[0])
+        except ValueError:
+            words = segment.split()
+        while words and "=" in words[0] and not words[0].startswith("="):
+            words = words[1:]
+        if not words or words[0] == "cd":
+            continue
+        program = os.path.basename(words[0])
+        if program in SUBCOMMAND_TOOLS and len(words) > 1 and SUBCOMMAND.match(words[1]):
+            return f"{program} {words[1]}"
+        return program
+    return "(cd only)"
+
+
+def command_body(command: str) -> str:
+    """A Bash command without its leading `cd ... &&` and environment
+    assignments (the command itself if that leaves nothing)."""
+    body = command
+    while m := COMMAND_PREFIX.match(body):
+        body = body[m.end():]
+    return body.strip() or command.strip()
+
+
+def summarize_tool_input(name: str, inp: dict) -> str:
+    """One-line summary of what a tool call attempted."""
+    if name == "Bash":
+        return inp.get("command", "")[:200]
+    elif name == "Read":
+        return inp.get("file_path", "")
+    elif name == "Write":
+        return inp.get("file_path", "")
+    elif name == "Edit":
+        fp = inp.get("file_path", "")
+        old = inp.get("old_string", "")[:80]
+        return f"{fp}  old_string={old!r}"
+    elif name == "Grep":
+        return f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
+    elif name == "Glob":
+        return f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
+    elif name == "Agent":
+        return f'type={inp.get("subagent_type","")} desc={inp.get("description","")}'
+    else:
+        return json.dumps(inp, separators=(",", ":"))[:200]
+
+
+def tool_input_text(name: str, inp: dict) -> str:
+    """A tool call's input as searched: the full command, both sides of an
+    edit, an Agent's prompt."""
+    if name == "Bash":
+        return inp.get("command", "")
+    elif name in ("Read", "Write"):
+        return inp.get("file_path", "")
+    elif name == "Edit":
+        fp = inp.get("file_path", "")
+        old = inp.get("old_string", "")[:120]
+        new = inp.get("new_string", "")[:120]
+        return f"{fp} old={old!r} new={new!r}"
+    elif name == "Grep":
+        return f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
+    elif name == "Glob":
+        return f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
+    elif name == "Agent":
+        return f'type={inp.get("subagent_type","")} desc={inp.get("description","")} prompt={inp.get("prompt","")[:200]}'
+    else:
+        return json.dumps(inp, separators=(",", ":"))
+
+
+def extract_tool_result_text(block: dict) -> str:
+    result = block.get("content", "")
+    if isinstance(result, list):
+        result = "\n".join(
+            c.get("text", "") for c in result if c.get("type") == "text"
+        )
+    return str(result)
+
+
+def excerpt(text: str, span: tuple[int, int], context_chars: int = 80) -> str:
+    """Return a snippet around the matched span with ** markers."""
+    m_start, m_end = span
+    start = max(0, m_start - context_chars)
+    end = min(len(text), m_end + context_chars)
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if end < len(text) else ""
+    before = text[start:m_start]
+    matched = text[m_start:m_end]
+    after = text[m_end:end]
+    # Collapse newlines for readability
+    snippet = f"{prefix}{before}**{matched}**{after}{suffix}"
+    return snippet.replace("\n", " ")
@@ -0,0 +1,104 @@
+"""Near-duplicate detection over short texts. Scripts import from here.
+
+signature() turns a text into a MinHash signature of its character
+shingles: the fraction of positions two signatures agree on estimates the
+Jaccard similarity of their shingle sets, so "pytest -x tests/" and
+"pytest -q tests/" come out close while unrelated commands don't. It is a
+one-permutation MinHash — each shingle is hashed once and kept in one of
+BINS bins, empty bins borrowing from the next filled one — so it costs one
+hash per shingle however long the signature.
+
+NearDuplicates is an LSH index of signatures over a sliding window: the
+signature is cut into bands, and only items sharing a band (a bucket) are
+compared. Items that fall out of the window leave their buckets, so each
+lookup touches at most the window's items and a whole session indexes in
+near-linear time.
+"""
+
+import zlib
+from collections import deque
+from operator import eq
+
+SHINGLE = 4      # characters per shingle
+BINS = 64        # signature length
+ROWS = 4         # signature positions per LSH band (16 bands)
+_VALUE_BITS = 32 - 6  # hash bits below the bin number (BINS = 2**6)
+
+
+def signature(text: str) -> list[int]:
+    """MinHash signature of text's character shingles."""
+    data = text.encode()
+    crc = zlib.crc32
+    hashes = {crc(data[i:i + SHINGLE]) * 0x9E3779B1 & 0xFFFFFFFF  # crc32 alone is linear; mix it
+              for i in range(max(1, len(data) - SHINGLE + 1))}
+    sig = [None] * BINS
+    for h in sorted(hashes, reverse=True):  # each bin ends up with its smallest hash
+        sig[h >> _VALUE_BITS] = h
+    # An empty bin borrows from the next filled one, offset by the distance
+    # so a borrowed value never equals a genuine one
+    j = next(b for b in range(BINS) if sig[b] is not None) + BINS
+    for b in range(BINS - 1, -1, -1):
+        if sig[b] is not None:
+            j = b
+        else:
+            sig[b] = sig[j % BINS] + ((j - b) << 32)
+    return sig
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(map(eq, a, b)) / BINS
+
+
+def _bands(group: str, sig: list[int]) -> list[tuple]:
+    return [(group, start, *sig[start:start + ROWS]) for start in range(0, BINS, ROWS)]
+
+
+class NearDuplicates:
+    """LSH index of the last `window` signatures added.
+
+    Items are numbered in the order they are added; only items of the same
+    group (e.g. the same tool) are compared. `state` restores a previous
+    state() snapshot.
+    """
+
+    def __init__(self, threshold: float, window: int, state: dict | None = None):
+        self.threshold = threshold
+        self.window = window
+        self.recent = deque()   # (index, group, signature, bands), oldest first
+        self.buckets = {}       # band -> deque of indices, oldest first
+        self.sigs = {}          # index -> signature
+        state = state or {}
+        for idx, group, sig in state.get("recent", []):
+            self._insert(idx, group, sig)
+        self.count = state.get("count", 0)
+
+    def _insert(self, idx: int, group: str, sig: list[int], bands: list[tuple] | None = None):
+        bands = bands or _bands(group, sig)
+        self.recent.append((idx, group, sig, bands))
+        self.sigs[idx] = sig
+        for band in bands:
+            self.buckets.setdefault(band, deque()).append(idx)
+
+    def add(self, group: str, sig: list[int]) -> tuple[int, list[int]]:
+        """Index a signature; returns its number and the numbers of the
+        items in the window it is similar to."""
+        idx = self.count
+        self.count += 1
+        while self.recent and self.recent[0][0] < idx - self.window:
+            old, _, _, old_bands = self.recent.popleft()
+            del self.sigs[old]
+            for band in old_bands:
+                bucket = self.buckets[band]
+                bucket.popleft()  # items leave in the order they came, so it's the oldest
+                if not bucket:
+                    del self.buckets[band]
+        bands = _bands(group, sig)
+        candidates = set().union(*[self.buckets.get(band, ()) for band in bands])
+        similar = sorted(j for j in candidates if similarity(sig, self.sigs[j]) >= self.threshold)
+        self._insert(idx, group, sig, bands)
+        return idx, similar
+
+    def state(self) -> dict:
+        """JSON-serializable snapshot of the window, for saving."""
+        return {"count": self.count, "recent": [[idx, group, sig] for idx, group, sig, _ in self.recent]}
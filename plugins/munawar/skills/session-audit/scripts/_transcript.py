@@ -0,0 +1,262 @@
+"""Open session transcripts, plain or compressed. Scripts import from here.
+
+A transcript is <name>.jsonl, or <name>.jsonl.gz / <name>.jsonl.zst once
+archive.py has compressed it. open_transcript() returns a binary file
+object over the decompressed bytes, so offsets, lines and the sidecar index
+are the same whichever form is on disk.
+
+Compressed files are decompressed as a stream; seeking backwards restarts
+from the top. Files archived with --seekable are cut into independent
+frames with a table of their sizes (an "SA" extra field on every gzip
+member, the standard seek-table frame for zstd), and seeking there only
+decompresses the frame holding the target offset. Reading .zst needs the
+zstandard package.
+"""
+
+import bisect
+import glob
+import gzip
+import io
+import os
+import struct
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # optional — needed only for .zst transcripts
+    zstandard = None
+
+SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+READ_BUFFER = 1 << 16
+
+# Seekable gzip: each member's FEXTRA holds subfield "SA" = (member bytes, decompressed bytes)
+GZIP_SEEK_ID = b"SA"
+GZIP_SEEK_HEADER = struct.Struct("<2sBBIBBH2sHII")  # magic, CM, FLG, MTIME, XFL, OS, XLEN, SI, LEN, sizes
+# Seekable zstd: a skippable frame of (compressed, decompressed) sizes, then the footer
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A5E
+ZSTD_SEEKABLE_MAGIC = 0x8F92EAB1
+ZSTD_SEEK_FOOTER = struct.Struct("<IBI")  # frames, descriptor, magic
+
+
+def compression(path) -> str | None:
+    """"gz" or "zst" for a compressed transcript, None for plain JSONL."""
+    name = str(path)
+    for suffix in (".gz", ".zst"):
+        if name.endswith(".jsonl" + suffix):
+            return suffix[1:]
+    return None
+
+
+def is_transcript(path) -> bool:
+    return str(path).endswith(SUFFIXES)
+
+
+def transcript_stem(path) -> str:
+    """Session id or agent name: the file name without .jsonl[.gz|.zst]."""
+    name = Path(path).name
+    for suffix in SUFFIXES[::-1]:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(path).stem
+
+
+def unique_transcripts(paths) -> list[Path]:
+    """Sorted transcripts among paths, one per stem — the plain file wins over
+    a compressed copy left by an interrupted archive."""
+    best = {}
+    for p in map(Path, paths):
+        if is_transcript(p):
+            key = (p.parent, transcript_stem(p))
+            if key not in best or compression(best[key]) and not compression(p):
+                best[key] = p
+    return sorted(best.values())
+
+
+def transcripts_in(directory) -> list[Path]:
+    """Transcripts directly inside a directory (none if it doesn't exist)."""
+    return unique_transcripts(Path(directory).glob("*.jsonl*"))
+
+
+def find_sessions(target: str) -> list[Path]:
+    """Main transcripts under a projects root or project dir, or matching a glob."""
+    p = Path(target).expanduser()
+    if p.is_dir():
+        found = list(p.glob("*.jsonl*")) + list(p.glob("*/*.jsonl*"))
+    else:
+        found = [Path(f) for f in glob.glob(os.path.expanduser(target))]
+    return unique_transcripts(f for f in found if f.is_file() and f.parent.name != "subagents")
+
+
+def project_transcripts(project_dirs) -> list[Path]:
+    """Main and subagent transcripts under each project directory."""
+    found = []
+    for proj in map(Path, project_dirs):
+        found += transcripts_in(proj)
+        for subagents in sorted(proj.glob("*/subagents")):
+            found += transcripts_in(subagents)
+    return found
+
+
+def transcript_owner(path) -> tuple[str, str, str | None]:
+    """(project, session, agent) of a transcript; agent is None for a main one."""
+    p = Path(path)
+    if p.parent.name == "subagents":
+        return p.parents[2].name, p.parents[1].name, transcript_stem(p)
+    return p.parent.name, transcript_stem(p), None
+
+
+def open_transcript(path):
+    """Open a transcript for binary reading, decompressing if needed."""
+    kind = compression(path)
+    if kind is None:
+        return open(path, "rb")
+    if kind == "zst" and zstandard is None:
+        raise OSError(f"{path}: reading .zst transcripts needs the zstandard package (pip install zstandard)")
+    f = open(path, "rb")
+    try:
+        frames = _gzip_frames(f) if kind == "gz" else _zstd_frames(f)
+    except BaseException:
+        f.close()
+        raise
+    if frames is not None:
+        decompress = gzip.decompress if kind == "gz" else zstandard.ZstdDecompressor().decompress
+        return io.BufferedReader(_FrameReader(f, frames, decompress), READ_BUFFER)
+    if kind == "gz":
+        f.close()
+        return gzip.open(path, "rb")
+    return io.BufferedReader(_ZstdStream(f), READ_BUFFER)
+
+
+def _gzip_frames(f) -> list[tuple] | None:
+    """(offset, size, decompressed size) of every member, or None unless each
+    one carries the seek subfield."""
+    frames, pos = [], 0
+    while True:
+        f.seek(pos)
+        head = f.read(GZIP_SEEK_HEADER.size)
+        if not head:
+            return frames or None
+        if len(head) < GZIP_SEEK_HEADER.size:
+            return None
+        magic, _, flags, _, _, _, xlen, si, length, size, usize = GZIP_SEEK_HEADER.unpack(head)
+        if magic != b"\x1f\x8b" or not flags & 4 or xlen != 12 or si != GZIP_SEEK_ID or length != 8:
+            return None
+        frames.append((pos, size, usize))
+        pos += size
+
+
+def _zstd_frames(f) -> list[tuple] | None:
+    """(offset, size, decompressed size) of every frame from the seek table,
+    or None if the file doesn't end with one."""
+    end = f.seek(0, io.SEEK_END)
+    if end < ZSTD_SEEK_FOOTER.size:
+        return None
+    f.seek(end - ZSTD_SEEK_FOOTER.size)
+    count, descriptor, magic = ZSTD_SEEK_FOOTER.unpack(f.read(ZSTD_SEEK_FOOTER.size))
+    if magic != ZSTD_SEEKABLE_MAGIC:
+        return None
+    width = 12 if descriptor & 0x80 else 8  # entries may carry a checksum
+    table = count * width
+    f.seek(end - ZSTD_SEEK_FOOTER.size - table - 8)
+    skip_magic, frame_size = struct.unpack("<II", f.read(8))
+    if skip_magic != ZSTD_SKIPPABLE_MAGIC or frame_size != table + ZSTD_SEEK_FOOTER.size:
+        return None
+    data = f.read(table)
+    frames, pos = [], 0
+    for i in range(count):
+        size, usize = struct.unpack_from("<II", data, i * width)
+        frames.append((pos, size, usize))
+        pos += size
+    return frames
+
+
+class _FrameReader(io.RawIOBase):
+    """Decompressed view of independently compressed frames; a read only
+    decompresses the frame holding the current position."""
+
+    def __init__(self, f, frames: list[tuple], decompress):
+        self._f = f
+        self._decompress = decompress
+        self._frames = [fr for fr in frames if fr[2]]
+        self._starts = []
+        total = 0
+        for _, _, usize in self._frames:
+            self._starts.append(total)
+            total += usize
+        self._size = total
+        self._pos = 0
+        self._cached = (None, b"")  # (frame index, decompressed bytes)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, b) -> int:
+        if self._pos >= self._size:
+            return 0
+        i = bisect.bisect_right(self._starts, self._pos) - 1
+        if self._cached[0] != i:
+            offset, size, _ = self._frames[i]
+            self._f.seek(offset)
+            self._cached = (i, self._decompress(self._f.read(size)))
+        start = self._pos - self._starts[i]
+        chunk = self._cached[1][start:start + len(b)]
+        b[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+class _ZstdStream(io.RawIOBase):
+    """Streaming .zst reader; a backward seek starts decompressing again
+    from the top, as gzip does."""
+
+    def __init__(self, f):
+        self._f = f
+        self._open()
+
+    def _open(self):
+        self._f.seek(0)
+        self._reader = zstandard.ZstdDecompressor().stream_reader(self._f, read_across_frames=True, closefd=False)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._reader.tell()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.tell()
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("can't seek from the end of a compressed stream")
+        if offset < self.tell():
+            self._open()
+        while self.tell() < offset:
+            if not self._reader.read(min(offset - self.tell(), READ_BUFFER)):
+                break
+        return self.tell()
+
+    def readinto(self, b) -> int:
+        return self._reader.readinto(b)
+
+    def close(self):
+        self._reader.close()
+        self._f.close()
+        super().close()
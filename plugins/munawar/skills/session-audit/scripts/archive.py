@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Compress the transcripts of idle sessions in place.
+
+Usage:
+    python3 archive.py <projects-root|project-dir|glob> [--idle-days 7] [--format gz|zst]
+                       [--seekable] [--frame-size 1048576] [--level N] [--keep] [--dry-run] [--jobs N] [--json]
+
+A session is idle when neither its transcript nor anything in its session
+dir (subagent transcripts, tool results) changed in --idle-days. Each
+transcript of an idle session, main and subagents, is compressed to
+<name>.jsonl.gz (or .zst), read back and compared, given the original's
+mtime, and only then replaces the .jsonl (--keep leaves it in place, and
+later runs skip it while its archive is at least as new). Its
+sidecar index moves with it, and search.py and ingest.py carry their rows
+over to it, so archived sessions aren't indexed or loaded again.
+
+Every script reads archived transcripts transparently. Without --seekable
+a read that seeks backwards decompresses from the start of the file again;
+with it the file is cut at line breaks into independently compressed frames
+of about --frame-size bytes plus a table of their sizes, and a read only
+decompresses the frame it needs — use it for sessions you'll still open
+with context.py or conversation.py. .zst needs the zstandard package.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import subagent_files  # noqa: E402
+from _index import move_index  # noqa: E402
+from _transcript import (  # noqa: E402
+    GZIP_SEEK_HEADER, GZIP_SEEK_ID, ZSTD_SEEK_FOOTER, ZSTD_SEEKABLE_MAGIC, ZSTD_SKIPPABLE_MAGIC,
+    compression, find_sessions, open_transcript, transcript_stem, zstandard,
+)
+
+COPY_BLOCK = 1 << 20
+DEFAULT_LEVEL = {"gz": 6, "zst": 3}
+
+
+def last_activity(main_file: Path) -> float:
+    """Latest mtime of the transcript and everything in its session dir."""
+    latest = main_file.stat().st_mtime
+    session_dir = main_file.parent / transcript_stem(main_file)
+    if session_dir.is_dir():
+        for item in session_dir.rglob("*"):
+            latest = max(latest, item.stat().st_mtime)
+    return latest
+
+
+def gzip_member(data: bytes, level: int) -> bytes:
+    """One gzip member carrying its own size and decompressed size."""
+    c = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    body = c.compress(data) + c.flush()
+    size = GZIP_SEEK_HEADER.size + len(body) + 8
+    head = GZIP_SEEK_HEADER.pack(b"\x1f\x8b", 8, 4, 0, 0, 255, 12, GZIP_SEEK_ID, 8, size, len(data))
+    return head + body + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+def write_compressed(src, out, kind: str, level: int, frame_size: int | None) -> str:
+    """Compress src into out; returns the sha1 of the bytes read."""
+    digest = hashlib.sha1()
+    if frame_size:
+        compress = (lambda data: gzip_member(data, level)) if kind == "gz" else \
+            zstandard.ZstdCompressor(level=level).compress
+        sizes = []  # (compressed, decompressed) per frame
+        while data := src.read(frame_size):
+            data += src.readline()  # frames end at a line break
+            digest.update(data)
+            frame = compress(data)
+            out.write(frame)
+            sizes.append((len(frame), len(data)))
+        if kind == "gz" and not sizes:
+            out.write(gzip_member(b"", level))  # an empty transcript is still one member
+        elif kind == "zst":
+            table = b"".join(struct.pack("<II", *s) for s in sizes)
+            out.write(struct.pack("<II", ZSTD_SKIPPABLE_MAGIC, len(table) + ZSTD_SEEK_FOOTER.size))
+            out.write(table + ZSTD_SEEK_FOOTER.pack(len(sizes), 0, ZSTD_SEEKABLE_MAGIC))
+        return digest.hexdigest()
+
+    if kind == "gz":
+        writer = gzip.GzipFile(fileobj=out, mode="wb", compresslevel=level, mtime=0)
+    else:
+        writer = zstandard.ZstdCompressor(level=level).stream_writer(out, closefd=False)
+    with writer:
+        while data := src.read(COPY_BLOCK):
+            digest.update(data)
+            writer.write(data)
+    return digest.hexdigest()
+
+
+def archive_file(path: str, kind: str, level: int, frame_size: int | None, keep: bool) -> dict:
+    """Compress one transcript next to itself and verify it before the
+    original goes. Raises OSError if the transcript changed meanwhile."""
+    src = Path(path)
+    dst = src.with_name(src.name + "." + kind)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    before = src.stat()
+    try:
+        with open(src, "rb") as f, open(tmp, "wb") as out:
+            written = write_compressed(f, out, kind, level, frame_size)
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+    try:
+        digest = hashlib.sha1()
+        with open_transcript(str(dst)) as f:
+            while data := f.read(COPY_BLOCK):
+                digest.update(data)
+        if digest.hexdigest() != written:
+            raise OSError(f"{dst}: decompressed bytes differ from the original")
+        st = src.stat()
+        if (st.st_size, st.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+            raise OSError(f"{src}: changed while being archived")
+        os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    except BaseException:
+        dst.unlink(missing_ok=True)
+        raise
+    moved = False
+    if not keep:
+        moved = move_index(path, str(dst))
+        src.unlink()
+    return {"file": path, "archive": str(dst), "bytes": before.st_size, "compressed": dst.stat().st_size,
+            "index_moved": moved}
+
+
+def kept_archive(path: Path) -> bool:
+    """Whether a plain transcript was already archived with --keep: a
+    compressed copy next to it is at least as new as it is."""
+    mtime = path.stat().st_mtime_ns
+    for kind in ("gz", "zst"):
+        copy = path.with_name(f"{path.name}.{kind}")
+        if copy.exists() and copy.stat().st_mtime_ns >= mtime:
+            return True
+    return False
+
+
+def plan(target: str, idle_days: float) -> dict:
+    """Sessions under target, and the uncompressed transcripts of the idle ones."""
+    cutoff = time.time() - idle_days * 86400
+    out = {"sessions": 0, "active": 0, "archived": 0, "idle": []}
+    for main_file in find_sessions(target):
+        out["sessions"] += 1
+        files = [f for f in [main_file, *subagent_files(str(main_file))]
+                 if not compression(f) and not kept_archive(f)]
+        if not files:
+            out["archived"] += 1
+        elif last_activity(main_file) > cutoff:
+            out["active"] += 1
+        else:
+            out["idle"].append({"project": main_file.parent.name, "session": transcript_stem(main_file),
+                                "files": [str(f) for f in files],
+                                "bytes": sum(f.stat().st_size for f in files)})
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress the transcripts of idle sessions")
+    parser.add_argument("target",
+                        help="Projects root (e.g. ~/.claude/projects), project dir, or glob of session JSONLs")
+    parser.add_argument("--idle-days", type=float, default=7,
+                        help="Days without changes before a session is archived (default: 7)")
+    parser.add_argument("--format", choices=["gz", "zst"], default="gz", help="Compression format (default: gz)")
+    parser.add_argument("--seekable", action="store_true", help="Compress in independent frames with a seek table")
+    parser.add_argument("--frame-size", type=int, default=1 << 20,
+                        help="Decompressed bytes per frame with --seekable (default: 1048576)")
+    parser.add_argument("--level", type=int, help="Compression level (default: 6 for gz, 3 for zst)")
+    parser.add_argument("--keep", action="store_true", help="Keep the original .jsonl files")
+    parser.add_argument("--dry-run", action="store_true", help="List the idle sessions without compressing anything")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    if args.format == "zst" and zstandard is None:
+        parser.error("--format zst needs the zstandard package (pip install zstandard)")
+    level = args.level if args.level is not None else DEFAULT_LEVEL[args.format]
+    frame_size = max(1, args.frame_size) if args.seekable else None
+    found = plan(args.target, args.idle_days)
+
+    results = {}
+    if not args.dry_run:
+        paths = [f for s in found["idle"] for f in s["files"]]
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {pool.submit(archive_file, f, args.format, level, frame_size, args.keep): f for f in paths}
+            for future in as_completed(futures):
+                f = futures[future]
+                try:
+                    results[f] = future.result()
+                except (OSError, ValueError) as e:
+                    print(f"Skipping {f}: {e}", file=sys.stderr)
+    for s in found["idle"]:
+        done = [results[f] for f in s["files"] if f in results]
+        s["compressed"] = sum(r["compressed"] for r in done) + sum(
+            Path(f).stat().st_size for f in s["files"] if f not in results and Path(f).exists())
+        s["archived"] = [r["archive"] for r in done]
+
+    if args.json:
+        print(json.dumps({"target": args.target, "format": args.format, "seekable": args.seekable,
+                          "dry_run": args.dry_run, **found}, indent=2))
+        return
+    render(args, found, len(results))
+
+
+def render(args, found: dict, archived: int):
+    before = sum(s["bytes"] for s in found["idle"])
+    after = sum(s["compressed"] for s in found["idle"])
+    print(f"ARCHIVE: {args.target}")
+    print("=" * 50)
+    print(f"Sessions:          {found['sessions']} ({found['active']} active in the last {args.idle_days:g} days, "
+          f"{found['archived']} already archived)")
+    print(f"Idle:              {len(found['idle'])} sessions, {sum(len(s['files']) for s in found['idle'])} "
+          f"transcripts, {before:,} bytes")
+    if args.dry_run:
+        print("Dry run:           nothing compressed")
+    else:
+        layout = "seekable frames" if args.seekable else "single stream"
+        print(f"Compressed:        {archived} transcripts to .{args.format} ({layout})")
+        print(f"Size:              {before:,} -> {after:,} bytes ({after * 100 // (before or 1)}%)")
+    print()
+
+    if found["idle"]:
+        print("IDLE SESSIONS (by size)")
+        print("-" * 50)
+        for s in sorted(found["idle"], key=lambda s: s["bytes"], reverse=True):
+            size = f"{s['bytes']:,}" if args.dry_run else f"{s['bytes']:,} -> {s['compressed']:,}"
+            print(f"  {s['project'][-30:]:30s} {s['session'][:36]:36s} {len(s['files']):3d} files  {size}")
+
+
+if __name__ == "__main__":
+    main()
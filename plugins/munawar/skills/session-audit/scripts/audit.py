@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Run several analyses over a session in a single pass.
+
+Usage:
+    python3 audit.py <session.jsonl> [--stats] [--errors] [--find PATTERN ...]
+                     [--only MODE ...] [--scope user|both|all] [--case-sensitive]
+                     [--max-len N] [--max-items N] [--subagents] [--json]
+
+The transcript is parsed once and every requested analysis is fed from the
+same stream, then the reports are printed together (or as one JSON object
+with --json). With no analysis flags, runs --stats --errors.
+
+--find and --only may be repeated. Options mirror stats.py, errors.py,
+find.py and only.py. --subagents runs the same analyses over each subagent
+transcript concurrently and adds a per-subagent rollup.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import render_session, rollup_of, run_session  # noqa: E402
+from _transcript import transcript_stem  # noqa: E402
+from errors import ErrorsAnalyzer  # noqa: E402
+from find import FindAnalyzer  # noqa: E402
+from only import MODES, OnlyAnalyzer  # noqa: E402
+from stats import StatsAnalyzer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several session analyses in one pass")
+    parser.add_argument("session_file", help="Path to session JSONL")
+    parser.add_argument("--stats", action="store_true", help="Session statistics (stats.py)")
+    parser.add_argument("--errors", action="store_true", help="Errors, retries, self-corrections (errors.py)")
+    parser.add_argument("--find", action="append", default=[], metavar="PATTERN", help="Regex search (find.py)")
+    parser.add_argument("--only", action="append", default=[], choices=MODES, metavar="MODE",
+                        help=f"Filter to one category (only.py): {', '.join(MODES)}")
+    parser.add_argument("--scope", choices=["user", "both", "all"], default="both", help="Scope for --find")
+    parser.add_argument("--case-sensitive", action="store_true", help="Make --find case-sensitive")
+    parser.add_argument("--max-len", type=int, help="Max snippet/content length (0=unlimited)")
+    parser.add_argument("--max-items", type=int, default=500, help="Max entries per --errors category and --only mode (0=unlimited)")
+    parser.add_argument("--subagents", action="store_true",
+                        help="Also analyse each subagent transcript, plus a per-subagent rollup")
+    parser.add_argument("--json", action="store_true", help="Emit all results as one JSON object")
+    args = parser.parse_args()
+
+    path = args.session_file
+    if not (args.stats or args.errors or args.find or args.only):
+        args.stats = args.errors = True
+
+    factories = []
+    if args.stats:
+        factories.append(StatsAnalyzer)
+    if args.errors:
+        factories.append(partial(ErrorsAnalyzer, max_items=args.max_items or None))
+    for pattern in args.find:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            print(f"Invalid regex {pattern!r}: {e}", file=sys.stderr)
+            sys.exit(1)
+        factories.append(partial(FindAnalyzer, patterns=[pattern], scope=args.scope, case_sensitive=args.case_sensitive,
+                                 max_len=300 if args.max_len is None else args.max_len))
+    for mode in args.only:
+        factories.append(partial(OnlyAnalyzer, mode=mode, max_len=500 if args.max_len is None else args.max_len,
+                                 max_items=args.max_items or None))
+
+    results = run_session(path, factories, args.subagents)
+
+    if args.json:
+        out = {"session": str(Path(path).resolve()), **json_results(results[0][2])}
+        if args.subagents:
+            out["subagents"] = [
+                {"source": label, "transcript": p, **json_results(analyzers)}
+                for label, p, analyzers in results[1:]
+            ]
+            out["rollup"] = {label: rollup_of(analyzers) for label, _, analyzers in results}
+        print(json.dumps(out, indent=2, default=str))
+        return
+
+    render_session(results)
+    print_session_location(path)
+
+
+def json_results(analyzers) -> dict:
+    out = {}
+    for a in analyzers:
+        if a.name in ("find", "only"):
+            out.setdefault(a.name, []).append(a.result())
+        elif a.name != "rollup":
+            out[a.name] = a.result()
+    return out
+
+
+def print_session_location(path: str):
+    p = Path(path).resolve()
+    session_dir = p.parent / transcript_stem(p)
+    print()
+    print("SESSION FILES")
+    print("-" * 50)
+    print(f"  Transcript: {p}")
+    if session_dir.is_dir():
+        print(f"  Session dir: {session_dir}/")
+        for item in sorted(session_dir.rglob("*")):
+            rel = item.relative_to(session_dir)
+            suffix = "/" if item.is_dir() else f"  ({item.stat().st_size:,} bytes)"
+            print(f"    {rel}{suffix}")
+    else:
+        print("  Session dir: (none — no subagents or artifacts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Attribute context growth to the tool results that caused it.
+
+Usage:
+    python3 bloat.py <session.jsonl> [--top 20] [--json] [--subagents]
+
+Measures every tool_result (what enters the model's context) and its
+toolUseResult payload (what the transcript stores alongside it), in
+characters and estimated tokens, and attributes each to the originating tool
+call and its input. Ranks the biggest contributors by tool, by call (the
+same command or file read repeatedly adds up), by turn, and individually.
+"""
+import argparse
+import json
+import os
+import sys
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, json_session, render_session, run_session  # noqa: E402
+from _records import extract_tool_result_text, summarize_tool_input  # noqa: E402
+from _transcript import transcript_stem  # noqa: E402
+
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1600  # roughly what a full-size image costs in context
+
+
+def estimate_tokens(chars: int, images: int = 0) -> int:
+    return chars // CHARS_PER_TOKEN + images * IMAGE_TOKENS
+
+
+class BloatAnalyzer(Analyzer):
+    """Size of every tool result, attributed to its tool call and input."""
+
+    name = "bloat"
+
+    def __init__(self, path: str, top: int = 20):
+        self.path = path
+        self.top = top
+        self.pending = {}  # tool_use_id -> (name, input summary, call line)
+        self.results = []  # [name, summary, call line, result line, turn, chars, images, raw chars]
+        self.record_results = []  # results of the record being fed, for its toolUseResult
+
+    def wants(self, e) -> bool:
+        return bool(e.calls or e.results)
+
+    def feed(self, e, r):
+        self.record_results = []
+        super().feed(e, r)
+
+    def on_tool_use(self, e, r, block):
+        name = block.get("name", "?")
+        summary = summarize_tool_input(name, block.get("input", {}))
+        self.pending[block.get("id", "")] = (name, " ".join(summary.split()), e.line)
+
+    def on_result(self, e, r, block):
+        name, summary, call_line = self.pending.pop(block.get("tool_use_id", ""), ("?", "", None))
+        content = block.get("content")
+        images = sum(1 for c in content if c.get("type") == "image") if isinstance(content, list) else 0
+        item = [name, summary, call_line, e.line, e.turn, len(extract_tool_result_text(block)), images, 0]
+        self.results.append(item)
+        self.record_results.append(item)
+
+    def on_raw_result(self, e, r, raw):
+        if self.record_results:
+            self.record_results[0][7] = len(raw) if isinstance(raw, str) else len(json.dumps(raw))
+
+    def result(self) -> dict:
+        def blank():
+            return {"results": 0, "chars": 0, "tokens": 0, "raw_chars": 0, "max_tokens": 0}
+
+        total = blank()
+        by_tool, by_call, by_turn = {}, {}, {}
+        for name, summary, _, _, turn, chars, images, raw in self.results:
+            tokens = estimate_tokens(chars, images)
+            for group in (total, by_tool.setdefault(name, blank()),
+                          by_call.setdefault((name, summary), blank()), by_turn.setdefault(turn, blank())):
+                group["results"] += 1
+                group["chars"] += chars
+                group["tokens"] += tokens
+                group["raw_chars"] += raw
+                group["max_tokens"] = max(group["max_tokens"], tokens)
+
+        def ranked(groups, limit=None):
+            return sorted(groups.items(), key=lambda kv: kv[1]["tokens"], reverse=True)[:limit]
+
+        largest = sorted(self.results, key=lambda x: estimate_tokens(x[5], x[6]), reverse=True)[:self.top]
+        return {
+            "tool_results": total["results"],
+            "chars": total["chars"],
+            "tokens": total["tokens"],
+            "raw_chars": total["raw_chars"],
+            "by_tool": dict(ranked(by_tool)),
+            "by_call": [{"tool": name, "input": summary, **g} for (name, summary), g in ranked(by_call, self.top)],
+            "by_turn": [{"turn": turn, **g} for turn, g in ranked(by_turn, self.top)],
+            "largest": [
+                {"tool": name, "input": summary, "call_line": call_line, "result_line": line, "turn": turn,
+                 "chars": chars, "images": images, "tokens": estimate_tokens(chars, images), "raw_chars": raw}
+                for name, summary, call_line, line, turn, chars, images, raw in largest
+            ],
+        }
+
+    def render(self):
+        res = self.result()
+        total = res["tokens"] or 1
+        print("CONTEXT BLOAT FROM TOOL RESULTS")
+        print("=" * 70)
+        print(f"Tool results:        {res['tool_results']}")
+        print(f"Into context:        {res['chars']:,} chars (~{res['tokens']:,} tokens)")
+        print(f"toolUseResult:       {res['raw_chars']:,} chars stored in the transcript")
+        print()
+        if not res["tool_results"]:
+            return
+
+        print("BY TOOL (by estimated tokens)")
+        print("-" * 70)
+        print(f"  {'tool':28s} {'results':>8s} {'tokens':>12s} {'share':>6s} {'largest':>10s}")
+        for name, g in res["by_tool"].items():
+            print(f"  {name[:28]:28s} {g['results']:8d} {g['tokens']:12,} {g['tokens'] * 100 // total:5d}% "
+                  f"{g['max_tokens']:10,}")
+        print()
+
+        if self.top:
+            print(f"BY CALL (top {len(res['by_call'])}, repeated calls summed)")
+            print("-" * 70)
+            for g in res["by_call"]:
+                print(f"  {g['tokens']:10,} tok  {g['results']:3d}x  {g['tool']}  {g['input'][:100]}")
+            print()
+
+            print(f"BY TURN (top {len(res['by_turn'])})")
+            print("-" * 70)
+            for g in res["by_turn"]:
+                print(f"  Turn {g['turn']:<5d} {g['tokens']:10,} tok in {g['results']} results "
+                      f"(largest {g['max_tokens']:,})")
+            print()
+
+            print(f"LARGEST RESULTS (top {len(res['largest'])})")
+            print("-" * 70)
+            for i, x in enumerate(res["largest"], 1):
+                images = f" + {x['images']} image(s)" if x["images"] else ""
+                print(f"  [{i}] {x['tokens']:,} tok ({x['chars']:,} chars{images})  {x['tool']}  "
+                      f"Turn {x['turn']} | Line {x['call_line']} -> {x['result_line']}")
+                if x["input"]:
+                    print(f"       {x['input'][:200]}")
+            print()
+            print("To inspect a result, run:")
+            scripts_dir = Path(__file__).resolve().parent
+            print(f"  python3 {scripts_dir}/context.py {self.path} <LINE> [radius]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Attribute context growth to tool results")
+    parser.add_argument("session_file", help="Path to session JSONL")
+    parser.add_argument("--top", type=int, default=20, help="Entries per ranking (0=totals only)")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    parser.add_argument(
+        "--subagents", action="store_true", help="Also analyse each subagent transcript, plus a per-subagent rollup"
+    )
+    args = parser.parse_args()
+
+    results = run_session(args.session_file, [partial(BloatAnalyzer, top=args.top)], args.subagents)
+    if args.json:
+        print(json.dumps(json_session(results), indent=2))
+        return
+
+    render_session(results)
+    print_session_location(args.session_file)
+
+
+def print_session_location(path: str):
+    p = Path(path).resolve()
+    session_dir = p.parent / transcript_stem(p)
+    print()
+    print("SESSION FILES")
+    print("-" * 50)
+    print(f"  Transcript: {p}")
+    if session_dir.is_dir():
+        print(f"  Session dir: {session_dir}/")
+        for item in sorted(session_dir.rglob("*")):
+            rel = item.relative_to(session_dir)
+            suffix = "/" if item.is_dir() else f"  ({item.stat().st_size:,} bytes)"
+            print(f"    {rel}{suffix}")
+    else:
+        print("  Session dir: (none — no subagents or artifacts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Prompt-cache efficiency of a session: where the cache was missed and why.
+
+Usage:
+    python3 cache.py <session.jsonl> [--top 20] [--spike 20000] [--json] [--subagents]
+
+For every model response, compares the prompt prefix cached by the previous
+response (its cache read + cache creation) with what this one read back:
+  - invalidated: the read fell short, so the prefix was written to the cache
+    again — those tokens are the extra cost (a cache write is billed at
+    1.25x base input, a read at 0.1x)
+  - spike: cache creation above --spike tokens without a miss (new content)
+
+Each flagged response lists what happened since the previous one: compaction,
+other system records, an idle gap longer than the 5-minute cache TTL, large
+tool results. Also reports the hit ratio (cache read / total input) overall
+and per turn. Works from the sidecar index alone — no record is decoded.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, json_session, render_session, run_session  # noqa: E402
+from _records import fmt_duration, parse_ts  # noqa: E402
+from _transcript import transcript_stem  # noqa: E402
+
+CACHE_WRITE_RATE = 1.25  # cache write price, relative to base input tokens
+CACHE_READ_RATE = 0.1
+CACHE_TTL_S = 300
+LARGE_RESULT_BYTES = 20000
+MIN_MISS_TOKENS = 1024  # smallest cacheable prefix; smaller shortfalls are noise
+
+
+class CacheAnalyzer(Analyzer):
+    """Cache hit ratio per turn, and responses whose cache was invalidated
+    or whose cache creation spiked, with the events preceding them."""
+
+    name = "cache"
+
+    def __init__(self, path: str, top: int = 20, spike: int = 20000):
+        self.path = path
+        self.top = top
+        self.spike = spike
+        self.tools = {}          # tool_use_id -> tool name, until its result arrives
+        self.events = []         # (cause, description) of what happened since the previous response
+        self.msg_id = None
+        self.cached = None       # prefix cached by the previous response
+        self.prev_ts = None      # ts of the previous response's last record
+        self.responses = 0
+        self.totals = [0, 0, 0]  # input, cache read, cache create
+        self.turns = {}          # turn -> [responses, input, read, create]
+        self.flagged = []
+
+    def wants(self, e) -> bool:
+        if e.type == "assistant" and e.msg_id:
+            if e.msg_id == self.msg_id:
+                self.prev_ts = e.ts or self.prev_ts
+            elif e.usage and any(e.usage):
+                self._response(e)
+            for tid, name in e.calls:
+                self.tools[tid] = name
+        elif e.type == "system":
+            if e.subtype == "compact_boundary":
+                self.events.append(("compaction", f"compaction (line {e.line})"))
+            else:
+                self.events.append(("system record", f"system: {e.subtype or '?'} (line {e.line})"))
+        elif e.results:
+            for tid, _, _ in e.results:
+                name = self.tools.pop(tid, "?")
+                if e.length >= LARGE_RESULT_BYTES:
+                    self.events.append(("large tool result",
+                                        f"large tool result: {name} ({e.length // 1024} KB, line {e.line})"))
+        return False
+
+    def _response(self, e):
+        self.responses += 1
+        inp, _, read, create = e.usage
+        self.totals = [a + b for a, b in zip(self.totals, (inp, read, create))]
+        turn = self.turns.setdefault(e.turn, [0, 0, 0, 0])
+        turn[0] += 1
+        for i, n in enumerate((inp, read, create), 1):
+            turn[i] += n
+
+        start, prev = parse_ts(e.ts), parse_ts(self.prev_ts)
+        if start and prev and (start - prev).total_seconds() > CACHE_TTL_S:
+            idle = fmt_duration((start - prev).total_seconds())
+            self.events.append(("idle over cache TTL", f"idle {idle} (over the {CACHE_TTL_S // 60}-minute cache TTL)"))
+        missed = 0
+        if self.cached is not None:
+            # Tokens of the previous prefix that had to be cached again
+            missed = min(self.cached, inp + read + create) - read
+            missed = missed if missed >= MIN_MISS_TOKENS else 0
+        if missed or (self.cached is not None and create >= self.spike):
+            self.flagged.append({
+                "line": e.line,
+                "turn": e.turn,
+                "ts": e.ts,
+                "kind": "invalidated" if missed else "spike",
+                "previously_cached": self.cached,
+                "cache_read": read,
+                "cache_create": create,
+                "extra_tokens": missed,
+                "extra_cost_input_tokens": round(missed * (CACHE_WRITE_RATE - CACHE_READ_RATE)),
+                "causes": sorted({cause for cause, _ in self.events}) or ["none recorded"],
+                "events": [text for _, text in self.events],
+            })
+        self.events = []
+        self.msg_id = e.msg_id
+        self.cached = read + create
+        self.prev_ts = e.ts
+
+    def result(self) -> dict:
+        def ratio(inp, read, create):
+            total = inp + read + create
+            return read / total if total else 0.0
+
+        causes = defaultdict(lambda: [0, 0])  # cause -> responses, extra tokens
+        for f in self.flagged:
+            for cause in f["causes"]:
+                causes[cause][0] += 1
+                causes[cause][1] += f["extra_tokens"]
+        kinds = Counter(f["kind"] for f in self.flagged)
+        extra = sum(f["extra_tokens"] for f in self.flagged)
+        return {
+            "responses": self.responses,
+            "input": self.totals[0],
+            "cache_read": self.totals[1],
+            "cache_create": self.totals[2],
+            "hit_ratio": ratio(*self.totals),
+            "invalidations": kinds["invalidated"],
+            "spikes": kinds["spike"],
+            "extra_tokens": extra,
+            "extra_cost_input_tokens": round(extra * (CACHE_WRITE_RATE - CACHE_READ_RATE)),
+            "by_cause": {k: {"responses": n, "extra_tokens": t}
+                         for k, (n, t) in sorted(causes.items(), key=lambda kv: kv[1][1], reverse=True)},
+            "by_turn": {turn: {"responses": n, "input": i, "cache_read": r, "cache_create": c,
+                               "hit_ratio": ratio(i, r, c)}
+                        for turn, (n, i, r, c) in sorted(self.turns.items())},
+            "flagged": self.flagged,
+        }
+
+    def render(self):
+        res = self.result()
+        print("PROMPT CACHE")
+        print("=" * 70)
+        print(f"Responses:           {res['responses']}")
+        print(f"Hit ratio:           {res['hit_ratio']:.1%} (cache read / all input tokens)")
+        print(f"  Input tokens:      {res['input']:,}")
+        print(f"  Cache read:        {res['cache_read']:,}")
+        print(f"  Cache created:     {res['cache_create']:,}")
+        print(f"Invalidations:       {res['invalidations']}")
+        print(f"Creation spikes:     {res['spikes']} (>= {self.spike:,} tokens created without a miss)")
+        print(f"Prefix re-cached:    {res['extra_tokens']:,} tokens "
+              f"(~{res['extra_cost_input_tokens']:,} input-token equivalents extra)")
+        print()
+
+        if res["by_cause"]:
+            print("FLAGGED RESPONSES BY PRECEDING EVENT")
+            print("-" * 70)
+            print(f"  {'event':28s} {'responses':>10s} {'re-cached tokens':>18s}")
+            for cause, c in res["by_cause"].items():
+                print(f"  {cause:28s} {c['responses']:10d} {c['extra_tokens']:18,}")
+            print()
+
+        low = sorted((t for t in res["by_turn"].items() if t[1]["responses"] > 1),
+                     key=lambda kv: kv[1]["hit_ratio"])[:10]
+        if low:
+            print("LOWEST HIT RATIO TURNS (turns with 2+ responses)")
+            print("-" * 70)
+            print(f"  {'turn':>6s} {'responses':>10s} {'hit ratio':>10s} {'cache read':>12s} {'created':>12s}")
+            for turn, t in low:
+                print(f"  {turn:6d} {t['responses']:10d} {t['hit_ratio']:10.1%} {t['cache_read']:12,} "
+                      f"{t['cache_create']:12,}")
+            print()
+
+        worst = sorted(res["flagged"], key=lambda f: (f["extra_tokens"], f["cache_create"]), reverse=True)
+        if worst and self.top:
+            print(f"FLAGGED RESPONSES (top {min(self.top, len(worst))} by re-cached tokens)")
+            print("-" * 70)
+            for i, f in enumerate(worst[:self.top], 1):
+                detail = (f"{f['extra_tokens']:,} of {f['previously_cached']:,} cached tokens re-written"
+                          if f["kind"] == "invalidated" else f"{f['cache_create']:,} tokens created")
+                print(f"  [{i}] {f['kind']}  Turn {f['turn']} | Line {f['line']} | {detail}")
+                for ev in f["events"] or ["(no compaction, system record, idle gap or large result)"]:
+                    print(f"       after: {ev}")
+            print()
+            print("To inspect what preceded a response, run:")
+            scripts_dir = Path(__file__).resolve().parent
+            print(f"  python3 {scripts_dir}/context.py {self.path} <LINE> [radius]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt-cache efficiency of a session")
+    parser.add_argument("session_file", help="Path to session JSONL")
+    parser.add_argument("--top", type=int, default=20, help="Flagged responses to list (0=none)")
+    parser.add_argument("--spike", type=int, default=20000,
+                        help="Cache creation (tokens) that flags a response even without a miss (default: 20000)")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    parser.add_argument(
+        "--subagents", action="store_true", help="Also analyse each subagent transcript, plus a per-subagent rollup"
+    )
+    args = parser.parse_args()
+
+    results = run_session(args.session_file, [partial(CacheAnalyzer, top=args.top, spike=args.spike)],
+                          args.subagents)
+    if args.json:
+        print(json.dumps(json_session(results), indent=2))
+        return
+
+    render_session(results)
+    print_session_location(args.session_file)
+
+
+def print_session_location(path: str):
+    p = Path(path).resolve()
+    session_dir = p.parent / transcript_stem(p)
+    print()
+    print("SESSION FILES")
+    print("-" * 50)
+    print(f"  Transcript: {p}")
+    if session_dir.is_dir():
+        print(f"  Session dir: {session_dir}/")
+        for item in sorted(session_dir.rglob("*")):
+            rel = item.relative_to(session_dir)
+            suffix = "/" if item.is_dir() else f"  ({item.stat().st_size:,} bytes)"
+            print(f"    {rel}{suffix}")
+    else:
+        print("  Session dir: (none — no subagents or artifacts)")
+
+
+if __name__ == "__main__":
+    main()
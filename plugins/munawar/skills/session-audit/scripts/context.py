@@ -9,12 +9,21 @@ rendering each as a readable summary. Useful for investigating errors
 found by errors.py.
 
 The target line is highlighted with >>> markers.
+
+The index is used to seek straight to the window; without it the file is
+streamed once, keeping only the last `radius` records in memory.
 """
 import json
+import os
 import sys
 import textwrap
+from collections import deque
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(__file__))
+from _index import entries_from_line, index_enabled, loads, peek, read_record  # noqa: E402
+from _transcript import open_transcript, transcript_stem  # noqa: E402
+
 
 def summarize_tool_input(name: str, inp: dict) -> str:
     if name == "Bash":
@@ -124,6 +133,81 @@ def render_record(line_num: int, r: dict, is_target: bool) -> list[str]:
     return out
 
 
+def seek_window(path: str, target_line: int, radius: int):
+    """Read only the records around the target, located via the index.
+
+    Progress records are skipped for the window, but the target is kept
+    even if it is one. Returns [(line_num, record)] or None.
+    """
+    after = []
+    for e in entries_from_line(path, target_line):
+        if not after:
+            if e.line != target_line:
+                return None
+            after.append(e)
+        elif len(after) > radius:
+            break
+        elif e.type != "progress":
+            after.append(e)
+    if not after:
+        return None
+
+    # Look back far enough to find `radius` non-progress records
+    before = []
+    span = 4 * radius + 16
+    while radius:
+        first = max(1, target_line - span)
+        before = []
+        for e in entries_from_line(path, first):
+            if e.line >= target_line:
+                break
+            if e.type != "progress":
+                before.append(e)
+        if len(before) >= radius or first == 1:
+            break
+        span *= 4
+    window = (before[-radius:] if radius else []) + after
+
+    with open_transcript(path) as f:
+        return [(e.line, read_record(f, e)) for e in window]
+
+
+def record_type(line: bytes) -> str:
+    peeked = peek(line)
+    return peeked[0] if peeked else loads(line).get("type")
+
+
+def stream_window(path: str, target_line: int, radius: int):
+    """Single pass keeping only a ring buffer of the last `radius` records.
+
+    Lines are buffered raw; only the final window is decoded.
+    """
+    before = deque(maxlen=radius)
+    window = None
+    with open_transcript(path) as f:
+        for line_num, line in enumerate(f, 1):
+            if not line.endswith(b"\n"):
+                try:
+                    loads(line)
+                except ValueError:
+                    break  # last line is still being written
+            if window is None and line_num < target_line:
+                if record_type(line) != "progress":
+                    before.append((line_num, line))
+            elif window is None:
+                window = list(before) + [(line_num, line)]
+                remaining = radius
+            elif remaining:
+                if record_type(line) != "progress":
+                    window.append((line_num, line))
+                    remaining -= 1
+            else:
+                break
+    if window is None:
+        return None
+    return [(line_num, loads(line)) for line_num, line in window]
+
+
 def main():
     if len(sys.argv) < 3:
         print("Usage: context.py <session.jsonl> <line_number> [radius]", file=sys.stderr)
@@ -134,55 +218,20 @@ def main():
     target_line = int(sys.argv[2])
     radius = int(sys.argv[3]) if len(sys.argv) > 3 else 3
 
-    # Load all records, skipping progress for context window purposes
-    records = []  # (line_num, parsed_json)
-    with open(path) as f:
-        for line_num, line in enumerate(f, 1):
-            r = json.loads(line)
-            records.append((line_num, r))
-
-    # Find target index (by line number)
-    target_idx = None
-    for i, (ln, _) in enumerate(records):
-        if ln == target_line:
-            target_idx = i
-            break
+    if index_enabled():
+        window = seek_window(path, target_line, radius)
+    else:
+        window = stream_window(path, target_line, radius)
 
-    if target_idx is None:
+    if window is None:
         print(f"Line {target_line} not found in {path}", file=sys.stderr)
         sys.exit(1)
 
-    # Filter out progress records for context, but keep target even if progress
-    meaningful = [(i, ln, r) for i, (ln, r) in enumerate(records) if r.get("type") != "progress" or i == target_idx]
-
-    # Find target in meaningful list
-    target_mi = None
-    for mi, (i, ln, r) in enumerate(meaningful):
-        if i == target_idx:
-            target_mi = mi
-            break
-
-    if target_mi is None:
-        # Target was a progress record not in meaningful — add it
-        meaningful.append((target_idx, target_line, records[target_idx][1]))
-        meaningful.sort(key=lambda x: x[0])
-        for mi, (i, ln, r) in enumerate(meaningful):
-            if i == target_idx:
-                target_mi = mi
-                break
-
-    assert target_mi is not None, f"Could not locate line {target_line} in meaningful records"
-
-    # Extract window
-    start = max(0, target_mi - radius)
-    end = min(len(meaningful), target_mi + radius + 1)
-    window = meaningful[start:end]
-
     print(f"CONTEXT AROUND LINE {target_line} (radius={radius}, skipping progress records)")
     print("=" * 70)
     print()
 
-    for _, ln, r in window:
+    for ln, r in window:
         is_target = (ln == target_line)
         lines = render_record(ln, r, is_target)
         if lines:
@@ -196,7 +245,7 @@ def main():
 
 def print_session_location(path: str):
     p = Path(path).resolve()
-    session_dir = p.parent / p.stem
+    session_dir = p.parent / transcript_stem(p)
     print()
     print("SESSION FILES")
     print("-" * 50)
@@ -3,15 +3,25 @@
 
 Usage:
     python3 conversation.py <session.jsonl> [--no-thinking] [--no-tools] [--max-len 300]
+                            [--turns A-B] [--since TIMESTAMP] [--until TIMESTAMP]
 
 Outputs a readable transcript of the session: user messages, assistant text,
-thinking blocks, and tool calls with their results.
+thinking blocks, and tool calls with their results. --turns and
+--since/--until (UTC, any prefix of an ISO timestamp) render only a slice;
+the sidecar index is bisected to find it, so nothing before it is read.
 """
 import argparse
 import json
+import os
+import sys
 import textwrap
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(__file__))
+from _index import records, slice_range, timestamp_prefix, turn_range
+from _join import CallJoin
+from _transcript import transcript_stem
+
 
 def truncate(text: str, max_len: int) -> str:
     if max_len <= 0 or len(text) <= max_len:
@@ -19,90 +29,97 @@ def truncate(text: str, max_len: int) -> str:
     return text[:max_len] + f"... ({len(text)} chars)"
 
 
-def parse_session(path: str, show_thinking: bool, show_tools: bool, max_len: int):
-    with open(path) as f:
-        for line in f:
-            r = json.loads(line)
-            t = r.get("type")
-
-            if t == "user":
-                msg = r.get("message", {})
-                content = msg.get("content")
-                ts = r.get("timestamp", "")[:19]
-
-                if isinstance(content, str):
-                    print(f"\n{'='*70}")
-                    print(f"USER [{ts}]:")
-                    print(textwrap.indent(truncate(content, max_len), "  "))
-
-                elif isinstance(content, list) and show_tools:
-                    for block in content:
-                        if block.get("type") == "tool_result":
-                            tid = block.get("tool_use_id", "?")[:20]
-                            result_content = block.get("content", "")
-                            if isinstance(result_content, list):
-                                texts = [
-                                    c.get("text", "")
-                                    for c in result_content
-                                    if c.get("type") == "text"
-                                ]
-                                result_content = "\n".join(texts)
-                            is_err = block.get("is_error", False)
-                            prefix = "TOOL ERROR" if is_err else "TOOL RESULT"
-                            print(f"  {prefix} [{tid}]:")
-                            print(
-                                textwrap.indent(
-                                    truncate(str(result_content), max_len), "    "
-                                )
-                            )
+def parse_session(path: str, show_thinking: bool, show_tools: bool, max_len: int,
+                  start: int = 0, end: int | None = None):
+    # Progress, snapshot and system records never render — skip decoding them
+    def wanted(e):
+        return e.type == "assistant" or e.prompt or (show_tools and bool(e.results))
 
-            elif t == "assistant":
-                msg = r.get("message", {})
-                content = msg.get("content", [])
-                if not isinstance(content, list):
-                    continue
+    calls = CallJoin()  # pending tool calls, to name the tool on each result
+    for _, r in records(path, wanted, start, end):
+        t = r.get("type")
 
-                for block in content:
-                    bt = block.get("type")
+        if t == "user":
+            msg = r.get("message", {})
+            content = msg.get("content")
+            ts = r.get("timestamp", "")[:19]
 
-                    if bt == "thinking" and show_thinking:
-                        thinking = block.get("thinking", "")
-                        print(f"  THINKING:")
-                        print(
-                            textwrap.indent(truncate(thinking, max_len), "    ")
-                        )
+            if isinstance(content, str):
+                print(f"\n{'='*70}")
+                print(f"USER [{ts}]:")
+                print(textwrap.indent(truncate(content, max_len), "  "))
 
-                    elif bt == "text":
-                        text = block.get("text", "")
-                        print(f"  ASSISTANT:")
-                        print(textwrap.indent(truncate(text, max_len), "    "))
-
-                    elif bt == "tool_use" and show_tools:
-                        name = block.get("name", "?")
-                        inp = block.get("input", {})
-                        # Show key params compactly
-                        if name == "Bash":
-                            detail = inp.get("command", "")
-                        elif name == "Read":
-                            detail = inp.get("file_path", "")
-                        elif name == "Write":
-                            detail = inp.get("file_path", "")
-                        elif name == "Edit":
-                            detail = inp.get("file_path", "")
-                        elif name == "Grep":
-                            detail = f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
-                        elif name == "Glob":
-                            detail = f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
-                        elif name == "Agent":
-                            detail = f'type={inp.get("subagent_type","")} desc={inp.get("description","")}'
-                        else:
-                            detail = json.dumps(inp, separators=(",", ":"))
-
-                        print(f"  TOOL: {name}")
+            elif isinstance(content, list) and show_tools:
+                for block in content:
+                    if block.get("type") == "tool_result":
+                        tid = block.get("tool_use_id", "?")[:20]
+                        result_content = block.get("content", "")
+                        if isinstance(result_content, list):
+                            texts = [
+                                c.get("text", "")
+                                for c in result_content
+                                if c.get("type") == "text"
+                            ]
+                            result_content = "\n".join(texts)
+                        is_err = block.get("is_error", False)
+                        prefix = "TOOL ERROR" if is_err else "TOOL RESULT"
+                        call = calls.pop(block.get("tool_use_id", ""))
+                        name = f" ({call['name']})" if call else ""
+                        print(f"  {prefix} [{tid}]{name}:")
                         print(
-                            textwrap.indent(truncate(detail, max_len), "    ")
+                            textwrap.indent(
+                                truncate(str(result_content), max_len), "    "
+                            )
                         )
 
+        elif t == "assistant":
+            msg = r.get("message", {})
+            content = msg.get("content", [])
+            if not isinstance(content, list):
+                continue
+
+            for block in content:
+                bt = block.get("type")
+
+                if bt == "thinking" and show_thinking:
+                    thinking = block.get("thinking", "")
+                    print(f"  THINKING:")
+                    print(
+                        textwrap.indent(truncate(thinking, max_len), "    ")
+                    )
+
+                elif bt == "text":
+                    text = block.get("text", "")
+                    print(f"  ASSISTANT:")
+                    print(textwrap.indent(truncate(text, max_len), "    "))
+
+                elif bt == "tool_use" and show_tools:
+                    name = block.get("name", "?")
+                    inp = block.get("input", {})
+                    calls.add(block.get("id", ""), r.get("uuid"), {"name": name})
+                    # Show key params compactly
+                    if name == "Bash":
+                        detail = inp.get("command", "")
+                    elif name == "Read":
+                        detail = inp.get("file_path", "")
+                    elif name == "Write":
+                        detail = inp.get("file_path", "")
+                    elif name == "Edit":
+                        detail = inp.get("file_path", "")
+                    elif name == "Grep":
+                        detail = f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
+                    elif name == "Glob":
+                        detail = f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
+                    elif name == "Agent":
+                        detail = f'type={inp.get("subagent_type","")} desc={inp.get("description","")}'
+                    else:
+                        detail = json.dumps(inp, separators=(",", ":"))
+
+                    print(f"  TOOL: {name}")
+                    print(
+                        textwrap.indent(truncate(detail, max_len), "    ")
+                    )
+
 
 def main():
     parser = argparse.ArgumentParser(description="Session conversation transcript")
@@ -117,14 +134,23 @@ def main():
         default=500,
         help="Max chars per block (0=unlimited)",
     )
+    parser.add_argument("--turns", type=turn_range, metavar="A-B",
+                        help="Only turns A to B (A-, -B and A also work)")
+    parser.add_argument("--since", type=timestamp_prefix, metavar="TIMESTAMP",
+                        help="Only records at or after this time (UTC, e.g. 2026-01-31T14:05)")
+    parser.add_argument("--until", type=timestamp_prefix, metavar="TIMESTAMP",
+                        help="Only records up to this time, inclusive (UTC; 2026-01-31 covers the whole day)")
     args = parser.parse_args()
-    parse_session(args.session_file, not args.no_thinking, not args.no_tools, args.max_len)
+    start, end = 0, None
+    if args.turns or args.since or args.until:
+        start, end = slice_range(args.session_file, args.turns, args.since, args.until)
+    parse_session(args.session_file, not args.no_thinking, not args.no_tools, args.max_len, start, end)
     print_session_location(args.session_file)
 
 
 def print_session_location(path: str):
     p = Path(path).resolve()
-    session_dir = p.parent / p.stem
+    session_dir = p.parent / transcript_stem(p)
     print()
     print("SESSION FILES")
     print("-" * 50)
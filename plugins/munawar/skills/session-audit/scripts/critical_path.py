@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Critical path through a session's main and subagent timelines.
+
+Usage:
+    python3 critical_path.py <session.jsonl> [--width 60] [--json]
+
+Reads the main transcript and every subagent transcript (concurrently, one
+process each), links each Agent call to the subagent it spawned (by the
+agentId in its toolUseResult), and reports:
+  - the critical path: the main agent's own work, plus, for each batch of
+    overlapping Agent calls, the subagent that returned last (recursively)
+  - how long the main agent sat idle waiting on subagents
+  - the parallelism achieved: busy time across all agents / wall clock, and
+    the peak number of subagents running at once
+  - each subagent's span and slack (how much earlier it finished than the
+    one that gated its batch)
+  - a compact text Gantt chart
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, run_session  # noqa: E402
+from _records import fmt_duration, parse_ts  # noqa: E402
+from _transcript import transcript_stem  # noqa: E402
+
+AGENT_TOOLS = {"Agent", "Task"}
+
+
+class SpanAnalyzer(Analyzer):
+    """First/last timestamp of a transcript and the interval of each Agent
+    call it made, with the agent id the call's result names."""
+
+    name = "spans"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.first = None
+        self.last = None
+        self.calls = {}       # tool_use_id -> {"call", "result", "line", "agent", "desc"}
+        self.returned = []    # tool_use_ids of Agent results in the record being decoded
+
+    def wants(self, e) -> bool:
+        ts = parse_ts(e.ts)
+        if ts:
+            self.first = min(self.first, ts) if self.first else ts
+            self.last = max(self.last, ts) if self.last else ts
+        wanted = False
+        for tid, name in e.calls:
+            if name in AGENT_TOOLS:
+                self.calls[tid] = {"call": ts, "result": None, "line": e.line, "agent": None, "desc": ""}
+                wanted = True
+        self.returned = [tid for tid, _, _ in e.results if tid in self.calls]
+        for tid in self.returned:
+            self.calls[tid]["result"] = ts
+            wanted = True
+        return wanted
+
+    def on_tool_use(self, e, r, block):
+        call = self.calls.get(block.get("id", ""))
+        if call:
+            inp = block.get("input", {})
+            call["desc"] = inp.get("description") or inp.get("subagent_type", "")
+
+    def on_raw_result(self, e, r, raw):
+        if isinstance(raw, dict) and raw.get("agentId") and len(self.returned) == 1:
+            self.calls[self.returned[0]]["agent"] = f"agent-{raw['agentId']}"
+
+    def agent_calls(self) -> list[dict]:
+        """Calls that both started and returned, in call order."""
+        done = [c for c in self.calls.values() if c["call"] and c["result"]]
+        return sorted(done, key=lambda c: c["call"])
+
+
+def batches(calls: list[dict]) -> list[list[dict]]:
+    """Group calls whose intervals overlap (issued together or while others ran)."""
+    groups = []
+    for c in calls:
+        if groups and c["call"] <= max(g["result"] for g in groups[-1]):
+            groups[-1].append(c)
+        else:
+            groups.append([c])
+    return groups
+
+
+def critical_path(label: str, start, end, spans: dict, seen=()) -> list[list]:
+    """[source, start, end] segments: label's own time between batches, and
+    through each batch the call that returned last — into its subagent's own
+    critical path when its transcript is known."""
+    segments, cursor = [], start
+    for group in batches(spans[label].agent_calls()) if label not in seen else []:
+        gate = max(group, key=lambda c: c["result"])
+        if gate["result"] <= cursor or gate["call"] >= end:
+            continue
+        if gate["call"] > cursor:
+            segments.append([label, cursor, gate["call"]])
+        child = gate["agent"]
+        if child in spans:
+            segments += critical_path(child, max(cursor, gate["call"]), gate["result"], spans, (*seen, label))
+        else:
+            segments.append([f"{label}: {gate['desc'] or 'Agent'} (no transcript)",
+                             max(cursor, gate["call"]), gate["result"]])
+        cursor = gate["result"]
+    if end > cursor:
+        segments.append([label, cursor, end])
+
+    merged = []
+    for seg in segments:
+        if merged and merged[-1][0] == seg[0] and merged[-1][2] >= seg[1]:
+            merged[-1][2] = max(merged[-1][2], seg[2])
+        else:
+            merged.append(seg)
+    return merged
+
+
+def union_seconds(intervals: list[tuple]) -> float:
+    total, cur_start, cur_end = 0.0, None, None
+    for s, e in sorted(intervals):
+        if cur_end is None or s > cur_end:
+            if cur_end is not None:
+                total += (cur_end - cur_start).total_seconds()
+            cur_start, cur_end = s, e
+        else:
+            cur_end = max(cur_end, e)
+    if cur_end is not None:
+        total += (cur_end - cur_start).total_seconds()
+    return total
+
+
+def peak_concurrency(intervals: list[tuple]) -> int:
+    events = sorted([(s, 1) for s, _ in intervals] + [(e, -1) for _, e in intervals], key=lambda x: (x[0], x[1]))
+    peak = running = 0
+    for _, step in events:
+        running += step
+        peak = max(peak, running)
+    return peak
+
+
+def analyze(spans: dict) -> dict:
+    main = spans["main"]
+    if not main.first:
+        return {"wall_s": 0.0, "critical_path": [], "subagents": []}
+    subs = {label: a for label, a in spans.items() if label != "main" and a.first}
+    start = min([main.first] + [a.first for a in subs.values()])
+    end = max([main.last] + [a.last for a in subs.values()])
+    wall = (end - start).total_seconds()
+
+    main_calls = main.agent_calls()
+    waiting = union_seconds([(c["call"], c["result"]) for c in main_calls])
+    sub_intervals = [(a.first, a.last) for a in subs.values()]
+    sub_busy = sum((e - s).total_seconds() for s, e in sub_intervals)
+    # Busy: each agent's own span less its waits on Agent calls, plus the
+    # calls whose subagent has no transcript
+    busy = 0.0
+    for a in [main, *subs.values()]:
+        calls = a.agent_calls()
+        busy += (a.last - a.first).total_seconds() - union_seconds([(c["call"], c["result"]) for c in calls])
+        busy += sum((c["result"] - c["call"]).total_seconds() for c in calls if c["agent"] not in subs)
+
+    path = critical_path("main", start, end, spans)
+    on_path = {}
+    for label, s, e in path:
+        on_path[label] = on_path.get(label, 0.0) + (e - s).total_seconds()
+
+    # Slack: how much earlier each subagent returned than its batch's last one
+    slack = {}
+    for a in spans.values():
+        for group in batches(a.agent_calls()):
+            last = max(c["result"] for c in group)
+            for c in group:
+                if c["agent"]:
+                    slack[c["agent"]] = (last - c["result"]).total_seconds()
+
+    def iso(ts):
+        return ts.isoformat() if ts else None
+
+    return {
+        "start": iso(start),
+        "end": iso(end),
+        "wall_s": wall,
+        "main_waiting_s": waiting,
+        "main_active_s": wall - waiting,
+        "subagents_total_s": sub_busy,
+        "parallelism": busy / wall if wall else 0.0,
+        "peak_concurrent_subagents": peak_concurrency(sub_intervals),
+        "agent_calls": sum(len(a.calls) for a in spans.values()),
+        "critical_path": [{"source": label, "start": iso(s), "end": iso(e), "seconds": (e - s).total_seconds()}
+                          for label, s, e in path],
+        "critical_by_source": dict(sorted(on_path.items(), key=lambda kv: kv[1], reverse=True)),
+        "subagents": [
+            {"source": label, "transcript": a.path, "start": iso(a.first), "end": iso(a.last),
+             "seconds": (a.last - a.first).total_seconds(), "critical": label in on_path,
+             "slack_s": slack.get(label)}
+            for label, a in sorted(subs.items(), key=lambda kv: kv[1].first)
+        ],
+    }
+
+
+def render(res: dict, spans: dict, width: int):
+    print("CRITICAL PATH")
+    print("=" * 70)
+    wall = res["wall_s"]
+    if not wall:
+        print("No timestamps found.")
+        return
+    print(f"Wall clock:              {fmt_duration(wall)}")
+    print(f"Main agent active:       {fmt_duration(res['main_active_s'])}")
+    print(f"Main waiting on agents:  {fmt_duration(res['main_waiting_s'])} ({res['main_waiting_s'] * 100 / wall:.0f}%)")
+    print(f"Subagents:               {len(res['subagents'])} transcripts, {res['agent_calls']} Agent calls, "
+          f"{fmt_duration(res['subagents_total_s'])} total")
+    print(f"Parallelism achieved:    {res['parallelism']:.2f}x (busy time / wall clock), "
+          f"peak concurrency {res['peak_concurrent_subagents']}")
+    print()
+
+    print("ON THE CRITICAL PATH")
+    print("-" * 70)
+    for label, seconds in res["critical_by_source"].items():
+        print(f"  {label[:50]:50s} {fmt_duration(seconds):>9s} ({seconds * 100 / wall:.0f}%)")
+    print()
+
+    if res["subagents"]:
+        print("SUBAGENTS (by start)")
+        print("-" * 70)
+        print(f"  {'source':28s} {'span':>9s} {'slack':>9s}")
+        for s in res["subagents"]:
+            slack = fmt_duration(s["slack_s"]) if s["slack_s"] is not None else "-"
+            mark = "  *critical" if s["critical"] else ""
+            print(f"  {s['source'][:28]:28s} {fmt_duration(s['seconds']):>9s} {slack:>9s}{mark}")
+        print()
+
+    # Gantt: '#' running, '.' main waiting on subagents, '*' marks critical rows
+    start = parse_ts(res["start"])
+    scale = wall / width
+
+    def col(ts):
+        return min(width - 1, int((ts - start).total_seconds() / scale)) if scale else 0
+
+    print(f"TIMELINE (1 column = {fmt_duration(scale)}; # running, . main waiting on subagents)")
+    print("-" * 70)
+    main = spans["main"]
+    row = [" "] * width
+    for i in range(col(main.first), col(main.last) + 1):
+        row[i] = "#"
+    for c in main.agent_calls():
+        for i in range(col(c["call"]) + 1, col(c["result"])):
+            row[i] = "."
+    print(f"  * {'main':16s} |{''.join(row)}|")
+    for s in res["subagents"]:
+        a = spans[s["source"]]
+        row = [" "] * width
+        for i in range(col(a.first), col(a.last) + 1):
+            row[i] = "#"
+        print(f"  {'*' if s['critical'] else ' '} {s['source'][:16]:16s} |{''.join(row)}|")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Critical path through main and subagent timelines")
+    parser.add_argument("session_file", help="Path to the main session JSONL")
+    parser.add_argument("--width", type=int, default=60, help="Gantt chart width in columns (default: 60)")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    results = run_session(args.session_file, [SpanAnalyzer], subagents=True, jobs=args.jobs)
+    spans = {label: analyzers[0] for label, _, analyzers in results}
+    res = analyze(spans)
+    if args.json:
+        print(json.dumps({"session": str(Path(args.session_file).resolve()), **res}, indent=2))
+        return
+    render(res, spans, max(10, args.width))
+    print_session_location(args.session_file)
+
+
+def print_session_location(path: str):
+    p = Path(path).resolve()
+    session_dir = p.parent / transcript_stem(p)
+    print()
+    print("SESSION FILES")
+    print("-" * 50)
+    print(f"  Transcript: {p}")
+    if session_dir.is_dir():
+        print(f"  Session dir: {session_dir}/")
+        for item in sorted(session_dir.rglob("*")):
+            rel = item.relative_to(session_dir)
+            suffix = "/" if item.is_dir() else f"  ({item.stat().st_size:,} bytes)"
+            print(f"    {rel}{suffix}")
+    else:
+        print("  Session dir: (none — no subagents or artifacts)")
+
+
+if __name__ == "__main__":
+    main()
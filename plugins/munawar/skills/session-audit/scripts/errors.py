@@ -2,15 +2,39 @@
 """Find errors, retries, and self-corrections in a session.
 
 Usage:
-    python3 errors.py <session.jsonl>
+    python3 errors.py <session.jsonl> [--max-items N] [--similarity 0.6] [--retry-window 50] [--subagents]
 
 For each error shows: turn number, what tool was called, what input was given,
 and the error message returned.
+
+Retry loops: every tool call's input gets a MinHash signature. A call of
+the same tool (and file) as one at most --retry-window calls earlier, and
+--similarity alike, starts a loop that the earlier call represents; later
+calls join it while they are as alike to that first one, so a command re-run
+with a flag changed, or two attempts alternating, show up as one loop with
+the tool time and tokens its attempts took. A loop counts once it has
+LOOP_MIN_ATTEMPTS attempts. An LSH index over the window keeps this
+near-linear on sessions with tens of thousands of calls.
+
+Records are streamed one at a time. Tool calls are dropped once their result
+is seen, and at most --max-items entries per category are kept (the rest are
+only counted), so memory stays bounded on very large sessions.
 """
+import argparse
 import json
+import os
 import sys
+from functools import partial
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, render_session, run_session
+from _index import load_summary, save_summary
+from _join import CallJoin
+from _records import command_body, fmt_duration, parse_ts, summarize_tool_input
+from _similar import NearDuplicates, signature, similarity
+from _transcript import transcript_stem
+
 
 CORRECTION_PHRASES = [
     "let me try",
@@ -25,177 +49,404 @@ CORRECTION_PHRASES = [
     "wrong approach",
     "let me correct",
 ]
+RETRY_TEXT_MAX = 1000  # characters of a call's input that go into its signature
+LOOP_MIN_ATTEMPTS = 3  # a call and two near-duplicate re-runs
+LOOP_TOTALS = ("loops", "attempts", "seconds", "output_tokens", "context_tokens")
 
 
-def summarize_tool_input(name: str, inp: dict) -> str:
-    """One-line summary of what a tool call attempted."""
+def retry_key(name: str, inp: dict) -> tuple[str, str]:
+    """(group, text) a call is compared by: calls on different files are
+    never retries of each other, so the file joins the tool in the group,
+    and a Bash command's `cd`/environment prefix is left out of the text."""
     if name == "Bash":
-        return inp.get("command", "")[:200]
-    elif name == "Read":
-        return inp.get("file_path", "")
-    elif name == "Write":
-        return inp.get("file_path", "")
-    elif name == "Edit":
-        fp = inp.get("file_path", "")
-        old = inp.get("old_string", "")[:80]
-        return f"{fp}  old_string={old!r}"
-    elif name == "Grep":
-        return f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
-    elif name == "Glob":
-        return f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
-    elif name == "Agent":
-        return f'type={inp.get("subagent_type","")} desc={inp.get("description","")}'
+        text = command_body(str(inp.get("command", "")))
     else:
-        return json.dumps(inp, separators=(",", ":"))[:200]
+        rest = {k: v for k, v in inp.items() if k != "file_path"}
+        text = json.dumps(rest, sort_keys=True, separators=(",", ":"))
+    group = f"{name} {inp.get('file_path', '')}".rstrip()
+    return group, " ".join(str(text).split())[:RETRY_TEXT_MAX]
 
 
-def main():
-    path = sys.argv[1] if len(sys.argv) > 1 else None
-    if not path:
-        print("Usage: errors.py <session.jsonl>", file=sys.stderr)
-        sys.exit(1)
-
-    # First pass: index all tool calls by their tool_use_id
-    # and build a turn counter (each user text message = new turn)
-    tool_calls_by_id = {}  # tool_use_id -> {name, input, line, turn}
-    tool_errors = []
-    corrections = []
-    tool_call_sequence = []  # (name, sig, line, turn) for retry detection
-    turn = 0
-
-    lines = []
-    with open(path) as f:
-        lines = f.readlines()
-
-    for line_num, line in enumerate(lines, 1):
-        r = json.loads(line)
-        t = r.get("type")
-
-        if t == "user":
-            msg = r.get("message", {})
-            content = msg.get("content")
-
-            # Count turns by human text messages
-            if isinstance(content, str):
-                turn += 1
-
-            # Collect tool errors from tool_result blocks
-            if isinstance(content, list):
-                for block in content:
-                    if block.get("is_error"):
-                        tid = block.get("tool_use_id", "?")
-                        result = block.get("content", "")
-                        if isinstance(result, list):
-                            result = " ".join(
-                                c.get("text", "") for c in result if c.get("type") == "text"
-                            )
-                        # Look up the originating tool call
-                        call = tool_calls_by_id.get(tid, {})
-                        tool_errors.append({
-                            "line": line_num,
-                            "turn": turn,
-                            "tool_use_id": tid,
-                            "tool_name": call.get("name", "?"),
-                            "tool_input": call.get("input_summary", "?"),
-                            "call_line": call.get("line"),
-                            "error": str(result)[:400],
-                        })
-
-            # toolUseResult records don't carry is_error — real errors
-            # surface through content blocks with is_error=true (handled above).
-            # Keyword-matching toolUseResult.stdout causes false positives when
-            # output merely *discusses* errors (e.g. auditing another session).
-
-        elif t == "assistant":
-            msg = r.get("message", {})
-            for block in msg.get("content", []):
-                bt = block.get("type")
-
-                if bt == "text":
-                    text_lower = block.get("text", "").lower()
-                    for phrase in CORRECTION_PHRASES:
-                        if phrase in text_lower:
-                            corrections.append({
-                                "line": line_num,
-                                "turn": turn,
-                                "phrase": phrase,
-                                "context": block["text"][:200],
-                            })
-                            break
-
-                elif bt == "tool_use":
-                    name = block.get("name", "?")
-                    inp = block.get("input", {})
-                    tid = block.get("id", "")
-                    input_summary = summarize_tool_input(name, inp)
-
-                    tool_calls_by_id[tid] = {
-                        "name": name,
-                        "input_summary": input_summary,
-                        "line": line_num,
-                        "turn": turn,
-                    }
-
-                    # For retry detection
-                    if name == "Bash":
-                        sig = inp.get("command", "")[:100]
-                    else:
-                        sig = json.dumps(inp, sort_keys=True, separators=(",", ":"))[:100]
-                    tool_call_sequence.append((name, sig, line_num, turn))
-
-    # Detect retries: same tool+similar input called consecutively
-    retries = []
-    for i in range(1, len(tool_call_sequence)):
-        prev_name, prev_sig, _, _ = tool_call_sequence[i - 1]
-        curr_name, curr_sig, curr_line, curr_turn = tool_call_sequence[i]
-        if curr_name == prev_name and curr_sig == prev_sig:
-            retries.append({
-                "line": curr_line,
-                "turn": curr_turn,
-                "tool": curr_name,
-                "input": curr_sig[:150],
+def loop_cost(loop: dict) -> tuple:
+    return loop["context_tokens"] + loop["output_tokens"], loop["seconds"]
+
+
+class ErrorsAnalyzer(Analyzer):
+    """Tool errors (with their originating call), exact retries, retry
+    loops of similar calls and self-corrections.
+
+    Resumes from the state saved by the previous run, so a growing session
+    only has its newly appended records analysed. Tool calls are dropped
+    once their result is seen and at most `max_items` entries are kept per
+    category, so memory stays bounded.
+    """
+
+    name = "errors"
+    # Thinking blocks and toolUseResult payloads are never read
+    fields = {
+        "type": True, "uuid": True,
+        "message": {"content": [{"type": True, "text": True, "id": True, "name": True, "input": True,
+                                 "tool_use_id": True, "is_error": True, "content": True}]},
+    }
+
+    def __init__(self, path: str, max_items: int | None = 500, similarity: float = 0.6, window: int = 50):
+        self.path = path
+        self.max_items = max_items
+        self.retry_params = [similarity, window, LOOP_MIN_ATTEMPTS]
+        saved = load_summary(path, "errors") or {}
+        if saved and saved.get("truncated") and (max_items is None or max_items > saved["max_items"]):
+            saved = {}  # entries beyond the old cap were dropped — start over
+        if saved.get("retry_params") != self.retry_params:
+            saved = {}  # loops were clustered with other settings
+        self.start = saved.get("offset", 0)
+        self.tool_calls = CallJoin(saved.get("tool_calls_by_id"))  # pending {name, input_summary, line, turn}
+        self.tool_errors = saved.get("tool_errors", [])[:max_items]
+        self.corrections = saved.get("corrections", [])[:max_items]
+        self.retries = saved.get("retries", [])[:max_items]
+        self.counts = saved.get("counts", {"tool_errors": 0, "retries": 0, "corrections": 0})
+        self.prev_call = saved.get("prev_call")  # (name, sig) of the last tool call, for retry detection
+        self.similar = NearDuplicates(similarity, window, saved.get("similar"))
+        # Calls still in the window or awaiting their result, by call number:
+        # {line, turn, ts, message, tool_use_id, input, seconds, error, output_tokens, context_tokens, loop}
+        self.attempts = {int(k): v for k, v in saved.get("attempts", {}).items()}
+        self.awaiting = saved.get("awaiting", {})  # tool_use_id -> call number
+        # Loops a call in the window can still join, and the max_items costliest
+        # finished ones, by their first call's number
+        self.loops = {int(k): v for k, v in saved.get("loops", {}).items()}
+        self.dropped = saved.get("dropped", dict.fromkeys(LOOP_TOTALS, 0))  # totals of finished loops not kept
+
+    def keep(self, kind: str, item: dict):
+        self.counts[kind] += 1
+        items = getattr(self, kind)
+        if self.max_items is None or len(items) < self.max_items:
+            items.append(item)
+
+    def wants(self, e) -> bool:
+        # Only assistant records and tool results flagged is_error matter here;
+        # the index lets us skip progress records and successful tool output.
+        # A call whose result came back clean can never be reported, so it is
+        # evicted as soon as the index shows that result.
+        failed = False
+        for tid, is_error, _ in e.results:
+            if is_error:
+                failed = True
+            else:
+                self.tool_calls.discard(tid)
+            if tid in self.awaiting:
+                self.attempt_done(self.awaiting.pop(tid), e.ts, is_error)
+        return e.type == "assistant" or failed
+
+    def on_result(self, e, r, block):
+        if not block.get("is_error"):
+            return
+        tid = block.get("tool_use_id", "?")
+        result = block.get("content", "")
+        if isinstance(result, list):
+            result = " ".join(
+                c.get("text", "") for c in result if c.get("type") == "text"
+            )
+        # Look up (and release) the originating tool call
+        call = self.tool_calls.pop(tid) or {}
+        self.keep("tool_errors", {
+            "line": e.line,
+            "turn": e.turn,
+            "tool_use_id": tid,
+            "tool_name": call.get("name", "?"),
+            "tool_input": call.get("input_summary", "?"),
+            "call_line": call.get("line"),
+            "error": str(result)[:400],
+        })
+
+    # toolUseResult records don't carry is_error — real errors
+    # surface through content blocks with is_error=true (handled above).
+    # Keyword-matching toolUseResult.stdout causes false positives when
+    # output merely *discusses* errors (e.g. auditing another session).
+
+    def on_text(self, e, r, block):
+        text_lower = block.get("text", "").lower()
+        for phrase in CORRECTION_PHRASES:
+            if phrase in text_lower:
+                self.keep("corrections", {
+                    "line": e.line,
+                    "turn": e.turn,
+                    "phrase": phrase,
+                    "context": block["text"][:200],
+                })
+                break
+
+    def on_tool_use(self, e, r, block):
+        name = block.get("name", "?")
+        inp = block.get("input", {})
+        tid = block.get("id", "")
+        self.tool_calls.add(tid, r.get("uuid"), {
+            "name": name,
+            "input_summary": summarize_tool_input(name, inp),
+            "line": e.line,
+            "turn": e.turn,
+        })
+
+        self.track_attempt(e, tid, *retry_key(name, inp))
+
+        # Detect retries: same tool+similar input called consecutively
+        if name == "Bash":
+            sig = inp.get("command", "")[:100]
+        else:
+            sig = json.dumps(inp, sort_keys=True, separators=(",", ":"))[:100]
+        if self.prev_call == [name, sig]:
+            self.keep("retries", {
+                "line": e.line,
+                "turn": e.turn,
+                "tool": name,
+                "input": sig[:150],
             })
+        self.prev_call = [name, sig]
+
+    def track_attempt(self, e, tid: str, group: str, text: str):
+        """Index a call's signature and add it to the loop of a similar call
+        in the window, if any."""
+        sig = signature(text)
+        idx, similar = self.similar.add(group, sig)
+        # Calls of one message were issued together, before any of their results
+        similar = [j for j in similar if e.msg_id is None or self.attempts[j]["message"] != e.msg_id]
+        usage = [u // len(e.calls) for u in e.usage] if e.usage and e.calls else [0, 0, 0, 0]
+        self.attempts[idx] = {
+            "line": e.line, "turn": e.turn, "ts": e.ts, "message": e.msg_id, "tool_use_id": tid, "input": text[:200],
+            "seconds": None, "error": False,
+            "output_tokens": usage[1], "context_tokens": usage[0] + usage[2] + usage[3], "loop": None,
+        }
+        self.awaiting[tid] = idx
+        if similar:
+            self.join_loop(idx, sig, similar, group)
+        old = idx - self.similar.window  # leaves the window with the next call
+        if old in self.attempts and self.attempts[old]["tool_use_id"] not in self.awaiting:
+            self.retire(old)
+
+    def join_loop(self, idx: int, sig: list[int], similar: list[int], group: str):
+        """Add call idx to the loop of a similar call whose first call it is
+        most like, or else start a loop from the earliest similar call in
+        none. A call is only ever compared with a loop's first call, so a
+        loop can't drift from one command to another through its members."""
+        best, best_sim = None, self.similar.threshold
+        for lid in sorted({self.attempts[j]["loop"] for j in similar} - {None}):
+            sim = similarity(sig, self.loops[lid]["sig"])
+            if sim > best_sim or (best is None and sim == best_sim):
+                best, best_sim = lid, sim
+        if best is None:
+            free = [j for j in similar if self.attempts[j]["loop"] is None]
+            if not free:
+                return
+            best = free[0]
+            self.loops[best] = {"tool": group, "input": "", "attempts": 0, "errors": 0,
+                                "first_line": None, "first_turn": None, "last_line": None, "last_turn": None,
+                                "start": None, "end": None, "seconds": 0.0,
+                                "output_tokens": 0, "context_tokens": 0, "lines": [],
+                                "sig": self.similar.sigs[best], "live": 0}
+            self.add_attempt(best, self.attempts[best])
+        self.add_attempt(best, self.attempts[idx])
+
+    def add_attempt(self, lid: int, a: dict):
+        loop = self.loops[lid]
+        a["loop"] = lid
+        loop["live"] += 1
+        loop["attempts"] += 1
+        loop["errors"] += a["error"]
+        loop["output_tokens"] += a["output_tokens"]
+        loop["context_tokens"] += a["context_tokens"]
+        loop["seconds"] += a["seconds"] or 0.0
+        if loop["first_line"] is None or a["line"] < loop["first_line"]:
+            loop["first_line"], loop["first_turn"], loop["input"] = a["line"], a["turn"], a["input"]
+        if loop["last_line"] is None or a["line"] > loop["last_line"]:
+            loop["last_line"], loop["last_turn"] = a["line"], a["turn"]
+        if a["ts"] and (loop["start"] is None or a["ts"] < loop["start"]):
+            loop["start"] = a["ts"]
+        if a["ts"] and (loop["end"] is None or a["ts"] > loop["end"]):
+            loop["end"] = a["ts"]
+        if len(loop["lines"]) < 20:
+            loop["lines"].append(a["line"])
+
+    def attempt_done(self, idx: int, ts: str, is_error: bool):
+        """Time a call's attempt by its result and add it to its loop."""
+        a = self.attempts[idx]
+        start, end = parse_ts(a["ts"]), parse_ts(ts)
+        a["seconds"] = max(0.0, (end - start).total_seconds()) if start and end else 0.0
+        a["error"] = is_error
+        loop = self.loops.get(a["loop"])
+        if loop:
+            loop["seconds"] += a["seconds"]
+            loop["errors"] += is_error
+            if ts and (loop["end"] is None or ts > loop["end"]):
+                loop["end"] = ts
+        if idx < self.similar.count - self.similar.window:
+            self.retire(idx)
+
+    def retire(self, idx: int):
+        """Forget a call that left the window and has its result; its loop is
+        finished once that was its last such call."""
+        lid = self.attempts.pop(idx)["loop"]
+        loop = self.loops.get(lid)
+        if loop:
+            loop["live"] -= 1
+            if not loop["live"]:
+                self.loop_done(lid)
+
+    def loop_done(self, lid: int):
+        """Drop a finished loop short of LOOP_MIN_ATTEMPTS attempts, and keep
+        only the max_items costliest finished loops (the rest are only added
+        to the totals)."""
+        if self.loops[lid]["attempts"] < LOOP_MIN_ATTEMPTS:
+            del self.loops[lid]
+            return
+        if self.max_items is None:
+            return
+        finished = [k for k, loop in self.loops.items() if not loop["live"]]
+        if len(finished) > self.max_items:
+            gone = self.loops.pop(min(finished, key=lambda k: loop_cost(self.loops[k])))
+            self.dropped["loops"] += 1
+            for k in LOOP_TOTALS[1:]:
+                self.dropped[k] += gone[k]
+
+    def retry_loops(self) -> list[dict]:
+        """Loops by tokens spent, each with its span from first call to last result."""
+        loops = sorted((loop for loop in self.loops.values() if loop["attempts"] >= LOOP_MIN_ATTEMPTS),
+                       key=loop_cost, reverse=True)
+        out = []
+        for loop in loops[:self.max_items]:
+            start, end = parse_ts(loop["start"]), parse_ts(loop["end"])
+            out.append({**{k: v for k, v in loop.items() if k not in ("sig", "live")},
+                        "span_s": (end - start).total_seconds() if start and end else 0.0})
+        return out
+
+    def loop_totals(self) -> dict:
+        """Loops, attempts, tool time and tokens over every loop found."""
+        totals = dict(self.dropped)
+        for loop in self.loops.values():
+            if loop["attempts"] >= LOOP_MIN_ATTEMPTS:
+                totals["loops"] += 1
+                for k in LOOP_TOTALS[1:]:
+                    totals[k] += loop[k]
+        return totals
+
+    def finish(self):
+        save_summary(self.path, "errors", {
+            "tool_calls_by_id": self.tool_calls.state(),
+            "tool_errors": self.tool_errors,
+            "corrections": self.corrections,
+            "retries": self.retries,
+            "counts": self.counts,
+            "max_items": self.max_items,
+            "truncated": any(self.counts[k] > len(getattr(self, k)) for k in self.counts) or self.dropped["loops"] > 0,
+            "prev_call": self.prev_call,
+            "retry_params": self.retry_params,
+            "similar": self.similar.state(),
+            "attempts": self.attempts,
+            "awaiting": self.awaiting,
+            "loops": self.loops,
+            "dropped": self.dropped,
+        })
+
+    def result(self) -> dict:
+        return {
+            "counts": {**self.counts, "retry_loops": self.loop_totals()["loops"]},
+            "tool_errors": self.tool_errors,
+            "retries": self.retries,
+            "retry_loops": self.retry_loops(),
+            "corrections": self.corrections,
+        }
+
+    def render(self):
+        counts = self.counts
+        print("ERROR & RETRY REPORT")
+        print("=" * 70)
+
+        print(f"\nTool Errors: {counts['tool_errors']}")
+        print("-" * 70)
+        for i, e in enumerate(self.tool_errors, 1):
+            call_line_str = f" (call at line {e['call_line']})" if e["call_line"] else ""
+            print(f"\n  [{i}] Turn {e['turn']} | Line {e['line']}{call_line_str}")
+            print(f"      Tool:  {e['tool_name']}")
+            if e["tool_input"]:
+                print(f"      Input: {e['tool_input'][:200]}")
+            print(f"      Error: {e['error'][:300]}")
+        print_more(counts["tool_errors"], self.tool_errors)
+
+        print(f"\nExact Retries (same tool+input back-to-back): {counts['retries']}")
+        print("-" * 70)
+        for r in self.retries:
+            print(f"  Turn {r['turn']} | Line {r['line']}: {r['tool']} -> {r['input'][:120]}")
+        print_more(counts["retries"], self.retries)
+
+        loops, totals = self.retry_loops(), self.loop_totals()
+        similarity, window, min_attempts = self.retry_params
+        print(f"\nRetry Loops ({min_attempts}+ similar calls, >= {similarity:.0%} alike, <= {window} calls apart): "
+              f"{totals['loops']}")
+        print("-" * 70)
+        if totals["loops"]:
+            print(f"  {totals['attempts']} attempts, {fmt_duration(totals['seconds'])} in tools, "
+                  f"{totals['output_tokens']:,} output / {totals['context_tokens']:,} context tokens")
+        for i, loop in enumerate(loops, 1):
+            errors = f", {loop['errors']} failed" if loop["errors"] else ""
+            print(f"\n  [{i}] {loop['tool'][:60]} x{loop['attempts']}{errors} | Turns {loop['first_turn']}-{loop['last_turn']} "
+                  f"| Lines {loop['first_line']}-{loop['last_line']}")
+            print(f"      Cost:  {fmt_duration(loop['seconds'])} in tools over a {fmt_duration(loop['span_s'])} span, "
+                  f"{loop['output_tokens']:,} output / {loop['context_tokens']:,} context tokens")
+            print(f"      Input: {loop['input'][:150]}")
+            more = "..." if loop["attempts"] > len(loop["lines"]) else ""
+            print(f"      Lines: {', '.join(map(str, loop['lines']))}{more}")
+        print_more(totals["loops"], loops)
+
+        print(f"\nSelf-Corrections: {counts['corrections']}")
+        print("-" * 70)
+        for c in self.corrections:
+            print(f"  Turn {c['turn']} | Line {c['line']}: \"{c['phrase']}\" in: {c['context'][:150]}")
+        print_more(counts["corrections"], self.corrections)
+
+        total_issues = sum(counts.values()) + totals["loops"]
+        print(f"\n{'='*70}")
+        if total_issues == 0:
+            print("Clean session - no errors, retries, or corrections detected.")
+        else:
+            print(f"Total issues found: {total_issues}")
+            print(f"\nTo inspect context around an error, run:")
+            scripts_dir = Path(__file__).resolve().parent
+            print(f"  python3 {scripts_dir}/context.py {self.path} <LINE_NUM> [radius]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find errors, retries, and self-corrections in a session")
+    parser.add_argument("session_file", help="Path to session JSONL")
+    parser.add_argument(
+        "--max-items", type=int, default=500, help="Max entries kept per category (0=unlimited)"
+    )
+    parser.add_argument(
+        "--similarity", type=float, default=0.6,
+        help="Estimated share of input shingles two calls must have in common to count as a retry (default: 0.6)"
+    )
+    parser.add_argument(
+        "--retry-window", type=int, default=50, help="Max calls between two attempts of a retry loop (default: 50)"
+    )
+    parser.add_argument(
+        "--subagents", action="store_true", help="Also report each subagent transcript, plus a per-subagent rollup"
+    )
+    args = parser.parse_args()
+
+    if not 0 < args.similarity <= 1:
+        parser.error("--similarity must be in (0, 1]")
+    if args.retry_window < 1:
+        parser.error("--retry-window must be at least 1")
+    factory = partial(ErrorsAnalyzer, max_items=args.max_items or None, similarity=args.similarity,
+                      window=args.retry_window)
+    render_session(run_session(args.session_file, [factory], args.subagents))
+    print_session_location(args.session_file)
 
-    # Report
-    print("ERROR & RETRY REPORT")
-    print("=" * 70)
-
-    print(f"\nTool Errors: {len(tool_errors)}")
-    print("-" * 70)
-    for i, e in enumerate(tool_errors, 1):
-        call_line_str = f" (call at line {e['call_line']})" if e["call_line"] else ""
-        print(f"\n  [{i}] Turn {e['turn']} | Line {e['line']}{call_line_str}")
-        print(f"      Tool:  {e['tool_name']}")
-        if e["tool_input"]:
-            print(f"      Input: {e['tool_input'][:200]}")
-        print(f"      Error: {e['error'][:300]}")
-
-    print(f"\nExact Retries (same tool+input back-to-back): {len(retries)}")
-    print("-" * 70)
-    for r in retries:
-        print(f"  Turn {r['turn']} | Line {r['line']}: {r['tool']} -> {r['input'][:120]}")
-
-    print(f"\nSelf-Corrections: {len(corrections)}")
-    print("-" * 70)
-    for c in corrections:
-        print(f"  Turn {c['turn']} | Line {c['line']}: \"{c['phrase']}\" in: {c['context'][:150]}")
-
-    total_issues = len(tool_errors) + len(retries) + len(corrections)
-    print(f"\n{'='*70}")
-    if total_issues == 0:
-        print("Clean session - no errors, retries, or corrections detected.")
-    else:
-        print(f"Total issues found: {total_issues}")
-        print(f"\nTo inspect context around an error, run:")
-        scripts_dir = Path(__file__).resolve().parent
-        print(f"  python3 {scripts_dir}/context.py {path} <LINE_NUM> [radius]")
 
-    print_session_location(path)
+def print_more(total: int, shown: list):
+    if total > len(shown):
+        print(f"  ... and {total - len(shown)} more (raise --max-items to see them)")
 
 
 def print_session_location(path: str):
     p = Path(path).resolve()
-    session_dir = p.parent / p.stem
+    session_dir = p.parent / transcript_stem(p)
     print()
     print("SESSION FILES")
     print("-" * 50)
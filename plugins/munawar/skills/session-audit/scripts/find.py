@@ -2,7 +2,8 @@
 """Search a session transcript for a keyword or regex pattern.
 
 Usage:
-    python3 find.py <session.jsonl> <pattern> [--scope user|both|all] [--max-len 300]
+    python3 find.py <session.jsonl> <pattern> [--scope user|both|all] [--max-len 300] [--subagents] [--jobs N]
+    python3 find.py <session.jsonl> -e PATTERN [-e PATTERN ...] [--patterns-file FILE] [...]
 
 Scopes:
     user  — only human text messages
@@ -11,53 +12,443 @@ Scopes:
 
 For each match, shows the turn number, line, timestamp, which field matched,
 and a snippet with the match highlighted in ** markers.
+
+Several patterns (-e, --patterns-file) are matched in the same single pass;
+each match is tagged with its pattern and the report counts matches per
+pattern.
+
+The file is memory-mapped and a literal the pattern requires is searched for
+in the raw bytes first; only the lines containing it are decoded. A large
+transcript that isn't indexed yet is indexed in chunks across --jobs processes.
 """
 import argparse
-import json
+import mmap
+import os
 import re
 import sys
 import textwrap
+from functools import partial
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, render_session, run_session
+from _index import set_parallel
+from _records import excerpt, tool_input_text
+from _transcript import compression, open_transcript, transcript_stem
 
-def excerpt(text: str, match: re.Match, context_chars: int = 80) -> str:
-    """Return a snippet around the match with ** markers."""
-    start = max(0, match.start() - context_chars)
-    end = min(len(text), match.end() + context_chars)
-    prefix = "..." if start > 0 else ""
-    suffix = "..." if end < len(text) else ""
-    before = text[start:match.start()]
-    matched = text[match.start():match.end()]
-    after = text[match.end():end]
-    # Collapse newlines for readability
-    snippet = f"{prefix}{before}**{matched}**{after}{suffix}"
-    return snippet.replace("\n", " ")
-
-
-def summarize_tool_input(name: str, inp: dict) -> str:
-    if name == "Bash":
-        return inp.get("command", "")
-    elif name in ("Read", "Write"):
-        return inp.get("file_path", "")
-    elif name == "Edit":
-        fp = inp.get("file_path", "")
-        old = inp.get("old_string", "")[:120]
-        new = inp.get("new_string", "")[:120]
-        return f"{fp} old={old!r} new={new!r}"
-    elif name == "Grep":
-        return f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
-    elif name == "Glob":
-        return f'pattern={inp.get("pattern","")} path={inp.get("path",".")}'
-    elif name == "Agent":
-        return f'type={inp.get("subagent_type","")} desc={inp.get("description","")} prompt={inp.get("prompt","")[:200]}'
-    else:
-        return json.dumps(inp, separators=(",", ":"))
+try:
+    import ahocorasick
+except ImportError:  # optional — one pass over many literals instead of one per literal
+    ahocorasick = None
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Characters a JSON writer may escape, so they can't be looked for verbatim
+JSON_ESCAPED = set('"\\/<>&')
+# Text --scope all adds around the decoded fields (summaries, str() of dicts)
+DERIVED_WORDS = ["pattern", "path", "type", "desc", "prompt", "old", "new",
+                 "True", "False", "None", "inf", "nan"]
+# ASCII letters that also match non-ASCII characters case-insensitively
+# (İ ı, Kelvin sign, long s), as raw UTF-8 or \u-escaped in the JSON
+CASE_FOLDS = {
+    "i": [b"\xc4\xb0", b"\xc4\xb1", b"\\u0130", b"\\u0131"],
+    "k": [b"\xe2\x84\xaa", b"\\u212a"],
+    "s": [b"\xc5\xbf", b"\\u017f"],
+}
+SCAN_BLOCK = 1 << 20
+MIN_LITERAL = 3
+# Backreferences and conditionals, which would point at the wrong group once
+# the pattern is nested in a combined alternation
+BACKREF = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+
+def required_literals(pattern: str, flags: int, scope: str) -> tuple[list[str], bool] | None:
+    """Literals one of which every match must contain verbatim in the raw
+    JSON line, and whether they are case-insensitive; None if there are none.
+
+    Only plain ASCII runs qualify (letters only for --scope all, whose
+    searched text includes reprs and summaries that aren't in the JSON).
+    """
+    parsed = sre_parse.parse(pattern, flags)
+    ignorecase = bool(parsed.state.flags & re.IGNORECASE)
+
+    def allowed(c: int) -> bool:
+        ch = chr(c)
+        if scope == "all":
+            return ch.isascii() and (ch.isalpha() or ch in "_-")
+        return 0x20 <= c < 0x7f and ch not in JSON_ESCAPED
+
+    def usable(run: str) -> bool:
+        if len(run) < MIN_LITERAL:
+            return False
+        if scope != "all":
+            return True
+        fold = str.lower if ignorecase else str
+        return not any(fold(run) in fold(w) for w in DERIVED_WORDS)
+
+    def literals(items) -> list[str] | None:
+        items = list(items)
+        if len(items) == 1:
+            op, av = items[0]
+            if op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+                return literals(av[3])
+            if op is sre_parse.BRANCH:
+                alternatives = [literals(alt) for alt in av[1]]
+                if any(a is None for a in alternatives):
+                    return None
+                return [lit for a in alternatives for lit in a]
+        runs, current = [], ""
+        for op, av in items:
+            if op is sre_parse.LITERAL and allowed(av):
+                current += chr(av)
+            else:
+                runs.append(current)
+                current = ""
+        runs.append(current)
+        runs = [r for r in runs if usable(r)]
+        return [max(runs, key=len)] if runs else None
+
+    found = literals(parsed)
+    return (found, ignorecase) if found else None
+
+
+def fold_needle(lits: list[str]) -> re.Pattern:
+    """Bytes regex matching any of the literals case-insensitively in raw
+    JSON, including the non-ASCII case variants of i, k and s."""
+    alternatives = []
+    for lit in lits:
+        parts = []
+        for ch in lit:
+            variants = [re.escape(v) for v in CASE_FOLDS.get(ch.lower(), [])]
+            parts.append(b"(?:" + b"|".join([re.escape(ch.encode())] + variants) + b")")
+        alternatives.append(b"".join(parts))
+    return re.compile(b"|".join(alternatives), re.IGNORECASE)
+
+
+def candidate_lines(path: str, lits: list[str], ignorecase: bool) -> tuple[set[int], int]:
+    """Start offsets of the lines containing any of the literals, and the
+    number of bytes searched.
+
+    The file is scanned in line-aligned blocks with plain bytes.find (on the
+    lowercased block when case-insensitive), or for several literals one
+    Aho-Corasick pass when pyahocorasick is installed; only blocks holding a
+    non-ASCII case variant fall back to a regex.
+    """
+    needles = [(lit.lower() if ignorecase else lit).encode() for lit in lits]
+    folds = {v for ch in set("".join(lits).lower()) for v in CASE_FOLDS.get(ch, [])} if ignorecase else set()
+    # Cheap first check: the lead byte of each variant, or the \u of an escape
+    leads = {v[:2] if v.startswith(b"\\") else v[:1] for v in folds}
+    regex = fold_needle(lits) if folds else None
+    automaton = literal_automaton(n.decode() for n in needles) if len(needles) > 1 else None
+    found, searched = set(), 0
+    for start, block in line_blocks(path):
+        hay = block.lower() if ignorecase else block
+        if any(v in hay for v in leads) and any(v in hay for v in folds):
+            finders = [lambda pos: (m.start() if (m := regex.search(block, pos)) else -1)]
+        elif automaton is not None:
+            finders = []
+            found.update(start + p for p in automaton_lines(automaton, hay))
+        else:
+            finders = [lambda pos, n=n: hay.find(n, pos) for n in needles]
+        for find in finders:
+            found.update(start + p for p in line_hits(hay, find))
+        searched = start + len(block)
+    return found, searched
+
+
+def literal_automaton(words):
+    """Aho-Corasick automaton over the words (each reported as its length),
+    or None without pyahocorasick."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for w in words:
+        automaton.add_word(w, len(w))
+    automaton.make_automaton()
+    return automaton
+
+
+def automaton_lines(automaton, block: bytes):
+    """Start offsets (within block) of the lines holding any of the
+    automaton's words, in one pass over the block."""
+    line_end = 0
+    # latin-1 maps each byte to one character, so offsets carry over
+    for end, _ in automaton.iter(block.decode("latin-1")):
+        if end >= line_end:
+            yield block.rfind(b"\n", 0, end) + 1
+            line_end = block.find(b"\n", end) + 1 or len(block)
+
+
+def line_blocks(path: str):
+    """(offset, block) over the transcript in blocks of about SCAN_BLOCK
+    bytes ending at a line break — memory-mapped, or read through the
+    decompressor for a compressed transcript."""
+    if compression(path):
+        with open_transcript(path) as f:
+            start = 0
+            while block := f.read(SCAN_BLOCK):
+                block += f.readline()
+                yield start, block
+                start += len(block)
+        return
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = mm.find(b"\n", start + SCAN_BLOCK) + 1 or size
+                yield start, mm[start:end]
+                start = end
+
+
+def line_hits(block: bytes, find):
+    """Start offsets (within block) of the lines find(pos) reports a hit in."""
+    p = find(0)
+    while p >= 0:
+        yield block.rfind(b"\n", 0, p) + 1
+        pos = block.find(b"\n", p) + 1
+        if not pos:
+            return
+        p = find(pos)
+
+
+class PatternSet:
+    """Several patterns matched together in one pass over a text.
+
+    The plain literals among them run through an Aho-Corasick automaton when
+    pyahocorasick is installed; the other patterns (all of them without it)
+    are joined into one alternation.
+    """
+
+    def __init__(self, patterns: list[str], flags: int):
+        self.regexes = [re.compile(p, flags) for p in patterns]
+        self.ignorecase = bool(flags & re.IGNORECASE)
+        self.literals = {}  # searched text -> indexes of the patterns it is
+        if len(patterns) > 1 and ahocorasick is not None:
+            for i, p in enumerate(patterns):
+                lit = plain_literal(p, flags)
+                if lit is not None:
+                    self.literals.setdefault(lit.lower() if self.ignorecase else lit, []).append(i)
+        self.automaton = literal_automaton(self.literals) if self.literals else None
+        literal = {i for ids in self.literals.values() for i in ids}
+        self.every = Alternation(patterns, self.regexes, range(len(patterns)), flags)
+        self.rest = Alternation(patterns, self.regexes, [i for i in range(len(patterns)) if i not in literal], flags)
+
+    def search(self, text: str) -> list[tuple[int, tuple[int, int]]]:
+        """(pattern index, span of its first match) for each pattern found."""
+        found = {}
+        # Lowercasing keeps offsets only in ASCII text, and only there does it
+        # agree with re.IGNORECASE
+        if self.automaton is not None and (not self.ignorecase or text.isascii()):
+            hay = text.lower() if self.ignorecase else text
+            for end, length in self.automaton.iter(hay):
+                start = end - length + 1
+                for i in self.literals[hay[start:end + 1]]:
+                    found.setdefault(i, (start, end + 1))
+            self.rest.search(text, found)
+        else:
+            self.every.search(text, found)
+        return sorted(found.items())
+
+
+class Alternation:
+    """Patterns joined into one regex with a named group each. Those it
+    can't hold (backreferences, clashing group names, global flags) are
+    searched on their own."""
+
+    def __init__(self, patterns: list[str], regexes: list[re.Pattern], indexes, flags: int):
+        self.regexes = regexes
+        indexes = list(indexes)
+        self.merged = [i for i in indexes if not BACKREF.search(patterns[i]) and groupable(patterns[i], flags)]
+        self.combined = None
+        if len(self.merged) > 1:
+            try:
+                self.combined = re.compile("|".join(f"(?P<p{i}>{patterns[i]})" for i in self.merged), flags)
+            except re.error:  # the same group name in two patterns
+                pass
+        if self.combined is None:
+            self.merged = []
+        self.alone = [i for i in indexes if i not in set(self.merged)]
+
+    def search(self, text: str, found: dict):
+        """Add (pattern index -> span of its first match) to found."""
+        # Most texts match none of the merged patterns, and one search of the
+        # alternation rules them all out. Where it hits, each merged pattern not
+        # yet found is tried at that position, so a pattern matching at the same
+        # place as another, or inside its match, still gets its first match
+        pos, left = 0, len(self.merged)
+        while left and (m := self.combined.search(text, pos)):
+            for i in self.merged:
+                if i not in found and (mi := self.regexes[i].match(text, m.start())):
+                    found[i] = mi.span()
+                    left -= 1
+            pos = m.start() + 1
+        for i in self.alone:
+            if m := self.regexes[i].search(text):
+                found[i] = m.span()
+
+
+def groupable(pattern: str, flags: int) -> bool:
+    """Whether a pattern still compiles nested in a group (global inline
+    flags must open the whole expression)."""
+    try:
+        re.compile(f"(?:{pattern})", flags)
+    except re.error:
+        return False
+    return True
+
+
+def plain_literal(pattern: str, flags: int) -> str | None:
+    """The text a pattern matches if it is a plain ASCII literal, else None."""
+    parsed = sre_parse.parse(pattern, flags)
+    if parsed.state.flags & re.IGNORECASE != flags & re.IGNORECASE or not len(parsed):
+        return None
+    if any(op is not sre_parse.LITERAL or av >= 0x80 for op, av in parsed):
+        return None
+    return "".join(chr(av) for _, av in parsed)
+
+
+class FindAnalyzer(Analyzer):
+    """Matches of one or more regexes in the fields a scope covers, with
+    snippets, each tagged with its pattern when there are several."""
+
+    name = "find"
+
+    def __init__(self, path: str, patterns: list[str], scope: str = "both",
+                 case_sensitive: bool = False, max_len: int = 300):
+        self.path = path
+        self.patterns = patterns
+        self.scope = scope
+        self.case_sensitive = case_sensitive
+        self.max_len = max_len
+        flags = 0 if case_sensitive else re.IGNORECASE
+        self.matcher = PatternSet(patterns, flags)
+        self.matches = []
+        self.counts = [0] * len(patterns)
+        # Lines that can't contain a required literal of some pattern are never decoded
+        self.candidates, self.searched = None, 0
+        found = [required_literals(p, flags, scope) for p in patterns]
+        if all(found):
+            lits = list(dict.fromkeys(lit for f in found for lit in f[0]))
+            self.candidates, self.searched = candidate_lines(path, lits, any(f[1] for f in found))
+
+    def wants(self, e) -> bool:
+        # Decode only the records this scope can match
+        if self.scope == "user":
+            covered = e.prompt
+        elif self.scope == "both":
+            covered = e.prompt or "text" in e.blocks
+        else:
+            covered = e.type in ("user", "assistant")
+        if not covered or self.candidates is None:
+            return bool(covered)
+        # Records appended after the byte search can't be ruled out
+        return e.offset >= self.searched or e.offset in self.candidates
+
+    def match(self, e, r, field: str, text: str):
+        for i, span in self.matcher.search(text):
+            hit = {
+                "turn": e.turn,
+                "line": e.line,
+                "ts": r.get("timestamp", "")[:19],
+                "field": field,
+                "snippet": excerpt(text, span),
+            }
+            if len(self.patterns) > 1:
+                hit["pattern"] = self.patterns[i]
+            self.counts[i] += 1
+            self.matches.append(hit)
+
+    def on_prompt(self, e, r, text):
+        # Human text message — new turn
+        self.match(e, r, "USER", text)
+
+    def on_result(self, e, r, block):
+        if self.scope != "all":
+            return
+        result = block.get("content", "")
+        if isinstance(result, list):
+            result = " ".join(
+                c.get("text", "") for c in result if c.get("type") == "text"
+            )
+        tid = block.get("tool_use_id", "?")[:25]
+        is_err = block.get("is_error", False)
+        label = f"TOOL ERROR [{tid}]" if is_err else f"TOOL RESULT [{tid}]"
+        self.match(e, r, label, str(result))
+
+    def on_raw_result(self, e, r, raw):
+        if self.scope == "all":
+            self.match(e, r, "TOOL RESULT (raw)", str(raw))
+
+    def on_text(self, e, r, block):
+        if self.scope in ("both", "all"):
+            self.match(e, r, "ASSISTANT", block.get("text", ""))
+
+    def on_thinking(self, e, r, block):
+        if self.scope == "all":
+            self.match(e, r, "THINKING", block.get("thinking", ""))
+
+    def on_tool_use(self, e, r, block):
+        if self.scope == "all":
+            name = block.get("name", "?")
+            full_input = tool_input_text(name, block.get("input", {}))
+            self.match(e, r, f"TOOL CALL ({name})", full_input)
+
+    def result(self) -> dict:
+        if len(self.patterns) == 1:
+            head = {"pattern": self.patterns[0]}
+        else:
+            head = {"patterns": self.patterns, "counts": dict(zip(self.patterns, self.counts))}
+        return {
+            **head,
+            "scope": self.scope,
+            "case_sensitive": self.case_sensitive,
+            "matches": self.matches,
+        }
+
+    def render(self):
+        searched = f"/{self.patterns[0]}/" if len(self.patterns) == 1 else f"{len(self.patterns)} patterns"
+        print(f"SEARCH: {searched} (scope={self.scope}, case_sensitive={self.case_sensitive})")
+        print("=" * 70)
+        print(f"Matches: {len(self.matches)}")
+        print()
+
+        if len(self.patterns) > 1:
+            print("PER PATTERN (by matches)")
+            print("-" * 70)
+            for pattern, count in sorted(zip(self.patterns, self.counts), key=lambda pc: -pc[1]):
+                print(f"  {count:6d}  /{pattern}/")
+            print()
+
+        for i, hit in enumerate(self.matches, 1):
+            snippet = hit["snippet"]
+            if self.max_len > 0 and len(snippet) > self.max_len:
+                snippet = snippet[:self.max_len] + "..."
+            tag = f" | /{hit['pattern']}/" if "pattern" in hit else ""
+            print(f"  [{i}] Turn {hit['turn']} | Line {hit['line']} | {hit['ts']} | {hit['field']}{tag}")
+            for sl in textwrap.wrap(snippet, 100):
+                print(f"       {sl}")
+            print()
+
+        if self.matches:
+            print("-" * 70)
+            print("To drill into a specific match, run:")
+            scripts_dir = Path(__file__).resolve().parent
+            print(f"  python3 {scripts_dir}/context.py {self.path} <LINE> [radius]")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Search session transcript for a pattern")
     parser.add_argument("session_file", help="Path to session JSONL")
-    parser.add_argument("pattern", help="Regex pattern to search for (case-insensitive)")
+    parser.add_argument("pattern", nargs="?", help="Regex pattern to search for (case-insensitive)")
+    parser.add_argument("-e", "--pattern", dest="patterns", action="append", default=[], metavar="PATTERN",
+                        help="Another pattern, matched in the same pass (repeatable)")
+    parser.add_argument("--patterns-file", help="File of patterns, one per line (blank lines and # comments skipped)")
     parser.add_argument(
         "--scope",
         choices=["user", "both", "all"],
@@ -66,153 +457,37 @@ def main():
     )
     parser.add_argument("--max-len", type=int, default=300, help="Max snippet length (0=unlimited)")
     parser.add_argument("--case-sensitive", action="store_true", help="Make search case-sensitive")
+    parser.add_argument(
+        "--subagents", action="store_true", help="Also search each subagent transcript, plus a per-subagent rollup"
+    )
+    parser.add_argument("--jobs", type=int,
+                        help="Worker processes for --subagents and for indexing (default: CPU count)")
     args = parser.parse_args()
 
-    flags = 0 if args.case_sensitive else re.IGNORECASE
-    try:
-        regex = re.compile(args.pattern, flags)
-    except re.error as e:
-        print(f"Invalid regex: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    turn = 0
-    matches = []
-
-    with open(args.session_file) as f:
-        for line_num, line in enumerate(f, 1):
-            r = json.loads(line)
-            t = r.get("type")
-            ts = r.get("timestamp", "")[:19]
-
-            if t == "user":
-                msg = r.get("message", {})
-                content = msg.get("content")
-
-                # Human text message — new turn
-                if isinstance(content, str):
-                    turn += 1
-                    m = regex.search(content)
-                    if m:
-                        matches.append({
-                            "turn": turn,
-                            "line": line_num,
-                            "ts": ts,
-                            "field": "USER",
-                            "snippet": excerpt(content, m),
-                        })
-
-                # Tool results
-                if args.scope == "all" and isinstance(content, list):
-                    for block in content:
-                        if block.get("type") == "tool_result":
-                            result = block.get("content", "")
-                            if isinstance(result, list):
-                                result = " ".join(
-                                    c.get("text", "") for c in result if c.get("type") == "text"
-                                )
-                            result = str(result)
-                            m = regex.search(result)
-                            if m:
-                                tid = block.get("tool_use_id", "?")[:25]
-                                is_err = block.get("is_error", False)
-                                label = f"TOOL ERROR [{tid}]" if is_err else f"TOOL RESULT [{tid}]"
-                                matches.append({
-                                    "turn": turn,
-                                    "line": line_num,
-                                    "ts": ts,
-                                    "field": label,
-                                    "snippet": excerpt(result, m),
-                                })
-
-                # Also check toolUseResult
-                if args.scope == "all":
-                    tool_result = r.get("toolUseResult")
-                    if tool_result:
-                        result_str = str(tool_result)
-                        m = regex.search(result_str)
-                        if m:
-                            matches.append({
-                                "turn": turn,
-                                "line": line_num,
-                                "ts": ts,
-                                "field": "TOOL RESULT (raw)",
-                                "snippet": excerpt(result_str, m),
-                            })
-
-            elif t == "assistant":
-                msg = r.get("message", {})
-                content = msg.get("content", [])
-                if not isinstance(content, list):
-                    continue
-
-                for block in content:
-                    bt = block.get("type")
-
-                    if bt == "text" and args.scope in ("both", "all"):
-                        text = block.get("text", "")
-                        m = regex.search(text)
-                        if m:
-                            matches.append({
-                                "turn": turn,
-                                "line": line_num,
-                                "ts": ts,
-                                "field": "ASSISTANT",
-                                "snippet": excerpt(text, m),
-                            })
-
-                    elif bt == "thinking" and args.scope == "all":
-                        thinking = block.get("thinking", "")
-                        m = regex.search(thinking)
-                        if m:
-                            matches.append({
-                                "turn": turn,
-                                "line": line_num,
-                                "ts": ts,
-                                "field": "THINKING",
-                                "snippet": excerpt(thinking, m),
-                            })
-
-                    elif bt == "tool_use" and args.scope == "all":
-                        name = block.get("name", "?")
-                        inp = block.get("input", {})
-                        full_input = summarize_tool_input(name, inp)
-                        m = regex.search(full_input)
-                        if m:
-                            matches.append({
-                                "turn": turn,
-                                "line": line_num,
-                                "ts": ts,
-                                "field": f"TOOL CALL ({name})",
-                                "snippet": excerpt(full_input, m),
-                            })
-
-    # Report
-    print(f"SEARCH: /{args.pattern}/ (scope={args.scope}, case_sensitive={args.case_sensitive})")
-    print("=" * 70)
-    print(f"Matches: {len(matches)}")
-    print()
-
-    for i, hit in enumerate(matches, 1):
-        snippet = hit["snippet"]
-        if args.max_len > 0 and len(snippet) > args.max_len:
-            snippet = snippet[:args.max_len] + "..."
-        print(f"  [{i}] Turn {hit['turn']} | Line {hit['line']} | {hit['ts']} | {hit['field']}")
-        for sl in textwrap.wrap(snippet, 100):
-            print(f"       {sl}")
-        print()
-
-    if matches:
-        print("-" * 70)
-        print("To drill into a specific match, run:")
-        scripts_dir = Path(__file__).resolve().parent
-        print(f"  python3 {scripts_dir}/context.py {args.session_file} <LINE> [radius]")
+    patterns = ([args.pattern] if args.pattern is not None else []) + args.patterns
+    if args.patterns_file:
+        with open(args.patterns_file) as f:
+            patterns += [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+    patterns = list(dict.fromkeys(patterns))
+    if not patterns:
+        parser.error("give a pattern, -e PATTERN or --patterns-file")
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            print(f"Invalid regex {pattern!r}: {e}", file=sys.stderr)
+            sys.exit(1)
 
+    factory = partial(FindAnalyzer, patterns=patterns, scope=args.scope,
+                      case_sensitive=args.case_sensitive, max_len=args.max_len)
+    set_parallel(args.jobs)
+    render_session(run_session(args.session_file, [factory], args.subagents, args.jobs))
     print_session_location(args.session_file)
 
 
 def print_session_location(path: str):
     p = Path(path).resolve()
-    session_dir = p.parent / p.stem
+    session_dir = p.parent / transcript_stem(p)
     print()
     print("SESSION FILES")
     print("-" * 50)
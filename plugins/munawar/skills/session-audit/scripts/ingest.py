@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""Load every session transcript into a SQLite database for ad-hoc SQL.
+
+Usage:
+    python3 ingest.py [--project-dir /path/to/project] [--db PATH] [--sql QUERY] [--limit 100]
+                      [--text-chars 10000] [--no-update] [--rebuild] [--json]
+
+Ingests all transcripts under ~/.claude/projects (main sessions and
+subagents) into normalized tables, keyed by transcript file and line:
+
+  files         one row per transcript: project, session, agent (NULL for main)
+  messages      one row per record: type, subtype, turn, ts, uuid, parent_uuid, msg_id, model, prompt
+  blocks        content blocks of user and assistant messages: type, text, chars
+  tool_calls    tool_use blocks: tool_use_id, name, input (JSON)
+  tool_results  tool_result blocks: tool_use_id, is_error, call_line, content, chars
+  usage         token usage, once per model response (msg_id; its last record's usage)
+
+plus a `calls` view joining each call with its transcript, result and
+timestamps. Text and input strings are cut at --text-chars characters
+(chars keeps the full length). Like search.py, each run first brings the
+database up to date: new transcripts are loaded, and grown ones only have
+their appended records added. --sql then runs a query and prints the rows.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _index import CACHE_DIR, adopt_archive, checkpoint_file, index_enabled, resume_file, scan  # noqa: E402
+from _transcript import project_transcripts  # noqa: E402
+
+INGEST_VERSION = 2
+TABLES = ["files", "messages", "blocks", "tool_calls", "tool_results", "usage"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    project TEXT,
+    session TEXT,
+    agent TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    fingerprint TEXT,
+    state TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    file INTEGER,
+    line INTEGER,
+    type TEXT,
+    subtype TEXT,
+    turn INTEGER,
+    ts TEXT,
+    uuid TEXT,
+    parent_uuid TEXT,
+    msg_id TEXT,
+    model TEXT,
+    prompt INTEGER,
+    PRIMARY KEY (file, line)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blocks (
+    file INTEGER,
+    line INTEGER,
+    idx INTEGER,
+    type TEXT,
+    text TEXT,
+    chars INTEGER,
+    PRIMARY KEY (file, line, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tool_calls (
+    file INTEGER,
+    line INTEGER,
+    idx INTEGER,
+    tool_use_id TEXT,
+    name TEXT,
+    input TEXT,
+    PRIMARY KEY (file, line, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tool_results (
+    file INTEGER,
+    line INTEGER,
+    idx INTEGER,
+    tool_use_id TEXT,
+    is_error INTEGER,
+    call_line INTEGER,
+    content TEXT,
+    chars INTEGER,
+    PRIMARY KEY (file, line, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS usage (
+    file INTEGER,
+    msg_id TEXT,
+    line INTEGER,
+    model TEXT,
+    input INTEGER,
+    output INTEGER,
+    cache_read INTEGER,
+    cache_create INTEGER,
+    PRIMARY KEY (file, msg_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_session ON files (session);
+CREATE INDEX IF NOT EXISTS messages_ts ON messages (ts);
+CREATE INDEX IF NOT EXISTS tool_calls_name ON tool_calls (name);
+CREATE INDEX IF NOT EXISTS tool_calls_id ON tool_calls (file, tool_use_id);
+CREATE INDEX IF NOT EXISTS tool_results_id ON tool_results (file, tool_use_id);
+CREATE VIEW IF NOT EXISTS calls AS
+    SELECT f.project, f.session, f.agent, c.file, c.line, c.tool_use_id, c.name, c.input,
+           m.ts AS call_ts, r.line AS result_line, r.is_error, r.chars AS result_chars, rm.ts AS result_ts
+    FROM tool_calls c
+    JOIN files f ON f.id = c.file
+    JOIN messages m ON m.file = c.file AND m.line = c.line
+    LEFT JOIN tool_results r ON r.file = c.file AND r.tool_use_id = c.tool_use_id
+    LEFT JOIN messages rm ON rm.file = r.file AND rm.line = r.line;
+"""
+INSERT_BATCH = 1000
+ANALYSIS_LIMIT = 1000  # rows sampled per index when refreshing planner statistics
+
+
+def db_path(path: str | None) -> str:
+    if path:
+        return path
+    if not index_enabled():
+        return ":memory:"  # no cache — ingest from scratch for this run only
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return str(CACHE_DIR / "sessions.db")
+
+
+def connect(path: str | None, rebuild: bool = False) -> sqlite3.Connection:
+    db = sqlite3.connect(db_path(path))
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    if rebuild or version != INGEST_VERSION:
+        db.execute("DROP VIEW IF EXISTS calls")
+        db.executescript("".join(f"DROP TABLE IF EXISTS {t};" for t in TABLES))
+    db.executescript(SCHEMA)
+    db.execute(f"PRAGMA user_version = {INGEST_VERSION}")
+    return db
+
+
+def cut(text: str, limit: int) -> str:
+    return text[:limit] if limit else text
+
+
+def cut_input(inp, limit: int) -> str:
+    """Tool input as JSON, long string values cut so it stays valid JSON."""
+    if limit and isinstance(inp, dict):
+        inp = {k: v[:limit] if isinstance(v, str) else v for k, v in inp.items()}
+    return json.dumps(inp, ensure_ascii=False)
+
+
+def result_text(block: dict) -> str:
+    content = block.get("content", "")
+    if isinstance(content, list):
+        return "\n".join(c.get("text", "") for c in content if isinstance(c, dict) and c.get("type") == "text")
+    return str(content)
+
+
+class Rows:
+    """Rows waiting to be inserted, per table."""
+
+    COLUMNS = {
+        "messages": 11,
+        "blocks": 6,
+        "tool_calls": 6,
+        "tool_results": 8,
+        "usage": 8,
+    }
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+        self.rows = {table: [] for table in self.COLUMNS}
+        self.count = 0
+
+    def add(self, table: str, row: tuple):
+        self.rows[table].append(row)
+        self.count += table == "messages"
+        if len(self.rows[table]) >= INSERT_BATCH:
+            self.flush(table)
+
+    def flush(self, table: str | None = None):
+        for t in [table] if table else self.COLUMNS:
+            sql = f"INSERT INTO {t} VALUES ({', '.join('?' * self.COLUMNS[t])})"
+            if t == "usage":  # a response's records repeat its usage; the last one is final
+                sql += (" ON CONFLICT (file, msg_id) DO UPDATE SET line = excluded.line, model = excluded.model,"
+                        " input = excluded.input, output = excluded.output, cache_read = excluded.cache_read,"
+                        " cache_create = excluded.cache_create")
+            self.db.executemany(sql, self.rows[t])
+            self.rows[t].clear()
+
+
+def add_record(rows: Rows, file_id: int, e, r: dict | None, limit: int):
+    """Rows for one transcript record (r is None for records the index
+    didn't decode: progress, snapshots and the like)."""
+    msg = r.get("message") if r else None
+    msg = msg if isinstance(msg, dict) else {}
+    model = msg.get("model")
+    rows.add("messages", (file_id, e.line, e.type, e.subtype, e.turn, e.ts or None,
+                          r.get("uuid") if r else None, r.get("parentUuid") if r else None,
+                          e.msg_id, model, int(e.prompt)))
+    if e.usage and e.msg_id:
+        rows.add("usage", (file_id, e.msg_id, e.line, model, *e.usage))
+    content = msg.get("content")
+    if isinstance(content, str):
+        rows.add("blocks", (file_id, e.line, 0, "text", cut(content, limit), len(content)))
+        return
+    if not isinstance(content, list):
+        return
+    results = iter(e.results)
+    for i, block in enumerate(content):
+        if not isinstance(block, dict):
+            continue
+        bt = block.get("type", "?")
+        text = None
+        if bt == "text":
+            text = block.get("text", "")
+        elif bt == "thinking":
+            text = block.get("thinking", "")
+        elif bt == "tool_use":
+            rows.add("tool_calls", (file_id, e.line, i, block.get("id", ""), block.get("name", "?"),
+                                    cut_input(block.get("input", {}), limit)))
+        elif bt == "tool_result" and e.type == "user":
+            text = result_text(block)
+            _, is_error, call_line = next(results)
+            rows.add("tool_results", (file_id, e.line, i, block.get("tool_use_id", "?"), int(is_error),
+                                      call_line, cut(text, limit), len(text)))
+            text = None
+        rows.add("blocks", (file_id, e.line, i, bt, cut(text, limit) if text is not None else None,
+                            len(text) if text is not None else None))
+
+
+def delete_file(db: sqlite3.Connection, file_id: int):
+    for t in TABLES[1:]:
+        db.execute(f"DELETE FROM {t} WHERE file = ?", (file_id,))
+
+
+def ingest_file(db: sqlite3.Connection, path: Path, known, limit: int) -> int | None:
+    """Load what's new in one transcript; returns records added (None if unchanged)."""
+    resumed = resume_file(db, path, known, lambda file_id: delete_file(db, file_id))
+    if resumed is None:
+        return None
+    file_id, state, stat = resumed
+
+    rows = Rows(db)
+    for e, r in scan(str(path), state, fields=None):
+        add_record(rows, file_id, e, r, limit)
+    rows.flush()
+    checkpoint_file(db, file_id, path, state, stat)
+    return rows.count
+
+
+def update(db: sqlite3.Connection, project_dirs: list[Path], prefix: str, limit: int) -> dict:
+    """Bring the database up to date with the transcripts in project_dirs,
+    and drop the loaded ones under prefix that no longer exist."""
+    known = {
+        row[1]: (row[0], *row[2:])
+        for row in db.execute("SELECT id, path, size, mtime_ns, fingerprint, state FROM files")
+        if row[1].startswith(prefix)
+    }
+    counts = {"transcripts": 0, "updated": 0, "records": 0}
+    for path in project_transcripts(project_dirs):
+        counts["transcripts"] += 1
+        try:
+            with db:  # one transaction per file, so an interrupted update keeps its progress
+                row = known.pop(str(path), None) or adopt_archive(db, path, known)
+                added = ingest_file(db, path, row, limit)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}", file=sys.stderr)
+            continue
+        if added is not None:
+            counts["updated"] += 1
+            counts["records"] += added
+    with db:
+        for file_id, *_ in known.values():  # transcripts that no longer exist
+            delete_file(db, file_id)
+            db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+    if counts["updated"]:
+        # Without statistics the planner joins tool_results on its primary key, not (file, tool_use_id)
+        db.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        db.execute("ANALYZE")
+    return counts
+
+
+def print_table(columns: list[str], rows: list[tuple], max_len: int):
+    def show(v) -> str:
+        s = "NULL" if v is None else str(v).replace("\n", " ")
+        return s[:max_len] + "..." if max_len and len(s) > max_len else s
+
+    cells = [[show(v) for v in row] for row in rows]
+    widths = [max([len(c)] + [len(row[i]) for row in cells]) for i, c in enumerate(columns)]
+    print("  " + "  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  " + "  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  " + "  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load session transcripts into SQLite for ad-hoc SQL")
+    parser.add_argument("--project-dir", help="Only load sessions of this project root path")
+    parser.add_argument("--db", help="Database file (default: sessions.db in the session-audit cache)")
+    parser.add_argument("--sql", help="Query to run once the database is up to date")
+    parser.add_argument("--limit", type=int, default=100, help="Max rows printed for --sql (0=unlimited)")
+    parser.add_argument("--max-len", type=int, default=80, help="Max printed column width (0=unlimited)")
+    parser.add_argument("--text-chars", type=int, default=10000,
+                        help="Characters of each text, result and input string stored (0=unlimited)")
+    parser.add_argument("--no-update", action="store_true", help="Query the database as is, without loading new records")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the database and load everything again")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    claude_dir = Path.home() / ".claude" / "projects"
+    if args.project_dir:
+        root = claude_dir / args.project_dir.replace("/", "-")
+        project_dirs = [root]
+    else:
+        root = claude_dir
+        project_dirs = sorted(p for p in claude_dir.iterdir() if p.is_dir()) if claude_dir.exists() else []
+
+    db = connect(args.db, args.rebuild)
+    t0 = time.perf_counter()
+    counts = None if args.no_update else update(db, project_dirs, str(root) + os.sep, args.text_chars)
+    t1 = time.perf_counter()
+    columns, rows = [], []
+    if args.sql:
+        try:
+            cur = db.execute(args.sql)
+        except sqlite3.Error as e:
+            print(f"SQL error: {e}", file=sys.stderr)
+            sys.exit(1)
+        columns = [d[0] for d in cur.description or []]
+        rows = cur.fetchmany(args.limit) if args.limit else cur.fetchall()
+    t2 = time.perf_counter()
+
+    if args.json:
+        out = {"db": db_path(args.db), "ingest": counts}
+        if args.sql:
+            out["rows"] = [dict(zip(columns, row)) for row in rows]
+        print(json.dumps(out, indent=2))
+        return
+
+    print("SESSION DATABASE")
+    print("=" * 70)
+    print(f"Database: {db_path(args.db)}")
+    if counts:
+        print(f"Ingest:   {counts['transcripts']} transcripts, {counts['updated']} updated "
+              f"(+{counts['records']} records) in {t1 - t0:.2f}s")
+    for table in TABLES:
+        print(f"  {table:14s} {db.execute(f'SELECT count(*) FROM {table}').fetchone()[0]:10,} rows")
+    print()
+    if args.sql:
+        print(f"QUERY ({len(rows)} rows in {(t2 - t1) * 1000:.0f} ms)")
+        print("-" * 70)
+        if columns:
+            print_table(columns, rows, args.max_len)
+        if args.limit and len(rows) == args.limit:
+            print(f"  ... (first {args.limit} rows; raise --limit to see more)")
+    else:
+        print("Query it with --sql, e.g.:")
+        scripts_dir = Path(__file__).resolve().parent
+        print(f'  python3 {scripts_dir}/ingest.py --no-update --sql "SELECT name, count(*) AS calls, '
+              f'sum(is_error) AS errors FROM calls GROUP BY name ORDER BY calls DESC"')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Measure how long tool calls take in a session.
+
+Usage:
+    python3 latency.py <session.jsonl> [--top 15] [--json] [--subagents]
+
+Joins each tool_use to its tool_result by tool_use_id and reports:
+  - p50/p95/max and total duration per tool, and per Bash command
+  - the slowest individual calls
+  - the session's wall clock split into time waiting on tools (any call
+    outstanding), on the model, and on the user
+
+Durations come from record timestamps; only records carrying a Bash call are
+decoded (for the command text) — everything else is read from the index.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, json_session, render_session, run_session  # noqa: E402
+from _records import command_key, fmt_duration, parse_ts, percentile  # noqa: E402
+from _transcript import transcript_stem  # noqa: E402
+
+
+def summarize(durations: list[float]) -> dict:
+    values = sorted(durations)
+    return {
+        "calls": len(values),
+        "p50_s": percentile(values, 0.5),
+        "p95_s": percentile(values, 0.95),
+        "max_s": values[-1],
+        "total_s": sum(values),
+    }
+
+
+class LatencyAnalyzer(Analyzer):
+    """Tool call durations (tool_use -> tool_result timestamps) and the split
+    of wall-clock time between tools, model and user."""
+
+    name = "latency"
+    fields = {"type": True, "message": {"content": [{"type": True, "id": True, "input": {"command": True}}]}}
+
+    def __init__(self, path: str, top: int = 15):
+        self.path = path
+        self.top = top
+        self.pending = {}   # tool_use_id -> [name, call ts, line, turn, command]
+        self.calls = []     # [name, command, seconds, call line, result line, turn, is_error]
+        self.unmatched = 0
+        self.unfinished = 0  # calls still outstanding when the user spoke again
+        self.wait = defaultdict(float)  # tools / model / user / other -> seconds
+        self.prev_ts = None
+        self.first_ts = None
+
+    def wants(self, e) -> bool:
+        ts = parse_ts(e.ts)
+        if ts:
+            if self.prev_ts and ts > self.prev_ts:
+                # Attribute the gap to whatever was being waited for
+                if self.pending:
+                    kind = "tools"
+                elif e.type == "assistant":
+                    kind = "model"
+                elif e.prompt:
+                    kind = "user"
+                else:
+                    kind = "other"
+                self.wait[kind] += (ts - self.prev_ts).total_seconds()
+            self.prev_ts = max(self.prev_ts, ts) if self.prev_ts else ts
+            self.first_ts = self.first_ts or ts
+        if e.prompt:
+            # A new prompt means any call still outstanding was abandoned
+            self.unfinished += len(self.pending)
+            self.pending.clear()
+
+        for tid, is_error, _ in e.results:
+            call = self.pending.pop(tid, None)
+            if not call:
+                self.unmatched += 1
+                continue
+            name, call_ts, line, turn, command = call
+            if call_ts and ts:
+                seconds = max(0.0, (ts - call_ts).total_seconds())
+                self.calls.append([name, command, seconds, line, e.line, turn, is_error])
+        for tid, name in e.calls:
+            self.pending[tid] = [name, ts, e.line, e.turn, None]
+        return any(name == "Bash" for _, name in e.calls)
+
+    def on_tool_use(self, e, r, block):
+        call = self.pending.get(block.get("id", ""))
+        if call and call[0] == "Bash":
+            call[4] = block.get("input", {}).get("command", "")
+
+    def result(self) -> dict:
+        by_tool, by_command = defaultdict(list), defaultdict(list)
+        for name, command, seconds, *_ in self.calls:
+            by_tool[name].append(seconds)
+            if command is not None:
+                by_command[command_key(command)].append(seconds)
+
+        def table(groups):
+            rows = {k: summarize(v) for k, v in groups.items()}
+            return dict(sorted(rows.items(), key=lambda kv: kv[1]["total_s"], reverse=True))
+
+        slowest = sorted(self.calls, key=lambda c: c[2], reverse=True)[:self.top]
+        wall = (self.prev_ts - self.first_ts).total_seconds() if self.prev_ts else 0.0
+        return {
+            "wall_s": wall,
+            "waiting_s": {k: self.wait.get(k, 0.0) for k in ("tools", "model", "user", "other")},
+            "timed_calls": len(self.calls),
+            "unfinished_calls": self.unfinished + len(self.pending),
+            "unmatched_results": self.unmatched,
+            "by_tool": table(by_tool),
+            "by_command": table(by_command),
+            "slowest": [
+                {"tool": name, "command": command, "seconds": seconds, "call_line": line,
+                 "result_line": result_line, "turn": turn, "is_error": is_error}
+                for name, command, seconds, line, result_line, turn, is_error in slowest
+            ],
+        }
+
+    def render(self):
+        res = self.result()
+        print("TOOL LATENCY")
+        print("=" * 70)
+        wall = res["wall_s"]
+        print(f"Wall clock:          {fmt_duration(wall)}")
+        labels = {"tools": "Waiting on tools", "model": "Waiting on model", "user": "Waiting on user",
+                  "other": "Other"}
+        for kind, seconds in res["waiting_s"].items():
+            if seconds or kind != "other":
+                share = f" ({seconds * 100 / wall:.0f}%)" if wall else ""
+                print(f"  {labels[kind] + ':':19s}{fmt_duration(seconds)}{share}")
+        print(f"Timed tool calls:    {res['timed_calls']}"
+              + (f" ({res['unfinished_calls']} never returned)" if res["unfinished_calls"] else ""))
+        print()
+
+        for title, rows in (("BY TOOL", res["by_tool"]), ("BY BASH COMMAND", res["by_command"])):
+            if not rows:
+                continue
+            print(f"{title} (by total time)")
+            print("-" * 70)
+            print(f"  {'':28s} {'calls':>6s} {'p50':>8s} {'p95':>8s} {'max':>8s} {'total':>9s}")
+            for key, s in rows.items():
+                print(f"  {key[:28]:28s} {s['calls']:6d} {fmt_duration(s['p50_s']):>8s} "
+                      f"{fmt_duration(s['p95_s']):>8s} {fmt_duration(s['max_s']):>8s} "
+                      f"{fmt_duration(s['total_s']):>9s}")
+            print()
+
+        if res["slowest"]:
+            print(f"SLOWEST CALLS (top {len(res['slowest'])})")
+            print("-" * 70)
+            for i, c in enumerate(res["slowest"], 1):
+                err = "  [error]" if c["is_error"] else ""
+                print(f"  [{i}] {fmt_duration(c['seconds']):>8s}  {c['tool']}  Turn {c['turn']} | "
+                      f"Line {c['call_line']} -> {c['result_line']}{err}")
+                if c["command"]:
+                    print(f"       {' '.join(c['command'].split())[:200]}")
+            print()
+            print("To inspect a call, run:")
+            scripts_dir = Path(__file__).resolve().parent
+            print(f"  python3 {scripts_dir}/context.py {self.path} <LINE> [radius]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool call latency profile of a session")
+    parser.add_argument("session_file", help="Path to session JSONL")
+    parser.add_argument("--top", type=int, default=15, help="Slowest calls to list (0=none)")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    parser.add_argument(
+        "--subagents", action="store_true", help="Also profile each subagent transcript, plus a per-subagent rollup"
+    )
+    args = parser.parse_args()
+
+    results = run_session(args.session_file, [partial(LatencyAnalyzer, top=args.top)], args.subagents)
+    if args.json:
+        print(json.dumps(json_session(results), indent=2))
+        return
+
+    render_session(results)
+    print_session_location(args.session_file)
+
+
+def print_session_location(path: str):
+    p = Path(path).resolve()
+    session_dir = p.parent / transcript_stem(p)
+    print()
+    print("SESSION FILES")
+    print("-" * 50)
+    print(f"  Transcript: {p}")
+    if session_dir.is_dir():
+        print(f"  Session dir: {session_dir}/")
+        for item in sorted(session_dir.rglob("*")):
+            rel = item.relative_to(session_dir)
+            suffix = "/" if item.is_dir() else f"  ({item.stat().st_size:,} bytes)"
+            print(f"    {rel}{suffix}")
+    else:
+        print("  Session dir: (none — no subagents or artifacts)")
+
+
+if __name__ == "__main__":
+    main()
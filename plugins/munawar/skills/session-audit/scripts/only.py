@@ -2,7 +2,8 @@
 """Filter a session transcript to show only one category of record.
 
 Usage:
-    python3 only.py <session.jsonl> <mode> [--max-len 500]
+    python3 only.py <session.jsonl> <mode> [--max-len 500] [--max-items 500] [--subagents]
+                    [--turns A-B] [--since TIMESTAMP] [--until TIMESTAMP]
 
 Modes:
     user        — human text messages only
@@ -15,13 +16,32 @@ Modes:
     edits       — Edit/Write tool calls with file paths
     agents      — Agent tool calls (subagent spawns)
 
-Each record shows turn number, line, timestamp, and content.
+Each record shows turn number, line, timestamp, and content. Records are
+printed as they stream in; with --subagents each transcript's records are
+collected (at most --max-items of them, the rest only counted) and printed
+per source.
+
+--turns and --since/--until (UTC, any prefix of an ISO timestamp) limit
+the output to a slice of the session. The range is found by bisecting the
+sidecar index, so only the records inside it are read.
 """
 import argparse
 import json
+import os
+import sys
 import textwrap
+from functools import partial
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, render_session, run_session
+from _index import slice_range, timestamp_prefix, turn_range
+from _join import CallJoin
+from _records import extract_tool_result_text
+from _transcript import transcript_stem
+
+MODES = ["user", "assistant", "thinking", "tools", "results", "errors", "bash", "edits", "agents"]
+
 
 def truncate(text: str, max_len: int) -> str:
     if max_len <= 0 or len(text) <= max_len:
@@ -53,13 +73,164 @@ def summarize_tool_input(name: str, inp: dict) -> str:
         return json.dumps(inp, separators=(",", ":"))
 
 
-def extract_tool_result_text(block: dict) -> str:
-    result = block.get("content", "")
-    if isinstance(result, list):
-        result = "\n".join(
-            c.get("text", "") for c in result if c.get("type") == "text"
-        )
-    return str(result)
+ERROR_KEYWORDS = ["Error", "error", "FAILED", "failed", "Exception", "Traceback"]
+BASH_ERROR_KEYWORDS = ["Error", "error", "FAILED", "Traceback"]
+
+
+class OnlyAnalyzer(Analyzer):
+    """Records of one category, each with turn, line, timestamp and content."""
+
+    name = "only"
+
+    def __init__(self, path: str, mode: str, max_len: int = 500, turns: tuple | None = None,
+                 since: str | None = None, until: str | None = None, max_items: int | None = 500,
+                 stream: bool = False):
+        self.path = path
+        self.mode = mode
+        self.max_len = max_len
+        self.max_items = max_items
+        self.stream = stream  # print each item as it comes instead of keeping it for render()
+        if turns or since or until:
+            self.start, self.end = slice_range(path, turns, since, until)
+        self.count = 0
+        self.items = []  # {turn, line, ts, tag, text} or, for bash, {..., call_line, command, output}
+        # For bash mode, we need to pair calls with results: {command, line, ts}
+        self.pending_bash = CallJoin()
+
+    def wants(self, e) -> bool:
+        """Index predicate selecting the records a mode can print."""
+        mode = self.mode
+        if mode == "user":
+            return e.prompt
+        if mode in ("assistant", "thinking"):
+            return ("text" if mode == "assistant" else "thinking") in e.blocks
+        if mode == "tools":
+            return bool(e.calls)
+        if mode in ("edits", "agents"):
+            names = ("Edit", "Write") if mode == "edits" else ("Agent",)
+            return any(name in names for _, name in e.calls)
+        if mode == "results":
+            return bool(e.results)
+        if mode == "errors":
+            return e.raw_result or any(is_error for _, is_error, _ in e.results)
+
+        # bash: Bash calls, plus results that can pair with one still pending
+        if any(name == "Bash" for _, name in e.calls):
+            return True
+        return (e.raw_result and self.pending_bash.has_parent(e.parent)) or \
+            any(tid in self.pending_bash for tid, _, _ in e.results)
+
+    def emit(self, item: dict):
+        self.count += 1
+        if self.stream:
+            print_item(self.count, item)
+        elif self.max_items is None or len(self.items) < self.max_items:
+            self.items.append(item)
+
+    def add(self, e, r, text: str, tag: str = ""):
+        self.emit({
+            "turn": e.turn,
+            "line": e.line,
+            "ts": r.get("timestamp", "")[:19],
+            "tag": tag,
+            "text": truncate(text, self.max_len),
+        })
+
+    def add_bash(self, e, call: dict, output: str, is_err: bool):
+        self.emit({
+            "turn": e.turn,
+            "line": e.line,
+            "ts": call["ts"],
+            "tag": "ERROR" if is_err else "OK",
+            "call_line": call["line"],
+            "command": truncate(call["command"], self.max_len),
+            "output": truncate(output, self.max_len) if output.strip() else "",
+        })
+
+    def on_prompt(self, e, r, text):
+        if self.mode == "user":
+            self.add(e, r, text)
+
+    def on_result(self, e, r, block):
+        tid = block.get("tool_use_id", "?")
+        is_err = block.get("is_error", False)
+        if self.mode == "results":
+            label = "ERROR" if is_err else "OK"
+            self.add(e, r, extract_tool_result_text(block), f"{label} [{tid[:25]}]")
+        elif self.mode == "errors" and is_err:
+            self.add(e, r, extract_tool_result_text(block), f"[{tid[:25]}]")
+        elif self.mode == "bash" and tid in self.pending_bash:
+            self.add_bash(e, self.pending_bash.pop(tid), extract_tool_result_text(block), is_err)
+
+    def on_raw_result(self, e, r, raw):
+        result_str = str(raw)
+        # Also check toolUseResult for error keywords
+        if self.mode == "errors":
+            if any(kw in result_str for kw in ERROR_KEYWORDS):
+                self.add(e, r, result_str, "via toolUseResult")
+
+        # bash mode: also pair with toolUseResult, which doesn't carry a
+        # tool_use_id — match the call by its assistant record's uuid
+        elif self.mode == "bash":
+            call = self.pending_bash.pop_by_parent(r.get("parentUuid"))
+            if call:
+                has_err = any(kw in result_str for kw in BASH_ERROR_KEYWORDS)
+                self.add_bash(e, call, result_str, has_err)
+
+    def on_text(self, e, r, block):
+        text = block.get("text", "")
+        if self.mode == "assistant" and text.strip():
+            self.add(e, r, text)
+
+    def on_thinking(self, e, r, block):
+        thinking = block.get("thinking", "")
+        if self.mode == "thinking" and thinking.strip():
+            self.add(e, r, thinking)
+
+    def on_tool_use(self, e, r, block):
+        name = block.get("name", "?")
+        tid = block.get("id", "")
+        inp = block.get("input", {})
+        mode = self.mode
+
+        if mode == "tools":
+            self.add(e, r, summarize_tool_input(name, inp), f"{name} [{tid[:25]}]")
+        elif mode == "bash" and name == "Bash":
+            self.pending_bash.add(tid, r.get("uuid", ""), {
+                "command": inp.get("command", ""),
+                "line": e.line,
+                "ts": r.get("timestamp", "")[:19],
+            })
+        elif mode == "edits" and name in ("Edit", "Write"):
+            self.add(e, r, summarize_tool_input(name, inp), name)
+        elif mode == "agents" and name == "Agent":
+            self.add(e, r, summarize_tool_input(name, inp))
+
+    def result(self) -> dict:
+        return {"mode": self.mode, "count": self.count, "items": self.items}
+
+    def render(self):
+        for i, it in enumerate(self.items, 1):
+            print_item(i, it)
+        if self.count > len(self.items) and not self.stream:
+            print(f"... and {self.count - len(self.items)} more (raise --max-items to see them)")
+            print()
+
+        print("=" * 60)
+        print(f"Mode: {self.mode} | Total: {self.count}")
+
+
+def print_item(i: int, it: dict):
+    line = f"{it['call_line']}->{it['line']}" if "command" in it else it["line"]
+    tag = f" | {it['tag']}" if it["tag"] else ""
+    print(f"[{i}] Turn {it['turn']} | Line {line} | {it['ts']}{tag}")
+    if "command" in it:
+        print(f"  $ {it['command']}")
+        if it["output"]:
+            print(f"  => {it['output']}")
+    else:
+        print(textwrap.indent(it["text"], "  "))
+    print()
 
 
 def main():
@@ -67,166 +238,37 @@ def main():
     parser.add_argument("session_file", help="Path to session JSONL")
     parser.add_argument(
         "mode",
-        choices=["user", "assistant", "thinking", "tools", "results", "errors", "bash", "edits", "agents"],
+        choices=MODES,
         help="What to show",
     )
     parser.add_argument("--max-len", type=int, default=500, help="Max content length (0=unlimited)")
+    parser.add_argument("--max-items", type=int, default=500,
+                        help="Max records kept per subagent transcript with --subagents (0=unlimited)")
+    parser.add_argument(
+        "--subagents", action="store_true", help="Also filter each subagent transcript, plus a per-subagent rollup"
+    )
+    parser.add_argument("--turns", type=turn_range, metavar="A-B",
+                        help="Only turns A to B (A-, -B and A also work)")
+    parser.add_argument("--since", type=timestamp_prefix, metavar="TIMESTAMP",
+                        help="Only records at or after this time (UTC, e.g. 2026-01-31T14:05)")
+    parser.add_argument("--until", type=timestamp_prefix, metavar="TIMESTAMP",
+                        help="Only records up to this time, inclusive (UTC; 2026-01-31 covers the whole day)")
     args = parser.parse_args()
-
-    mode = args.mode
-    ml = args.max_len
-    turn = 0
-    count = 0
-
-    # For bash mode, we need to pair calls with results
-    # tool_use_id -> {name, input, line, turn, ts}
-    pending_bash = {}
-
-    with open(args.session_file) as f:
-        for line_num, line in enumerate(f, 1):
-            r = json.loads(line)
-            t = r.get("type")
-            ts = r.get("timestamp", "")[:19]
-
-            if t == "user":
-                msg = r.get("message", {})
-                content = msg.get("content")
-
-                if isinstance(content, str):
-                    turn += 1
-                    if mode == "user":
-                        count += 1
-                        print(f"[{count}] Turn {turn} | Line {line_num} | {ts}")
-                        print(textwrap.indent(truncate(content, ml), "  "))
-                        print()
-
-                if isinstance(content, list):
-                    for block in content:
-                        if block.get("type") != "tool_result":
-                            continue
-                        tid = block.get("tool_use_id", "?")
-                        is_err = block.get("is_error", False)
-                        result_text = extract_tool_result_text(block)
-
-                        if mode == "results":
-                            count += 1
-                            label = "ERROR" if is_err else "OK"
-                            print(f"[{count}] Turn {turn} | Line {line_num} | {ts} | {label} [{tid[:25]}]")
-                            print(textwrap.indent(truncate(result_text, ml), "  "))
-                            print()
-
-                        elif mode == "errors" and is_err:
-                            count += 1
-                            print(f"[{count}] Turn {turn} | Line {line_num} | {ts} | [{tid[:25]}]")
-                            print(textwrap.indent(truncate(result_text, ml), "  "))
-                            print()
-
-                        elif mode == "bash" and tid in pending_bash:
-                            call = pending_bash.pop(tid)
-                            count += 1
-                            label = "ERROR" if is_err else "OK"
-                            print(f"[{count}] Turn {turn} | Line {call['line']}->{line_num} | {call['ts']} | {label}")
-                            print(f"  $ {truncate(call['command'], ml)}")
-                            if result_text.strip():
-                                print(f"  => {truncate(result_text, ml)}")
-                            print()
-
-                # Also check toolUseResult for error keywords
-                tool_result = r.get("toolUseResult")
-                if tool_result and mode == "errors":
-                    result_str = str(tool_result)
-                    if any(kw in result_str for kw in ["Error", "error", "FAILED", "failed", "Exception", "Traceback"]):
-                        count += 1
-                        print(f"[{count}] Turn {turn} | Line {line_num} | {ts} | via toolUseResult")
-                        print(textwrap.indent(truncate(result_str, ml), "  "))
-                        print()
-
-                # bash mode: also pair with toolUseResult
-                if mode == "bash" and tool_result:
-                    # Check pending bash by iterating (toolUseResult doesn't carry tool_use_id directly)
-                    # We match by checking if there's exactly one pending bash call
-                    result_str = str(tool_result)
-                    for tid, call in list(pending_bash.items()):
-                        if call.get("source_uuid") == r.get("parentUuid"):
-                            count += 1
-                            has_err = any(kw in result_str for kw in ["Error", "error", "FAILED", "Traceback"])
-                            label = "ERROR" if has_err else "OK"
-                            print(f"[{count}] Turn {turn} | Line {call['line']}->{line_num} | {call['ts']} | {label}")
-                            print(f"  $ {truncate(call['command'], ml)}")
-                            if result_str.strip():
-                                print(f"  => {truncate(result_str, ml)}")
-                            print()
-                            del pending_bash[tid]
-                            break
-
-            elif t == "assistant":
-                msg = r.get("message", {})
-                content = msg.get("content", [])
-                if not isinstance(content, list):
-                    continue
-                assistant_uuid = r.get("uuid", "")
-
-                for block in content:
-                    bt = block.get("type")
-
-                    if bt == "text" and mode == "assistant":
-                        text = block.get("text", "")
-                        if text.strip():
-                            count += 1
-                            print(f"[{count}] Turn {turn} | Line {line_num} | {ts}")
-                            print(textwrap.indent(truncate(text, ml), "  "))
-                            print()
-
-                    elif bt == "thinking" and mode == "thinking":
-                        thinking = block.get("thinking", "")
-                        if thinking.strip():
-                            count += 1
-                            print(f"[{count}] Turn {turn} | Line {line_num} | {ts}")
-                            print(textwrap.indent(truncate(thinking, ml), "  "))
-                            print()
-
-                    elif bt == "tool_use":
-                        name = block.get("name", "?")
-                        tid = block.get("id", "")
-                        inp = block.get("input", {})
-
-                        if mode == "tools":
-                            summary = summarize_tool_input(name, inp)
-                            count += 1
-                            print(f"[{count}] Turn {turn} | Line {line_num} | {ts} | {name} [{tid[:25]}]")
-                            print(textwrap.indent(truncate(summary, ml), "  "))
-                            print()
-
-                        elif mode == "bash" and name == "Bash":
-                            pending_bash[tid] = {
-                                "command": inp.get("command", ""),
-                                "line": line_num,
-                                "ts": ts,
-                                "source_uuid": assistant_uuid,
-                            }
-
-                        elif mode == "edits" and name in ("Edit", "Write"):
-                            summary = summarize_tool_input(name, inp)
-                            count += 1
-                            print(f"[{count}] Turn {turn} | Line {line_num} | {ts} | {name}")
-                            print(textwrap.indent(truncate(summary, ml), "  "))
-                            print()
-
-                        elif mode == "agents" and name == "Agent":
-                            summary = summarize_tool_input(name, inp)
-                            count += 1
-                            print(f"[{count}] Turn {turn} | Line {line_num} | {ts}")
-                            print(textwrap.indent(truncate(summary, ml), "  "))
-                            print()
-
-    print("=" * 60)
-    print(f"Mode: {mode} | Total: {count}")
+    if args.turns and args.subagents:
+        parser.error("--turns numbers the main transcript's turns; use --since/--until with --subagents")
+
+    # A single transcript streams its records; with --subagents each one is
+    # analysed in a worker and printed under its source header afterwards
+    factory = partial(OnlyAnalyzer, mode=args.mode, max_len=args.max_len, turns=args.turns,
+                      since=args.since, until=args.until, max_items=args.max_items or None,
+                      stream=not args.subagents)
+    render_session(run_session(args.session_file, [factory], args.subagents))
     print_session_location(args.session_file)
 
 
 def print_session_location(path: str):
     p = Path(path).resolve()
-    session_dir = p.parent / p.stem
+    session_dir = p.parent / transcript_stem(p)
     print()
     print("SESSION FILES")
     print("-" * 50)
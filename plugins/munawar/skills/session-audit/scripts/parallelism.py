@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Find independent tool calls that were issued one model round trip at a time.
+
+Usage:
+    python3 parallelism.py <session.jsonl> [--top 15] [--min-run 2] [--json] [--subagents]
+
+Walks the assistant messages in order and collects runs of consecutive
+messages that each made a single read-only call (Read, Grep, Glob, web
+fetches, or Bash made only of read-only commands such as cat, ls or git
+status, without output redirection) where no call looks like it depended on
+an earlier one in the run:
+  - it doesn't name a file or path that appeared in an earlier call's result
+  - it doesn't repeat an earlier call's input (a retry)
+  - the previous call didn't fail
+A user prompt, a multi-call message, a message without calls or any other
+tool ends the run.
+
+For each run, estimates the wall clock batching it into one message would
+have saved: the model round trips of every message after the first, plus
+the tool time beyond the slowest call (run concurrently).
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, json_session, render_session, run_session  # noqa: E402
+from _records import command_key, extract_tool_result_text, fmt_duration, parse_ts, summarize_tool_input  # noqa: E402
+from _transcript import transcript_stem  # noqa: E402
+
+READ_ONLY_TOOLS = {"Read", "Grep", "Glob", "LS", "WebFetch", "WebSearch", "NotebookRead"}
+READ_ONLY_COMMANDS = {
+    "cat", "head", "tail", "ls", "find", "grep", "rg", "wc", "pwd", "tree", "file", "stat", "du", "which",
+    "echo", "sort", "uniq", "cut", "tr", "jq", "diff", "basename", "dirname", "realpath",
+    "git status", "git log", "git diff", "git show", "git blame", "git ls-files", "git branch",
+}
+SHELL_SEPARATOR = re.compile(r"&&|\|\||;|\|")
+WRITE_REDIRECT = re.compile(r"(?<![0-9&])>>?(?!&|\s*/dev/null)")
+RESULT_CHARS = 50000  # of each result kept for the dependency check
+PATH_WORD = re.compile(r"[\w.~-]*[/.][\w./~-]+")
+
+
+def targets(name: str, inp: dict) -> set[str]:
+    """Paths and URLs a call names — if an earlier result mentions one, the
+    call probably came from reading that result."""
+    if name == "Bash":
+        words = PATH_WORD.findall(inp.get("command", ""))
+    else:
+        words = [inp.get(k) for k in ("file_path", "notebook_path", "path", "url")]
+    found = set()
+    for w in words:
+        if isinstance(w, str) and len(w) >= 4 and w not in (".", ".."):
+            found.add(w)
+            base = os.path.basename(w.rstrip("/"))
+            if len(base) >= 4:
+                found.add(base)
+    return found
+
+
+class ParallelismAnalyzer(Analyzer):
+    """Runs of independent single-call messages that could have been one
+    message with parallel calls, and the wall clock that would have saved."""
+
+    name = "parallelism"
+
+    def __init__(self, path: str, top: int = 15, min_run: int = 2):
+        self.path = path
+        self.top = top
+        self.min_run = max(2, min_run)
+        self.trigger = None   # ts of the last prompt / tool_result record
+        self.message = None   # {"id", "trigger", "end", "line", "turn", "calls": {tid: [name, input]}}
+        self.steps = {}       # tool_use_id -> step of the current run awaiting its result
+        self.run = []         # steps of the current run
+        self.runs = []
+        self.single_call_messages = 0
+
+    def wants(self, e) -> bool:
+        if e.type == "assistant" and e.msg_id:
+            if not self.message or self.message["id"] != e.msg_id:
+                self._close_message()
+                self.message = {"id": e.msg_id, "trigger": self.trigger, "end": e.ts, "line": e.line,
+                                "turn": e.turn, "calls": {}}
+            self.message["end"] = e.ts or self.message["end"]
+            for tid, name in e.calls:
+                self.message["calls"][tid] = [name, {}]
+            return bool(e.calls)
+        if e.type != "user" or not (e.prompt or e.results):
+            return False
+
+        self._close_message()
+        if e.prompt:
+            self._flush()
+        self.trigger = e.ts or self.trigger
+        wanted = False
+        for tid, is_error, _ in e.results:
+            step = self.steps.get(tid)
+            if step:
+                start, end = parse_ts(step["call_ts"]), parse_ts(e.ts)
+                step["tool_s"] = max(0.0, (end - start).total_seconds()) if start and end else 0.0
+                step["error"] = is_error
+                wanted = True
+        return wanted
+
+    def on_tool_use(self, e, r, block):
+        call = self.message and self.message["calls"].get(block.get("id", ""))
+        if call:
+            call[1] = block.get("input", {})
+
+    def on_result(self, e, r, block):
+        step = self.steps.pop(block.get("tool_use_id", ""), None)
+        if step:
+            step["result"] = extract_tool_result_text(block)[:RESULT_CHARS]
+
+    def _close_message(self):
+        m, self.message = self.message, None
+        if not m:
+            return
+        if len(m["calls"]) != 1:
+            self._flush()
+            return
+        self.single_call_messages += 1
+        (tid, (name, inp)), = m["calls"].items()
+        if not self._read_only(name, inp):
+            self._flush()
+            return
+        start, end = parse_ts(m["trigger"]), parse_ts(m["end"])
+        step = {
+            "line": m["line"], "turn": m["turn"], "tool": name, "call_ts": m["end"],
+            "input": " ".join(summarize_tool_input(name, inp).split()),
+            "targets": targets(name, inp),
+            "model_s": max(0.0, (end - start).total_seconds()) if start and end else 0.0,
+            "tool_s": 0.0, "error": False, "result": "",
+        }
+        if self.run and self._depends(step):
+            self._flush()
+        self.run.append(step)
+        self.steps[tid] = step
+
+    @staticmethod
+    def _read_only(name: str, inp: dict) -> bool:
+        if name == "Bash":
+            command = inp.get("command", "")
+            if WRITE_REDIRECT.search(command) or "-delete" in command or "-exec" in command:
+                return False
+            keys = {command_key(segment) for segment in SHELL_SEPARATOR.split(command)} - {"(cd only)"}
+            return bool(keys) and keys <= READ_ONLY_COMMANDS
+        return name in READ_ONLY_TOOLS
+
+    def _depends(self, step: dict) -> bool:
+        if self.run[-1]["error"]:
+            return True
+        for prev in self.run:
+            if prev["input"] == step["input"]:
+                return True
+            if any(t in prev["result"] for t in step["targets"]):
+                return True
+        return False
+
+    def _flush(self):
+        run, self.run = self.run, []
+        self.steps.clear()
+        if len(run) < self.min_run:
+            return
+        tool_times = [s["tool_s"] for s in run]
+        saved = sum(s["model_s"] for s in run[1:]) + sum(tool_times) - max(tool_times)
+        self.runs.append({
+            "first_line": run[0]["line"],
+            "last_line": run[-1]["line"],
+            "turn": run[0]["turn"],
+            "calls": [{"tool": s["tool"], "input": s["input"], "line": s["line"],
+                       "model_s": s["model_s"], "tool_s": s["tool_s"]} for s in run],
+            "saved_s": saved,
+        })
+
+    def finish(self):
+        self._close_message()
+        self._flush()
+
+    def result(self) -> dict:
+        tools = Counter(c["tool"] for r in self.runs for c in r["calls"])
+        return {
+            "single_call_messages": self.single_call_messages,
+            "runs": len(self.runs),
+            "calls_in_runs": sum(len(r["calls"]) for r in self.runs),
+            "round_trips_avoidable": sum(len(r["calls"]) - 1 for r in self.runs),
+            "saved_s": sum(r["saved_s"] for r in self.runs),
+            "tools": dict(tools.most_common()),
+            "top_runs": sorted(self.runs, key=lambda r: r["saved_s"], reverse=True)[:self.top],
+        }
+
+    def render(self):
+        res = self.result()
+        print("MISSED PARALLELISM")
+        print("=" * 70)
+        print(f"Single-call messages:     {res['single_call_messages']}")
+        print(f"Batchable runs:           {res['runs']} ({res['calls_in_runs']} calls)")
+        print(f"Round trips avoidable:    {res['round_trips_avoidable']}")
+        print(f"Estimated time saved:     {fmt_duration(res['saved_s'])}")
+        if res["tools"]:
+            print("Tools in runs:            " + ", ".join(f"{k} {v}" for k, v in res["tools"].items()))
+        print()
+
+        if res["top_runs"]:
+            print(f"LARGEST RUNS (top {len(res['top_runs'])} by time saved)")
+            print("-" * 70)
+            for i, r in enumerate(res["top_runs"], 1):
+                print(f"  [{i}] {fmt_duration(r['saved_s'])} saved  {len(r['calls'])} calls  Turn {r['turn']} | "
+                      f"Lines {r['first_line']}-{r['last_line']}")
+                for c in r["calls"]:
+                    print(f"       L{c['line']:<6d} {c['tool']:6s} {c['input'][:100]}")
+            print()
+            print("To inspect a run, run:")
+            scripts_dir = Path(__file__).resolve().parent
+            print(f"  python3 {scripts_dir}/context.py {self.path} <LINE> [radius]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find independent tool calls that could have been batched")
+    parser.add_argument("session_file", help="Path to session JSONL")
+    parser.add_argument("--top", type=int, default=15, help="Runs to list (0=none)")
+    parser.add_argument("--min-run", type=int, default=2, help="Shortest run of single-call messages to report")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    parser.add_argument(
+        "--subagents", action="store_true", help="Also analyse each subagent transcript, plus a per-subagent rollup"
+    )
+    args = parser.parse_args()
+
+    factory = partial(ParallelismAnalyzer, top=args.top, min_run=args.min_run)
+    results = run_session(args.session_file, [factory], args.subagents)
+    if args.json:
+        print(json.dumps(json_session(results), indent=2))
+        return
+
+    render_session(results)
+    print_session_location(args.session_file)
+
+
+def print_session_location(path: str):
+    p = Path(path).resolve()
+    session_dir = p.parent / transcript_stem(p)
+    print()
+    print("SESSION FILES")
+    print("-" * 50)
+    print(f"  Transcript: {p}")
+    if session_dir.is_dir():
+        print(f"  Session dir: {session_dir}/")
+        for item in sorted(session_dir.rglob("*")):
+            rel = item.relative_to(session_dir)
+            suffix = "/" if item.is_dir() else f"  ({item.stat().st_size:,} bytes)"
+            print(f"    {rel}{suffix}")
+    else:
+        print("  Session dir: (none — no subagents or artifacts)")
+
+
+if __name__ == "__main__":
+    main()
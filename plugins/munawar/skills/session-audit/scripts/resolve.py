@@ -8,32 +8,102 @@ Outputs JSON with:
   - main: path to the main session JSONL
   - subagents: list of subagent JSONL paths
   - project_dir: the resolved project directory under ~/.claude/projects/
+
+Without --project-dir, the session is looked up in a cached session-id ->
+project map (~/.cache/session-audit/sessions.json). On a miss, only project
+directories whose mtime changed since the map was saved are re-listed.
 """
 import argparse
 import json
+import os
 import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(__file__))
+from _index import CACHE_DIR, index_enabled  # noqa: E402
+from _transcript import SUFFIXES, transcript_stem, transcripts_in  # noqa: E402
+
+SESSION_MAP_VERSION = 1
+
+
+def session_map_path() -> Path:
+    return CACHE_DIR / "sessions.json"
+
+
+def load_session_map(claude_dir: Path) -> dict:
+    """Saved {project name: {mtime_ns, sessions}} for claude_dir, or {}."""
+    if not index_enabled():
+        return {}
+    try:
+        data = json.loads(session_map_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != SESSION_MAP_VERSION or data.get("root") != str(claude_dir):
+        return {}
+    return data["projects"]
+
+
+def refresh_session_map(claude_dir: Path, projects: dict) -> dict:
+    """Re-list the project dirs created, removed or changed since `projects`
+    was saved. A directory's mtime changes whenever a session file is added
+    to or removed from it, so unchanged ones are reused as is."""
+    fresh = {}
+    with os.scandir(claude_dir) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            mtime = entry.stat().st_mtime_ns
+            old = projects.get(entry.name)
+            if old and old["mtime_ns"] == mtime:
+                fresh[entry.name] = old
+            else:
+                sessions = sorted(transcript_stem(p) for p in transcripts_in(entry.path))
+                fresh[entry.name] = {"mtime_ns": mtime, "sessions": sessions}
+    if index_enabled() and fresh != projects:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = session_map_path().with_suffix(f".tmp{os.getpid()}")
+            tmp.write_text(json.dumps({"version": SESSION_MAP_VERSION, "root": str(claude_dir), "projects": fresh}))
+            os.replace(tmp, session_map_path())
+        except OSError:
+            pass  # read-only cache — the lookup still works, just uncached
+    return fresh
+
+
+def lookup(session_id: str, projects: dict) -> str | None:
+    """Project holding the session (the first in sorted order, like a scan)."""
+    owner = {sid: name for name in sorted(projects, reverse=True) for sid in projects[name]["sessions"]}
+    return owner.get(session_id)
+
+
+def transcript_file(proj: Path, session_id: str) -> Path | None:
+    """The session's transcript in a project dir, plain or archived."""
+    for suffix in SUFFIXES:
+        if (proj / f"{session_id}{suffix}").exists():
+            return proj / f"{session_id}{suffix}"
+    return None
+
 
 def find_session(session_id: str, project_dir: str | None = None) -> dict:
     claude_dir = Path.home() / ".claude" / "projects"
 
-    # If project_dir given, encode it; otherwise search all project dirs
+    # If project_dir given, encode it; otherwise look the session up in the
+    # cached map, refreshing it on a miss, and fall back to a full scan
     candidates = []
     if project_dir:
         encoded = project_dir.replace("/", "-")
         candidates.append(claude_dir / encoded)
-    else:
-        if claude_dir.exists():
-            candidates = sorted(claude_dir.iterdir())
+    elif claude_dir.exists():
+        projects = load_session_map(claude_dir)
+        name = lookup(session_id, projects)
+        if not (name and transcript_file(claude_dir / name, session_id)):
+            name = lookup(session_id, refresh_session_map(claude_dir, projects))
+        candidates = [claude_dir / name] if name else sorted(claude_dir.iterdir())
 
     for proj in candidates:
-        main_file = proj / f"{session_id}.jsonl"
-        if main_file.exists():
-            subagent_dir = proj / session_id / "subagents"
-            subagents = []
-            if subagent_dir.exists():
-                subagents = sorted(str(p) for p in subagent_dir.glob("*.jsonl"))
+        main_file = transcript_file(proj, session_id)
+        if main_file:
+            subagents = [str(p) for p in transcripts_in(proj / session_id / "subagents")]
             return {
                 "main": str(main_file),
                 "subagents": subagents,
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Search every session transcript at once through a full-text index.
+
+Usage:
+    python3 search.py <query> [--scope user|both|all] [--project-dir /path/to/project]
+                      [--fts] [--limit 50] [--max-len 300] [--no-update] [--rebuild] [--json]
+
+Indexes the human text, assistant text, thinking, tool calls and tool results
+(the first 10,000 characters of each tool call and result) of all
+transcripts under ~/.claude/projects (main sessions and subagents) in a
+SQLite FTS5 trigram index, then lists the matching records, newest sessions
+first, with the session, file and line to pass to context.py.
+
+The query is a case-insensitive substring (like find.py with a plain
+keyword); --fts passes it through as an FTS5 query instead (AND, OR, NOT,
+"phrases", NEAR). Each run first brings the index up to date: new sessions are
+added, and grown ones only have their appended records indexed.
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer  # noqa: E402
+from _index import CACHE_DIR, adopt_archive, checkpoint_file, index_enabled, resume_file, scan  # noqa: E402
+from _records import excerpt, tool_input_text  # noqa: E402
+from _transcript import project_transcripts  # noqa: E402
+
+SEARCH_VERSION = 1
+TOOL_CHARS = 10000  # tool calls/results (often whole file contents) are cut here
+SCOPE_KINDS = {
+    "user": ["USER"],
+    "both": ["USER", "ASSISTANT"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    project TEXT,
+    session TEXT,
+    agent TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    fingerprint TEXT,
+    state TEXT
+);
+CREATE TABLE IF NOT EXISTS fields (
+    id INTEGER PRIMARY KEY,  -- rowid of the text in docs
+    file INTEGER,
+    line INTEGER,
+    turn INTEGER,
+    ts TEXT,
+    kind TEXT
+);
+CREATE INDEX IF NOT EXISTS fields_file ON fields (file);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(text, tokenize = 'trigram');
+"""
+INSERT_BATCH = 1000
+
+
+class FieldCollector(Analyzer):
+    """The searchable fields of each record, as find.py --scope all sees them."""
+
+    def __init__(self):
+        self.fields = []  # (kind, text)
+
+    def on_prompt(self, e, r, text):
+        self.fields.append(("USER", text))
+
+    def on_text(self, e, r, block):
+        self.fields.append(("ASSISTANT", block.get("text", "")))
+
+    def on_thinking(self, e, r, block):
+        self.fields.append(("THINKING", block.get("thinking", "")))
+
+    def on_tool_use(self, e, r, block):
+        name = block.get("name", "?")
+        text = tool_input_text(name, block.get("input", {}))
+        self.fields.append((f"TOOL CALL ({name})", text[:TOOL_CHARS]))
+
+    def on_result(self, e, r, block):
+        result = block.get("content", "")
+        if isinstance(result, list):
+            result = " ".join(
+                c.get("text", "") for c in result if c.get("type") == "text"
+            )
+        kind = "TOOL ERROR" if block.get("is_error") else "TOOL RESULT"
+        self.fields.append((kind, str(result)[:TOOL_CHARS]))
+
+
+def db_path() -> str:
+    if not index_enabled():
+        return ":memory:"  # no cache — index from scratch for this run only
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return str(CACHE_DIR / "search.db")
+
+
+def connect(rebuild: bool = False) -> sqlite3.Connection:
+    db = sqlite3.connect(db_path())
+    version = db.execute("PRAGMA user_version").fetchone()[0]
+    if rebuild or version != SEARCH_VERSION:
+        db.executescript("DROP TABLE IF EXISTS docs; DROP TABLE IF EXISTS fields; DROP TABLE IF EXISTS files;")
+    try:
+        db.executescript(SCHEMA)
+    except sqlite3.OperationalError as e:
+        print(f"SQLite FTS5 with the trigram tokenizer is required (SQLite >= 3.34): {e}", file=sys.stderr)
+        sys.exit(1)
+    db.execute(f"PRAGMA user_version = {SEARCH_VERSION}")
+    return db
+
+
+def index_file(db: sqlite3.Connection, path: Path, known) -> int | None:
+    """Index what's new in one transcript; returns fields added (None if unchanged)."""
+    resumed = resume_file(db, path, known, lambda file_id: delete_fields(db, file_id))
+    if resumed is None:
+        return None
+    file_id, state, stat = resumed
+
+    collector = FieldCollector()
+    next_id = db.execute("SELECT coalesce(max(id), 0) + 1 FROM fields").fetchone()[0]
+    first_id = next_id
+    meta, texts = [], []
+    for e, r in scan(str(path), state, fields=None):
+        if r is None:
+            continue
+        collector.fields.clear()
+        collector.feed(e, r)
+        for kind, text in collector.fields:
+            if text:
+                meta.append((next_id, file_id, e.line, e.turn, e.ts[:19], kind))
+                texts.append((next_id, text))
+                next_id += 1
+        if len(meta) >= INSERT_BATCH:
+            insert_fields(db, meta, texts)
+    insert_fields(db, meta, texts)
+    checkpoint_file(db, file_id, path, state, stat)
+    return next_id - first_id
+
+
+def insert_fields(db: sqlite3.Connection, meta: list, texts: list):
+    db.executemany("INSERT INTO fields (id, file, line, turn, ts, kind) VALUES (?, ?, ?, ?, ?, ?)", meta)
+    db.executemany("INSERT INTO docs (rowid, text) VALUES (?, ?)", texts)
+    meta.clear()
+    texts.clear()
+
+
+def delete_fields(db: sqlite3.Connection, file_id: int):
+    db.execute("DELETE FROM docs WHERE rowid IN (SELECT id FROM fields WHERE file = ?)", (file_id,))
+    db.execute("DELETE FROM fields WHERE file = ?", (file_id,))
+
+
+def update(db: sqlite3.Connection, project_dirs: list[Path], prefix: str) -> dict:
+    """Bring the index up to date with the transcripts in project_dirs, and
+    drop the indexed ones under prefix that no longer exist."""
+    known = {
+        row[1]: (row[0], *row[2:])
+        for row in db.execute("SELECT id, path, size, mtime_ns, fingerprint, state FROM files")
+        if row[1].startswith(prefix)
+    }
+    counts = {"transcripts": 0, "updated": 0, "fields": 0}
+    for path in project_transcripts(project_dirs):
+        counts["transcripts"] += 1
+        try:
+            with db:  # one transaction per file, so an interrupted update keeps its progress
+                row = known.pop(str(path), None) or adopt_archive(db, path, known)
+                added = index_file(db, path, row)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}", file=sys.stderr)
+            continue
+        if added is not None:
+            counts["updated"] += 1
+            counts["fields"] += added
+    with db:
+        for file_id, *_ in known.values():  # transcripts that no longer exist
+            delete_fields(db, file_id)
+            db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+    return counts
+
+
+def search(db: sqlite3.Connection, query: str, scope: str, fts: bool,
+           prefix: str, limit: int | None) -> tuple[int, list[dict]]:
+    """Return (total matches, hits) among transcripts whose path starts with
+    prefix, hits ordered newest session first."""
+    if fts:
+        match = "docs MATCH ?", query
+    elif len(query) >= 3:
+        match = "docs MATCH ?", '"' + query.replace('"', '""') + '"'
+    else:  # too short for trigrams — scan instead
+        match = "docs.text LIKE ? ESCAPE '\\'", "%" + re.sub(r"([\\%_])", r"\\\1", query) + "%"
+    where, params = [match[0], "substr(files.path, 1, ?) = ?"], [match[1], len(prefix), prefix]
+    if scope in SCOPE_KINDS:
+        kinds = SCOPE_KINDS[scope]
+        where.append(f"fields.kind IN ({', '.join('?' * len(kinds))})")
+        params += kinds
+    # Filter and sort on the fields table; the text is only read for the hits shown
+    sql = (
+        "FROM docs JOIN fields ON fields.id = docs.rowid JOIN files ON files.id = fields.file "
+        f"WHERE {' AND '.join(where)}"
+    )
+    total = db.execute(f"SELECT count(*) {sql}", params).fetchone()[0]
+    rows = db.execute(
+        "SELECT fields.id, files.path, files.project, files.session, files.agent, "
+        f"fields.line, fields.turn, fields.ts, fields.kind {sql} "
+        "ORDER BY files.mtime_ns DESC, files.path, fields.line" + (" LIMIT ?" if limit else ""),
+        params + ([limit] if limit else []),
+    ).fetchall()
+
+    needle = None if fts else re.compile(re.escape(query), re.IGNORECASE)
+    hits = []
+    for doc_id, path, project, session, agent, line, turn, ts, kind in rows:
+        if fts:
+            text = db.execute(
+                "SELECT highlight(docs, 0, char(1), char(2)) FROM docs WHERE docs MATCH ? AND rowid = ?",
+                (query, doc_id),
+            ).fetchone()[0]
+        else:
+            text = db.execute("SELECT text FROM docs WHERE rowid = ?", (doc_id,)).fetchone()[0]
+        hits.append({
+            "session": session,
+            "agent": agent,
+            "project": project,
+            "file": path,
+            "line": line,
+            "turn": turn,
+            "ts": ts,
+            "field": kind,
+            "snippet": snippet(text, needle),
+        })
+    return total, hits
+
+
+def snippet(text: str, needle: re.Pattern | None) -> str:
+    """Excerpt around the first match, marked with ** like find.py."""
+    if needle:
+        m = needle.search(text)
+        return excerpt(text, m.span()) if m else text[:160].replace("\n", " ")
+    # FTS query: highlight() marked every matched phrase with \x01...\x02
+    m = re.search("\x01(.*?)\x02", text, re.DOTALL)
+    if not m:
+        return text[:160].replace("\n", " ")
+    return excerpt(text, m.span()).replace("\x01", "").replace("\x02", "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search all session transcripts through a full-text index")
+    parser.add_argument("query", help="Text to search for (case-insensitive substring; see --fts)")
+    parser.add_argument(
+        "--scope",
+        choices=["user", "both", "all"],
+        default="all",
+        help="What to search: user (human text only), both (human + assistant text), all (everything including tools)",
+    )
+    parser.add_argument("--project-dir", help="Only search sessions of this project root path")
+    parser.add_argument("--fts", action="store_true", help="Treat the query as an FTS5 query (AND/OR/NOT/NEAR, \"phrases\")")
+    parser.add_argument("--limit", type=int, default=50, help="Max matches listed (0=unlimited)")
+    parser.add_argument("--max-len", type=int, default=300, help="Max snippet length (0=unlimited)")
+    parser.add_argument("--no-update", action="store_true", help="Query the index as is, without checking for new records")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the index and rebuild it from scratch")
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    claude_dir = Path.home() / ".claude" / "projects"
+    if args.project_dir:
+        root = claude_dir / args.project_dir.replace("/", "-")
+        project_dirs = [root]
+    else:
+        root = claude_dir
+        project_dirs = sorted(p for p in claude_dir.iterdir() if p.is_dir()) if claude_dir.exists() else []
+
+    db = connect(args.rebuild)
+    t0 = time.perf_counter()
+    prefix = str(root) + os.sep
+    counts = None if args.no_update else update(db, project_dirs, prefix)
+    t1 = time.perf_counter()
+    try:
+        total, hits = search(db, args.query, args.scope, args.fts, prefix, args.limit or None)
+    except sqlite3.OperationalError as e:
+        print(f"Invalid FTS5 query: {e}", file=sys.stderr)
+        sys.exit(1)
+    t2 = time.perf_counter()
+
+    if args.json:
+        print(json.dumps({
+            "query": args.query,
+            "scope": args.scope,
+            "total": total,
+            "index": counts,
+            "matches": hits,
+        }, indent=2))
+        return
+
+    print(f"SEARCH ALL SESSIONS: {args.query!r} (scope={args.scope}{', fts' if args.fts else ''})")
+    print("=" * 70)
+    print(f"Matches: {total}")
+    if counts:
+        print(f"Index: {counts['transcripts']} transcripts, {counts['updated']} updated "
+              f"(+{counts['fields']} fields) in {t1 - t0:.2f}s; query {t2 - t1:.2f}s")
+    print()
+
+    for i, hit in enumerate(hits, 1):
+        text = hit["snippet"]
+        if args.max_len > 0 and len(text) > args.max_len:
+            text = text[:args.max_len] + "..."
+        who = hit["session"] + (f" / {hit['agent']}" if hit["agent"] else "")
+        print(f"  [{i}] {who} | Turn {hit['turn']} | Line {hit['line']} | {hit['ts']} | {hit['field']}")
+        print(f"       {text}")
+        print(f"       {hit['file']}")
+        print()
+
+    if total > len(hits):
+        print(f"  ... and {total - len(hits)} more (raise --limit to see them)")
+        print()
+    if hits:
+        print("-" * 70)
+        print("To drill into a specific match, run:")
+        scripts_dir = Path(__file__).resolve().parent
+        print(f"  python3 {scripts_dir}/context.py <FILE> <LINE> [radius]")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,133 +2,330 @@
 """Compute session statistics from a JSONL file.
 
 Usage:
-    python3 stats.py <session.jsonl>
+    python3 stats.py <session.jsonl> [--subagents] [--jobs N]
+    python3 stats.py --batch <projects-root|project-dir|glob> [--jobs N] [--json | --csv]
 
 Shows: turn counts, token usage, tool call breakdown, timing, errors.
+
+--batch computes the stats of every session found (main transcripts, with
+their subagents' tokens, tool calls and errors rolled in) in a process pool,
+and reports per-project and overall totals. --json and --csv emit the
+per-session rows (plus totals, for --json) instead.
+
+A large transcript that isn't indexed yet is split at line boundaries and
+indexed in chunks across --jobs processes, with the same result as a
+sequential pass.
 """
+import argparse
+import csv
 import json
+import os
 import sys
-from collections import Counter
-from datetime import datetime
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, render_session, run, run_session, subagent_files
+from _index import load_summary, save_summary, set_parallel
+from _records import parse_ts
+from _transcript import find_sessions, transcript_stem
 
-def parse_ts(ts_str: str) -> datetime | None:
-    if not ts_str:
-        return None
-    try:
-        return datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
-    except (ValueError, TypeError):
-        return None
 
+class StatsAnalyzer(Analyzer):
+    """Turn counts, token usage, tool call breakdown and timing.
 
-def main():
-    path = sys.argv[1] if len(sys.argv) > 1 else None
-    if not path:
-        print("Usage: stats.py <session.jsonl>", file=sys.stderr)
-        sys.exit(1)
-
-    type_counts = Counter()
-    tool_calls = Counter()
-    content_block_types = Counter()
-    total_input_tokens = 0
-    total_output_tokens = 0
-    total_cache_read = 0
-    total_cache_create = 0
-    user_messages = 0
-    assistant_text_blocks = 0
-    thinking_blocks = 0
-    errors = 0
-    timestamps = []
-
-    with open(path) as f:
-        for line in f:
-            r = json.loads(line)
-            t = r.get("type", "?")
-            type_counts[t] += 1
-
-            ts = parse_ts(r.get("timestamp", ""))
-            if ts:
-                timestamps.append(ts)
-
-            if t == "user":
-                msg = r.get("message", {})
-                content = msg.get("content")
-                if isinstance(content, str):
-                    user_messages += 1
-                elif isinstance(content, list):
-                    for block in content:
-                        if block.get("is_error"):
-                            errors += 1
-
-            elif t == "assistant":
-                msg = r.get("message", {})
-                usage = msg.get("usage", {})
-                total_input_tokens += usage.get("input_tokens", 0)
-                total_output_tokens += usage.get("output_tokens", 0)
-                total_cache_read += usage.get("cache_read_input_tokens", 0)
-                total_cache_create += usage.get("cache_creation_input_tokens", 0)
-
-                for block in msg.get("content", []):
-                    bt = block.get("type", "?")
-                    content_block_types[bt] += 1
-
-                    if bt == "tool_use":
-                        tool_calls[block.get("name", "?")] += 1
-                    elif bt == "text":
-                        assistant_text_blocks += 1
-                    elif bt == "thinking":
-                        thinking_blocks += 1
-
-    # Timing
-    duration = ""
-    if len(timestamps) >= 2:
-        span = max(timestamps) - min(timestamps)
-        mins = int(span.total_seconds() // 60)
-        secs = int(span.total_seconds() % 60)
-        duration = f"{mins}m {secs}s"
-        start = min(timestamps).strftime("%H:%M:%S")
-        end = max(timestamps).strftime("%H:%M:%S")
-        duration = f"{start} -> {end} ({duration})"
-
-    print("SESSION STATS")
+    Works from the sidecar index alone — no record is decoded — and resumes
+    from the totals saved by the previous run, so a growing session only has
+    its new records counted.
+    """
+
+    name = "stats"
+    fields = {}
+
+    def __init__(self, path: str):
+        self.path = path
+        saved = load_summary(path, "stats") or {}
+        self.start = saved.get("offset", 0)
+        self.type_counts = Counter(saved.get("type_counts", {}))
+        self.tool_calls = Counter(saved.get("tool_calls", {}))
+        self.content_block_types = Counter(saved.get("content_block_types", {}))
+        self.usage = saved.get("usage", [0, 0, 0, 0])  # input, output, cache read, cache create
+        self.user_messages = saved.get("user_messages", 0)
+        self.assistant_text_blocks = saved.get("assistant_text_blocks", 0)
+        self.thinking_blocks = saved.get("thinking_blocks", 0)
+        self.errors = saved.get("errors", 0)
+        self.ts_count = saved.get("ts_count", 0)
+        self.first = parse_ts(saved.get("first", ""))
+        self.last = parse_ts(saved.get("last", ""))
+
+    def wants(self, e) -> bool:
+        self.type_counts[e.type] += 1
+
+        ts = parse_ts(e.ts)
+        if ts:
+            self.ts_count += 1
+            self.first = ts if self.first is None else min(self.first, ts)
+            self.last = ts if self.last is None else max(self.last, ts)
+
+        if e.prompt:
+            self.user_messages += 1
+        self.errors += sum(1 for _, is_error, _ in e.results if is_error)
+
+        if e.usage:
+            self.usage = [a + b for a, b in zip(self.usage, e.usage)]
+
+        for bt in e.blocks:
+            self.content_block_types[bt] += 1
+            if bt == "text":
+                self.assistant_text_blocks += 1
+            elif bt == "thinking":
+                self.thinking_blocks += 1
+        for _, name in e.calls:
+            self.tool_calls[name] += 1
+        return False
+
+    def finish(self):
+        save_summary(self.path, "stats", {
+            "type_counts": self.type_counts,
+            "tool_calls": self.tool_calls,
+            "content_block_types": self.content_block_types,
+            "usage": self.usage,
+            "user_messages": self.user_messages,
+            "assistant_text_blocks": self.assistant_text_blocks,
+            "thinking_blocks": self.thinking_blocks,
+            "errors": self.errors,
+            "ts_count": self.ts_count,
+            "first": self.first.isoformat() if self.first else "",
+            "last": self.last.isoformat() if self.last else "",
+        })
+
+    def result(self) -> dict:
+        timed = self.ts_count >= 2
+        return {
+            "start": self.first.isoformat() if timed else None,
+            "end": self.last.isoformat() if timed else None,
+            "duration_s": (self.last - self.first).total_seconds() if timed else None,
+            "user_messages": self.user_messages,
+            "assistant_records": self.type_counts.get("assistant", 0),
+            "text_blocks": self.assistant_text_blocks,
+            "thinking_blocks": self.thinking_blocks,
+            "tool_errors": self.errors,
+            "record_types": dict(self.type_counts.most_common()),
+            "usage": dict(zip(["input", "output", "cache_read", "cache_create"], self.usage)),
+            "tool_calls": dict(self.tool_calls.most_common()),
+        }
+
+    def render(self):
+        total_input_tokens, total_output_tokens, total_cache_read, total_cache_create = self.usage
+        type_counts = self.type_counts
+        tool_calls = self.tool_calls
+
+        # Timing
+        duration = ""
+        if self.ts_count >= 2:
+            span = self.last - self.first
+            mins = int(span.total_seconds() // 60)
+            secs = int(span.total_seconds() % 60)
+            duration = f"{mins}m {secs}s"
+            start = self.first.strftime("%H:%M:%S")
+            end = self.last.strftime("%H:%M:%S")
+            duration = f"{start} -> {end} ({duration})"
+
+        print("SESSION STATS")
+        print("=" * 50)
+        print(f"Duration:          {duration or 'N/A'}")
+        print(f"User messages:     {self.user_messages}")
+        print(f"Assistant turns:   {type_counts.get('assistant', 0)}")
+        print(f"  Text blocks:     {self.assistant_text_blocks}")
+        print(f"  Thinking blocks: {self.thinking_blocks}")
+        print(f"Tool errors:       {self.errors}")
+        print()
+
+        print("RECORD TYPES")
+        print("-" * 30)
+        for t, count in type_counts.most_common():
+            print(f"  {t:30s} {count}")
+        print()
+
+        print("TOKEN USAGE")
+        print("-" * 30)
+        print(f"  Input tokens:    {total_input_tokens:,}")
+        print(f"  Output tokens:   {total_output_tokens:,}")
+        print(f"  Cache read:      {total_cache_read:,}")
+        print(f"  Cache created:   {total_cache_create:,}")
+        print()
+
+        if tool_calls:
+            print("TOOL CALLS")
+            print("-" * 30)
+            total = sum(tool_calls.values())
+            for name, count in tool_calls.most_common():
+                print(f"  {name:25s} {count:3d}  ({count*100//total}%)")
+            print(f"  {'TOTAL':25s} {total:3d}")
+
+
+FLEET_COLUMNS = [
+    "project", "session", "subagents", "start", "end", "duration_s", "user_messages",
+    "assistant_records", "tool_calls", "tool_errors", "input", "output", "cache_read", "cache_create",
+]
+
+
+def session_stats(path: str) -> dict:
+    """Stats of one transcript (a process-pool task)."""
+    analyzer = StatsAnalyzer(path)
+    run(path, [analyzer])
+    return analyzer.result()
+
+
+def fleet_stats(target: str, jobs: int | None) -> list[dict]:
+    """One row per session, its subagent transcripts rolled in."""
+    rows, owner = {}, {}
+    for main_file in find_sessions(target):
+        key = str(main_file)
+        rows[key] = {"project": main_file.parent.name, "session": transcript_stem(main_file), "file": key,
+                     "subagents": 0, "tools": Counter()}
+        owner[key] = key
+        for sub in subagent_files(key):
+            owner[str(sub)] = key
+            rows[key]["subagents"] += 1
+
+    # Largest first, so one big transcript doesn't finish last on its own
+    paths = sorted(owner, key=lambda f: os.path.getsize(f), reverse=True)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(session_stats, f): f for f in paths}
+        for future in as_completed(futures):
+            f = futures[future]
+            try:
+                result = future.result()
+            except (OSError, ValueError) as e:
+                print(f"Skipping {f}: {e}", file=sys.stderr)
+                continue
+            row = rows[owner[f]]
+            if f == owner[f]:
+                row.update(start=result["start"], end=result["end"], duration_s=result["duration_s"],
+                           user_messages=result["user_messages"])
+            row["assistant_records"] = row.get("assistant_records", 0) + result["assistant_records"]
+            row["tool_errors"] = row.get("tool_errors", 0) + result["tool_errors"]
+            for k, v in result["usage"].items():
+                row[k] = row.get(k, 0) + v
+            row["tools"].update(result["tool_calls"])
+    out = []
+    for row in rows.values():
+        if "user_messages" not in row:
+            continue  # main transcript failed
+        row["tool_calls"] = sum(row["tools"].values())
+        out.append(row)
+    return out
+
+
+def fleet_totals(rows: list[dict]) -> dict:
+    """Per-project and overall sums of the numeric columns, plus the tool mix."""
+    def blank():
+        return {"sessions": 0, "subagents": 0, "duration_s": 0.0, "user_messages": 0, "assistant_records": 0,
+                "tool_calls": 0, "tool_errors": 0, "input": 0, "output": 0, "cache_read": 0,
+                "cache_create": 0, "tools": Counter()}
+
+    projects = defaultdict(blank)
+    overall = blank()
+    for row in rows:
+        for total in (projects[row["project"]], overall):
+            total["sessions"] += 1
+            total["tools"].update(row["tools"])
+            for k in total:
+                if k not in ("sessions", "tools"):
+                    total[k] += row[k] or 0
+    for total in [*projects.values(), overall]:
+        total["error_rate"] = total["tool_errors"] / total["tool_calls"] if total["tool_calls"] else 0.0
+        total["tools"] = dict(total["tools"].most_common())
+    overall["projects"] = len(projects)
+    return {"projects": dict(sorted(projects.items())), "overall": overall}
+
+
+def render_fleet(target: str, totals: dict):
+    overall = totals["overall"]
+
+    def hours(seconds: float) -> str:
+        return f"{int(seconds // 3600)}h {int(seconds % 3600 // 60)}m"
+
+    print(f"FLEET STATS: {target}")
     print("=" * 50)
-    print(f"Duration:          {duration or 'N/A'}")
-    print(f"User messages:     {user_messages}")
-    print(f"Assistant turns:   {type_counts.get('assistant', 0)}")
-    print(f"  Text blocks:     {assistant_text_blocks}")
-    print(f"  Thinking blocks: {thinking_blocks}")
-    print(f"Tool errors:       {errors}")
+    print(f"Sessions:          {overall['sessions']} ({overall['subagents']} subagents) in {overall['projects']} projects")
+    print(f"Duration:          {hours(overall['duration_s'])} total")
+    print(f"User messages:     {overall['user_messages']}")
+    print(f"Assistant turns:   {overall['assistant_records']}")
+    print(f"Tool calls:        {overall['tool_calls']}")
+    print(f"Tool errors:       {overall['tool_errors']} ({overall['error_rate']:.1%})")
     print()
 
-    print("RECORD TYPES")
+    print("TOKEN USAGE")
     print("-" * 30)
-    for t, count in type_counts.most_common():
-        print(f"  {t:30s} {count}")
+    print(f"  Input tokens:    {overall['input']:,}")
+    print(f"  Output tokens:   {overall['output']:,}")
+    print(f"  Cache read:      {overall['cache_read']:,}")
+    print(f"  Cache created:   {overall['cache_create']:,}")
     print()
 
-    print("TOKEN USAGE")
+    print("BY PROJECT (by output tokens)")
     print("-" * 30)
-    print(f"  Input tokens:    {total_input_tokens:,}")
-    print(f"  Output tokens:   {total_output_tokens:,}")
-    print(f"  Cache read:      {total_cache_read:,}")
-    print(f"  Cache created:   {total_cache_create:,}")
+    print(f"  {'project':40s} {'sessions':>8s} {'input':>12s} {'output':>12s} {'cache read':>14s} "
+          f"{'tools':>7s} {'errors':>12s} {'duration':>9s}")
+    by_output = sorted(totals["projects"].items(), key=lambda kv: kv[1]["output"], reverse=True)
+    for name, t in by_output:
+        errors = f"{t['tool_errors']} ({t['error_rate']:.0%})"
+        print(f"  {name[-40:]:40s} {t['sessions']:8d} {t['input']:12,} {t['output']:12,} {t['cache_read']:14,} "
+              f"{t['tool_calls']:7d} {errors:>12s} {hours(t['duration_s']):>9s}")
     print()
 
-    if tool_calls:
+    if overall["tools"]:
         print("TOOL CALLS")
         print("-" * 30)
-        total = sum(tool_calls.values())
-        for name, count in tool_calls.most_common():
-            print(f"  {name:25s} {count:3d}  ({count*100//total}%)")
-        print(f"  {'TOTAL':25s} {total:3d}")
+        total = overall["tool_calls"]
+        for name, count in overall["tools"].items():
+            print(f"  {name:25s} {count:6d}  ({count*100//total}%)")
+        print(f"  {'TOTAL':25s} {total:6d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute session statistics")
+    parser.add_argument("session_file", nargs="?", help="Path to session JSONL")
+    parser.add_argument("--batch", metavar="TARGET",
+                        help="Projects root (e.g. ~/.claude/projects), project dir, or glob of session JSONLs")
+    parser.add_argument("--subagents", action="store_true",
+                        help="Also report each subagent transcript, plus a per-subagent rollup")
+    parser.add_argument("--jobs", type=int,
+                        help="Worker processes for --batch/--subagents and for indexing (default: CPU count)")
+    fmt = parser.add_mutually_exclusive_group()
+    fmt.add_argument("--json", action="store_true", help="Emit --batch results as JSON")
+    fmt.add_argument("--csv", action="store_true", help="Emit --batch per-session rows as CSV")
+    args = parser.parse_args()
+
+    if args.batch:
+        rows = fleet_stats(args.batch, args.jobs)
+        rows.sort(key=lambda r: (r["project"], r["start"] or "", r["session"]))
+        totals = fleet_totals(rows)
+        if args.csv:
+            writer = csv.DictWriter(sys.stdout, FLEET_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        elif args.json:
+            print(json.dumps({"target": args.batch, "sessions": rows, **totals}, indent=2))
+        else:
+            render_fleet(args.batch, totals)
+        return
+
+    path = args.session_file
+    if not path:
+        parser.error("a session JSONL or --batch is required")
 
+    set_parallel(args.jobs)
+    render_session(run_session(path, [StatsAnalyzer], args.subagents, args.jobs))
     print_session_location(path)
 
 
 def print_session_location(path: str):
     p = Path(path).resolve()
-    session_dir = p.parent / p.stem  # e.g. .../projects/<proj>/<session-id>/
+    session_dir = p.parent / transcript_stem(p)  # e.g. .../projects/<proj>/<session-id>/
     print()
     print("SESSION FILES")
     print("-" * 50)
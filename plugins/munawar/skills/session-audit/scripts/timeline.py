@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Per-response model latency and throughput timeline of a session.
+
+Usage:
+    python3 timeline.py <session.jsonl> [--top 10] [--buckets 4] [--json | --csv] [--subagents]
+
+For every assistant response (the records sharing one message id) reports:
+  - latency: time from the preceding user prompt / tool_result record to the
+    response's last record (messages with no token usage, such as
+    <synthetic> placeholders, are skipped)
+  - output tokens, and output tokens per second of latency
+  - context: the input tokens sent with it (input + cache read + cache create)
+
+Prints p50/p90/p95/max of each, the same split by context size to show
+whether responses slow down as the context grows, and the slowest responses.
+--csv emits the full timeline, --json the timeline plus the summary. Works
+from the sidecar index alone — no record is decoded.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _engine import Analyzer, json_session, render_session, run_session  # noqa: E402
+from _records import fmt_duration, parse_ts, percentile  # noqa: E402
+from _transcript import transcript_stem  # noqa: E402
+
+COLUMNS = ["line", "turn", "ts", "latency_s", "output_tokens", "tokens_per_s", "context_tokens"]
+METRICS = [("latency_s", "Latency"), ("output_tokens", "Output tokens"),
+           ("tokens_per_s", "Tokens/s"), ("context_tokens", "Context tokens")]
+
+
+def distribution(values: list) -> dict | None:
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    return {"p50": percentile(values, 0.5), "p90": percentile(values, 0.9),
+            "p95": percentile(values, 0.95), "max": values[-1]}
+
+
+class TimelineAnalyzer(Analyzer):
+    """Latency, output tokens, tokens/s and context size of each assistant
+    response."""
+
+    name = "timeline"
+
+    def __init__(self, path: str, top: int = 10, buckets: int = 4):
+        self.path = path
+        self.top = top
+        self.buckets = buckets
+        self.rows = []
+        self.trigger = None   # ts of the last prompt / tool_result record
+        self.current = None   # [msg_id, trigger ts, first line, turn, first ts, last ts, usage]
+
+    def wants(self, e) -> bool:
+        if e.type == "assistant" and e.msg_id:
+            if self.current and self.current[0] == e.msg_id:
+                self.current[5] = e.ts or self.current[5]
+                self.current[6] = e.usage or self.current[6]
+            else:
+                self._close()
+                self.current = [e.msg_id, self.trigger, e.line, e.turn, e.ts, e.ts, e.usage]
+        elif e.type == "user" and (e.prompt or e.results):
+            self._close()
+            self.trigger = e.ts or self.trigger
+        return False
+
+    def _close(self):
+        if not self.current:
+            return
+        _, trigger, line, turn, first_ts, last_ts, usage = self.current
+        self.current = None
+        if not usage or not any(usage):
+            return  # locally generated (<synthetic>) message, not a model call
+        start, end = parse_ts(trigger), parse_ts(last_ts)
+        latency = max(0.0, (end - start).total_seconds()) if start and end else None
+        output = usage[1]
+        self.rows.append({
+            "line": line,
+            "turn": turn,
+            "ts": first_ts,
+            "latency_s": latency,
+            "output_tokens": output,
+            "tokens_per_s": output / latency if latency and output else None,
+            "context_tokens": usage[0] + usage[2] + usage[3],
+        })
+
+    def finish(self):
+        self._close()
+
+    def result(self) -> dict:
+        summary = {key: distribution([r[key] for r in self.rows]) for key, _ in METRICS}
+
+        # Equal-count slices of the responses ordered by context size
+        by_context = []
+        ordered = sorted(self.rows, key=lambda r: r["context_tokens"])
+        n = min(self.buckets, len(ordered))
+        for i in range(n):
+            part = ordered[i * len(ordered) // n:(i + 1) * len(ordered) // n]
+            by_context.append({
+                "context_min": part[0]["context_tokens"],
+                "context_max": part[-1]["context_tokens"],
+                "responses": len(part),
+                "latency_s": distribution([r["latency_s"] for r in part]),
+                "tokens_per_s": distribution([r["tokens_per_s"] for r in part]),
+            })
+
+        timed = [r for r in self.rows if r["latency_s"] is not None]
+        slowest = sorted(timed, key=lambda r: r["latency_s"], reverse=True)[:self.top]
+        return {
+            "responses": len(self.rows),
+            "summary": summary,
+            "by_context": by_context,
+            "slowest": slowest,
+            "timeline": self.rows,
+        }
+
+    def render(self):
+        res = self.result()
+        print("MODEL RESPONSE TIMELINE")
+        print("=" * 70)
+        print(f"Responses:           {res['responses']}")
+        if not res["responses"]:
+            return
+        print()
+
+        def fmt(key, value):
+            if value is None:
+                return "-"
+            if key == "latency_s":
+                return fmt_duration(value)
+            if key == "tokens_per_s":
+                return f"{value:.1f}"
+            return f"{value:,}"
+
+        print(f"  {'':16s} {'p50':>10s} {'p90':>10s} {'p95':>10s} {'max':>10s}")
+        for key, label in METRICS:
+            d = res["summary"][key]
+            if d:
+                print(f"  {label:16s} " + " ".join(f"{fmt(key, d[q]):>10s}" for q in ("p50", "p90", "p95", "max")))
+        print()
+
+        if len(res["by_context"]) > 1:
+            print("BY CONTEXT SIZE (median per slice)")
+            print("-" * 70)
+            print(f"  {'context tokens':>25s} {'responses':>10s} {'latency':>10s} {'tokens/s':>10s}")
+            for b in res["by_context"]:
+                span = f"{b['context_min']:,}-{b['context_max']:,}"
+                latency = b["latency_s"] and b["latency_s"]["p50"]
+                rate = b["tokens_per_s"] and b["tokens_per_s"]["p50"]
+                print(f"  {span:>25s} {b['responses']:10d} {fmt('latency_s', latency):>10s} "
+                      f"{fmt('tokens_per_s', rate):>10s}")
+            print()
+
+        if res["slowest"]:
+            print(f"SLOWEST RESPONSES (top {len(res['slowest'])})")
+            print("-" * 70)
+            for i, r in enumerate(res["slowest"], 1):
+                print(f"  [{i}] {fmt_duration(r['latency_s']):>8s}  Turn {r['turn']} | Line {r['line']} | "
+                      f"{r['output_tokens']:,} out, {fmt('tokens_per_s', r['tokens_per_s'])} tok/s, "
+                      f"{r['context_tokens']:,} context")
+            print()
+            print("To inspect a response, run:")
+            scripts_dir = Path(__file__).resolve().parent
+            print(f"  python3 {scripts_dir}/context.py {self.path} <LINE> [radius]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-response model latency and throughput timeline")
+    parser.add_argument("session_file", help="Path to session JSONL")
+    parser.add_argument("--top", type=int, default=10, help="Slowest responses to list (0=none)")
+    parser.add_argument("--buckets", type=int, default=4, help="Context-size slices to compare (default: 4)")
+    parser.add_argument(
+        "--subagents", action="store_true", help="Also report each subagent transcript, plus a per-subagent rollup"
+    )
+    fmt = parser.add_mutually_exclusive_group()
+    fmt.add_argument("--json", action="store_true", help="Emit the timeline and summary as JSON")
+    fmt.add_argument("--csv", action="store_true", help="Emit one CSV row per response")
+    args = parser.parse_args()
+
+    factory = partial(TimelineAnalyzer, top=args.top, buckets=max(1, args.buckets))
+    results = run_session(args.session_file, [factory], args.subagents)
+    if args.csv:
+        writer = csv.DictWriter(sys.stdout, ["source", *COLUMNS])
+        writer.writeheader()
+        for label, _, analyzers in results:
+            writer.writerows({"source": label, **row} for row in analyzers[0].rows)
+        return
+    if args.json:
+        print(json.dumps(json_session(results), indent=2))
+        return
+
+    render_session(results)
+    print_session_location(args.session_file)
+
+
+def print_session_location(path: str):
+    p = Path(path).resolve()
+    session_dir = p.parent / transcript_stem(p)
+    print()
+    print("SESSION FILES")
+    print("-" * 50)
+    print(f"  Transcript: {p}")
+    if session_dir.is_dir():
+        print(f"  Session dir: {session_dir}/")
+        for item in sorted(session_dir.rglob("*")):
+            rel = item.relative_to(session_dir)
+            suffix = "/" if item.is_dir() else f"  ({item.stat().st_size:,} bytes)"
+            print(f"    {rel}{suffix}")
+    else:
+        print("  Session dir: (none — no subagents or artifacts)")
+
+
+if __name__ == "__main__":
+    main()